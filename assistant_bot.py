@@ -1,6 +1,8 @@
 import re
-from cal import handle_calendar_command
+from cal import handle_calendar_command, import_events_file
+from cal.parser import parse_input, PROMPTS
 import joke
+from metrics import metrics
 
 
 def request_manager():
@@ -22,14 +24,29 @@ def request_manager():
                 print("👋 Goodbye!")
                 break
             
+            # Dump per-stage timings
+            if request_lower in ('stats', 'metrics', 'timings'):
+                print(metrics.dump() + "\n")
+                continue
+            
             # Handle joke requests
             if re.search(r'\b(joke|funny|laugh)\b', request_lower):
                 joke.tell_joke()
                 continue
             
+            # Import events from a CSV/ICS file
+            m = re.match(r'import\s+(?:events\s+)?(?:from\s+)?(?P<path>\S+\.(?:csv|ics))$', request, re.IGNORECASE)
+            if m:
+                import_events_file(m.group('path'))
+                continue
+            
             # Handle calendar requests
-            if re.search(r'\b(calendar|event|task|schedule|meeting|appointment)\b', request_lower):
-                handle_calendar_command(request)
+            if re.search(r'\b(calendar|event|task|schedule|meeting|appointment|free)\b', request_lower):
+                parsed = parse_input(request, interactive=False)
+                while parsed.missing:
+                    field = parsed.missing[0]
+                    parsed = parsed.answer(field, input(PROMPTS[field]))
+                handle_calendar_command(parsed)
                 continue
             
             # Handle unknown commands
@@ -37,6 +54,9 @@ def request_manager():
             print("  • 'tell me a joke'")
             print("  • 'calendar view events'")
             print("  • 'calendar create event called Meeting tomorrow at 2pm'")
+            print("  • 'find free time tomorrow afternoon'")
+            print("  • 'import events from timetable.csv' (CSV or ICS)")
+            print("  • 'stats' to show per-stage timings (with ENABLE_METRICS=1)")
             print("  • 'quit' to exit\n")
             
         except KeyboardInterrupt:
@@ -1,9 +1,14 @@
 import os
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google.auth.exceptions import RefreshError
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+from auth.credentials import CredentialManager
+from auth.discovery import discovery_cache
+from auth.pool import ServicePool
+from auth.transport import authorized_http
+from config import Config
+from metrics import span
+
+# The Google client libraries take a noticeable share of startup time, so they
+# are imported on first use rather than when this module is loaded.
 
 SCOPES = [
     'https://www.googleapis.com/auth/calendar',
@@ -13,66 +18,47 @@ TOKEN_PATH = 'token.json'
 CREDS_PATH = os.path.join('internal',
                           'client_secret_923056037784-8o1j30uv5os6j6plbs0mitentaq6vkgh.apps.googleusercontent.com.json')
 
-# Global service cache
-_cached_calendar_service = None
-_cached_tasks_service = None
+# One credential object, kept fresh in the background, is shared by every pooled
+# service client.
+credential_manager = CredentialManager(TOKEN_PATH, CREDS_PATH, SCOPES,
+                                       refresh_margin=Config.TOKEN_REFRESH_MARGIN)
 
 
 def get_credentials():
-    creds = None
+    """Return the shared credentials, loading them on first use."""
+    return credential_manager.get()
 
-    # 1) Load existing token.json if it exists
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
 
-    # 2) If there are no (valid) credentials, or they’ve expired...
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except RefreshError:
-                # Refresh token is invalid — delete and re-auth
-                print("Invalid refresh token; deleting and reauthorizing.")
-                os.remove(TOKEN_PATH)
-                creds = None
+def _build_calendar_service():
+    with span("auth.calendar_service"):
+        creds = get_credentials()
+        return discovery_cache.build('calendar', 'v3', credentials=creds, http=authorized_http(creds))
 
-        # 3) If we still don’t have creds (first-run or after a failed refresh)…
-        if not creds:
-            flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
 
-        # 4) Save for next time
-        with open(TOKEN_PATH, 'w') as token_file:
-            token_file.write(creds.to_json())
+def _build_tasks_service():
+    with span("auth.tasks_service"):
+        creds = get_credentials()
+        return discovery_cache.build('tasks', 'v1', credentials=creds, http=authorized_http(creds))
 
-    # 5) Return the credentials
-    return creds
+
+calendar_pool = ServicePool('calendar', _build_calendar_service,
+                            size=Config.SERVICE_POOL_SIZE, timeout=Config.SERVICE_POOL_TIMEOUT)
+tasks_pool = ServicePool('tasks', _build_tasks_service,
+                         size=Config.SERVICE_POOL_SIZE, timeout=Config.SERVICE_POOL_TIMEOUT)
 
 
 def get_calendar_service():
-    """Get cached calendar service or create new one if needed."""
-    global _cached_calendar_service
-    
-    if _cached_calendar_service is None:
-        creds = get_credentials()
-        _cached_calendar_service = build('calendar', 'v3', credentials=creds, static_discovery=False)
-    
-    return _cached_calendar_service
+    """Get the calendar service owned by the calling thread."""
+    return calendar_pool.local()
 
 
 def get_tasks_service():
-    """Get cached tasks service or create new one if needed."""
-    global _cached_tasks_service
-    
-    if _cached_tasks_service is None:
-        creds = get_credentials()
-        _cached_tasks_service = build('tasks', 'v1', credentials=creds, static_discovery=False)
-    
-    return _cached_tasks_service
+    """Get the tasks service owned by the calling thread."""
+    return tasks_pool.local()
 
 
 def clear_service_cache():
-    """Clear the cached services (useful for testing or credential refresh)."""
-    global _cached_calendar_service, _cached_tasks_service
-    _cached_calendar_service = None
-    _cached_tasks_service = None
+    """Clear the pooled services and shared credentials (useful for testing or credential refresh)."""
+    calendar_pool.clear()
+    tasks_pool.clear()
+    credential_manager.reset()
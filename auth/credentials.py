@@ -0,0 +1,135 @@
+"""Shared OAuth credentials with proactive background refresh.
+
+Credentials are loaded from the token file once and the same object is handed
+to every service client, so refreshing it in place updates them all. A timer
+refreshes the token ``refresh_margin`` seconds before it expires, which keeps
+the OAuth round trip off the path of user requests. The token file is
+rewritten atomically after every refresh.
+"""
+
+import os
+import threading
+from datetime import datetime, timezone
+
+from files import atomic_write
+
+# Delay before retrying a background refresh that failed for a transient reason.
+RETRY_SECONDS = 30
+
+
+def _utcnow():
+    # google-auth keeps expiry as a naive UTC datetime.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class CredentialManager:
+    """Loads credentials once and keeps them fresh on a background timer."""
+
+    def __init__(self, token_path: str, client_secrets_path: str, scopes, refresh_margin: float = 300):
+        self.token_path = token_path
+        self.client_secrets_path = client_secrets_path
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self.failures = 0
+        self._creds = None
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def get(self):
+        """Return the shared credentials, loading or re-authorizing only if needed."""
+        with self._lock:
+            if self._creds is None or not self._creds.valid:
+                self._creds, changed = self._load()
+                if changed:
+                    self.save()
+                self._schedule_refresh()
+            return self._creds
+
+    def _load(self):
+        """Return ``(credentials, changed)``; ``changed`` is True if the token must be saved."""
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google.auth.exceptions import RefreshError
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        creds = self._creds
+        if creds is None and os.path.exists(self.token_path):
+            creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+
+        if creds and creds.valid:
+            return creds, False
+
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+            except RefreshError:
+                # Refresh token is invalid — delete and re-auth
+                print("Invalid refresh token; deleting and reauthorizing.")
+                if os.path.exists(self.token_path):
+                    os.remove(self.token_path)
+                creds = None
+
+        if not creds or not creds.valid:
+            flow = InstalledAppFlow.from_client_secrets_file(self.client_secrets_path, self.scopes)
+            creds = flow.run_local_server(port=0)
+        return creds, True
+
+    def refresh(self):
+        """Refresh the token now; called by the timer ahead of expiry."""
+        from google.auth.transport.requests import Request
+        from google.auth.exceptions import RefreshError
+
+        with self._lock:
+            creds = self._creds
+            if creds is None:
+                return
+            try:
+                creds.refresh(Request())
+            except RefreshError:
+                # Needs the interactive flow; leave it to the next get().
+                self.failures += 1
+                return
+            except Exception:
+                self.failures += 1
+                self._start_timer(RETRY_SECONDS)
+                return
+            self.refreshes += 1
+            self.save()
+            self._schedule_refresh()
+
+    def save(self):
+        """Atomically write the current credentials to the token file."""
+        if self._creds is None:
+            return
+        atomic_write(self.token_path, self._creds.to_json(), prefix=".token-")
+
+    def _schedule_refresh(self):
+        expiry = getattr(self._creds, "expiry", None)
+        if expiry is None or not getattr(self._creds, "refresh_token", None):
+            return
+        delay = (expiry - _utcnow()).total_seconds() - self.refresh_margin
+        self._start_timer(max(delay, 0))
+
+    def _start_timer(self, delay: float):
+        self.stop()
+        self._timer = threading.Timer(delay, self.refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def refresh_scheduled(self) -> bool:
+        """Whether a background refresh is currently scheduled."""
+        return self._timer is not None and self._timer.is_alive()
+
+    def stop(self):
+        """Cancel any scheduled refresh."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def reset(self):
+        """Forget the loaded credentials so the next get() reloads them."""
+        with self._lock:
+            self.stop()
+            self._creds = None
@@ -0,0 +1,149 @@
+"""On-disk cache of Google API discovery documents.
+
+Services are built from a local copy of the discovery document instead of
+fetching it on every cold start. Each document is stored with the time it was
+fetched and its API revision; once it is older than the configured TTL, a
+background thread fetches a fresh copy while the stale one keeps serving.
+When nothing is cached yet, the document bundled with google-api-python-client
+is used, and the network is only consulted if neither is available.
+"""
+
+import json
+import os
+import threading
+import time
+from time import perf_counter
+
+from config import Config
+from files import atomic_write
+from metrics import metrics
+
+# Bump when the on-disk layout changes; entries with another format are ignored.
+CACHE_FORMAT = 1
+DISCOVERY_URI = 'https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest'
+FETCH_TIMEOUT = 10
+
+
+class DiscoveryCache:
+    """Versioned discovery documents on disk, refreshed in the background on a TTL."""
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+        self.build_seconds = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def path(self, api: str, version: str) -> str:
+        return os.path.join(self.directory, f"{api}.{version}.json")
+
+    def load(self, api: str, version: str):
+        """Return the cached entry dict, or None if missing, unreadable or of another format."""
+        try:
+            with open(self.path(api, version)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("format") != CACHE_FORMAT or not isinstance(entry.get("document"), str):
+            return None
+        return entry
+
+    def store(self, api: str, version: str, document: str, fetched_at: float = None):
+        """Atomically write ``document`` to the cache."""
+        try:
+            revision = json.loads(document).get("revision")
+        except ValueError:
+            raise ValueError(f"Discovery document for {api} {version} is not valid JSON")
+        entry = {
+            "format": CACHE_FORMAT,
+            "api": api,
+            "version": version,
+            "revision": revision,
+            "fetched_at": time.time() if fetched_at is None else fetched_at,
+            "document": document,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self.path(api, version), json.dumps(entry))
+        return entry
+
+    def is_stale(self, entry: dict) -> bool:
+        return time.time() - entry.get("fetched_at", 0) > self.ttl
+
+    def fetch(self, api: str, version: str) -> str:
+        """Download the current discovery document."""
+        import requests
+
+        response = requests.get(DISCOVERY_URI.format(api=api, version=version), timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+
+    def refresh(self, api: str, version: str):
+        """Fetch and store a fresh document; failures keep the existing copy."""
+        try:
+            with metrics.span(f"discovery.fetch.{api}"):
+                document = self.fetch(api, version)
+            self.store(api, version, document)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard((api, version))
+
+    def refresh_async(self, api: str, version: str):
+        """Start a background refresh unless one is already running for this API."""
+        key = (api, version)
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+        thread = threading.Thread(target=self.refresh, args=key, daemon=True,
+                                  name=f"discovery-refresh-{api}")
+        thread.start()
+        return thread
+
+    def get_document(self, api: str, version: str) -> str:
+        """Return a discovery document without waiting on the network when possible."""
+        entry = self.load(api, version)
+        if entry is None:
+            from googleapiclient.discovery_cache import get_static_doc
+
+            document = get_static_doc(api, version)
+            if document is not None:
+                # Seed the cache with the bundled copy, marked stale so it is replaced.
+                entry = self.store(api, version, document, fetched_at=0)
+            else:
+                with metrics.span(f"discovery.fetch.{api}"):
+                    document = self.fetch(api, version)
+                return self.store(api, version, document)["document"]
+        if self.is_stale(entry):
+            self.refresh_async(api, version)
+        return entry["document"]
+
+    def build(self, api: str, version: str, credentials=None, http=None):
+        """Build a service client from the cached discovery document.
+
+        ``http`` is an already-authorized transport and replaces ``credentials``.
+        """
+        from googleapiclient.discovery import build_from_document
+
+        started = perf_counter()
+        document = self.get_document(api, version)
+        if http is not None:
+            service = build_from_document(document, http=http)
+        else:
+            service = build_from_document(document, credentials=credentials)
+        elapsed = perf_counter() - started
+        self.build_seconds[(api, version)] = elapsed
+        metrics.observe(f"discovery.build.{api}", elapsed)
+        return service
+
+    def clear(self):
+        """Delete every cached document."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+
+
+discovery_cache = DiscoveryCache(Config.DISCOVERY_CACHE_DIR, Config.DISCOVERY_CACHE_TTL)
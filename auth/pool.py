@@ -0,0 +1,148 @@
+"""Bounded pools of Google API service clients.
+
+A service object wraps an httplib2 transport that must not be used by two
+threads at once. A pool hands each caller its own client, either for the
+duration of a ``checkout()`` block or, via ``local()``, for the lifetime of the
+calling thread. At most ``size`` clients are ever built; callers beyond that
+wait for one to be returned, and the wait is recorded as ``pool.<name>.wait``.
+"""
+
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
+from time import perf_counter
+
+from exceptions import ServiceUnavailableError
+from metrics import metrics
+
+
+class _Lease:
+    """Thread-local holder that returns its service to the pool when the thread goes away."""
+
+    __slots__ = ("service", "generation", "__weakref__")
+
+    def __init__(self, pool, service, generation):
+        self.service = service
+        self.generation = generation
+        weakref.finalize(self, pool.release, service)
+
+
+class ServicePool:
+    """Checkout/return pool of at most ``size`` service clients built by ``factory``."""
+
+    def __init__(self, name: str, factory, size: int = 4, timeout: float = None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._generation = 0
+        self._leased = {}           # id(service) -> generation it was checked out under
+        # Reentrant: dropping thread-local leases (e.g. in clear()) runs their finalizers, which release.
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self.waits = 0
+        self.timeouts = 0
+
+    def acquire(self, timeout: float = None):
+        """Take a client from the pool, building one if the pool is not yet full."""
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._lease(*entry):
+                return entry[1]
+
+        with self._lock:
+            generation = self._generation
+            build = self._created < self.size
+            if build:
+                self._created += 1
+        if build:
+            try:
+                service = self._factory()
+            except BaseException:
+                with self._lock:
+                    if generation == self._generation:
+                        self._created -= 1
+                raise
+            self._lease(generation, service)
+            return service
+
+        timeout = self.timeout if timeout is None else timeout
+        started = perf_counter()
+        try:
+            while True:
+                remaining = None if timeout is None else max(0.0, timeout - (perf_counter() - started))
+                entry = self._idle.get(timeout=remaining)
+                if self._lease(*entry):
+                    return entry[1]
+        except queue.Empty:
+            with self._lock:
+                self.timeouts += 1
+            raise ServiceUnavailableError(
+                f"Timed out after {timeout}s waiting for a {self.name} service")
+        finally:
+            with self._lock:
+                self.waits += 1
+            metrics.observe(f"pool.{self.name}.wait", perf_counter() - started)
+
+    def _lease(self, generation, service) -> bool:
+        """Record ``service`` as checked out under ``generation``; False if a clear() made it stale."""
+        with self._lock:
+            self._leased[id(service)] = generation
+            return generation == self._generation
+
+    def release(self, service):
+        """Return a client taken with ``acquire``; clients from before a ``clear()`` are dropped."""
+        with self._lock:
+            generation = self._leased.pop(id(service), self._generation)
+            if generation == self._generation:
+                self._idle.put((generation, service))
+
+    @contextmanager
+    def checkout(self, timeout: float = None):
+        """Borrow a client for the duration of a ``with`` block."""
+        service = self.acquire(timeout)
+        try:
+            yield service
+        finally:
+            self.release(service)
+
+    def local(self):
+        """Return the client owned by the calling thread, checking one out on first use."""
+        lease = getattr(self._local, "lease", None)
+        if lease is None or lease.generation != self._generation:
+            generation = self._generation
+            lease = _Lease(self, self.acquire(), generation)
+            self._local.lease = lease
+        return lease.service
+
+    def clear(self):
+        """Drop every client; later calls build fresh ones."""
+        with self._lock:
+            self._generation += 1
+            self._created = 0
+            self._local = threading.local()
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": idle,
+                "in_use": self._created - idle,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+            }
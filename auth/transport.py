@@ -0,0 +1,138 @@
+"""Pluggable HTTP transport for Google API clients.
+
+By default googleapiclient sends every request through httplib2, which keeps at
+most one connection per host and offers no pool tuning. ``SessionHttp`` adapts
+a google-auth ``AuthorizedSession`` (requests + urllib3) to the small
+httplib2 interface googleapiclient uses, so clients get a keep-alive
+connection pool with configurable size and timeouts. Every request is timed
+under ``http.request.reused`` or ``http.request.new`` depending on whether it
+went out on a pooled connection or had to open (and handshake) a new one.
+
+``HTTP_TRANSPORT`` selects the transport: ``requests`` (the default) or
+``httplib2`` to keep the library's own.
+"""
+
+import socket
+import threading
+from time import perf_counter
+
+from config import Config
+from exceptions import ConfigurationError
+from metrics import metrics
+
+
+# Connections opened by the current thread; requests run synchronously, so the
+# difference across one request tells whether it needed a new connection.
+_opened = threading.local()
+_pool_classes = None
+
+
+def _connections_opened() -> int:
+    return getattr(_opened, "count", 0)
+
+
+def _counting_pool_classes():
+    """urllib3 pool classes whose connections count every (re)connect."""
+    global _pool_classes
+    if _pool_classes is None:
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        def counting(base):
+            def connect(self):
+                base.connect(self)
+                _opened.count = _connections_opened() + 1
+            return type("Counting" + base.__name__, (base,), {"connect": connect})
+
+        _pool_classes = {
+            "http": type("CountingHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": counting(HTTPConnection)}),
+            "https": type("CountingHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": counting(HTTPSConnection)}),
+        }
+    return _pool_classes
+
+
+def _keepalive_socket_options():
+    from urllib3.connection import HTTPConnection
+
+    return HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+
+class SessionHttp:
+    """httplib2-style ``request()`` on top of a pooled, authorized requests session."""
+
+    def __init__(self, credentials, pool_size: int = 10, keep_alive: bool = True,
+                 connect_timeout: float = 5.0, read_timeout: float = 60.0):
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+
+        self.credentials = credentials
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = AuthorizedSession(credentials)
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        if keep_alive:
+            self.adapter.init_poolmanager(pool_size, pool_size, socket_options=_keepalive_socket_options())
+        self.adapter.poolmanager.pool_classes_by_scheme = _counting_pool_classes()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.requests = 0
+        self.reused = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        """Send a request; returns ``(httplib2.Response, content)`` like ``httplib2.Http.request``."""
+        import httplib2
+
+        headers = dict(headers or {})
+        if not self.keep_alive:
+            headers['connection'] = 'close'
+        opened_before = _connections_opened()
+
+        started = perf_counter()
+        response = self.session.request(method, uri, data=body, headers=headers,
+                                        timeout=self.timeout, allow_redirects=redirections > 0)
+        content = response.content
+        elapsed = perf_counter() - started
+
+        opened = _connections_opened() - opened_before
+        with self._lock:
+            self.requests += 1
+            self.new_connections += opened
+            if not opened:
+                self.reused += 1
+        metrics.observe("http.request.new" if opened else "http.request.reused", elapsed)
+
+        info = {key.lower(): value for key, value in response.headers.items()}
+        info['status'] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason
+        return resp, content
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": self.reused,
+            }
+
+    def close(self):
+        self.session.close()
+
+
+def authorized_http(credentials):
+    """Return the configured transport for ``credentials``, or None to use httplib2."""
+    if Config.HTTP_TRANSPORT == 'httplib2':
+        return None
+    if Config.HTTP_TRANSPORT != 'requests':
+        raise ConfigurationError(f"Unknown HTTP_TRANSPORT: {Config.HTTP_TRANSPORT!r}")
+    return SessionHttp(
+        credentials,
+        pool_size=Config.HTTP_POOL_SIZE,
+        keep_alive=Config.HTTP_KEEP_ALIVE,
+        connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+        read_timeout=Config.HTTP_READ_TIMEOUT,
+    )
@@ -0,0 +1,223 @@
+"""Per-user credentials and service clients for running as a shared service.
+
+Tokens are kept in a ``TokenStore`` keyed by user ID (a directory of JSON
+files or a SQLite database). ``UserServices`` turns a user ID into an
+authorized Calendar or Tasks client, keeping recently used clients in a
+bounded LRU that also drops clients left idle longer than ``idle_ttl``, so a
+large user base is served without rebuilding a client on every request or
+holding one per user in memory.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from urllib.parse import quote, unquote
+
+from auth.authentication import SCOPES
+from auth.credentials import _utcnow
+from auth.discovery import discovery_cache
+from auth.transport import authorized_http
+from config import Config
+from exceptions import AuthenticationError
+from files import atomic_write
+
+APIS = {'calendar': 'v3', 'tasks': 'v1'}
+
+
+class DirectoryTokenStore:
+    """One ``<user>.json`` token file per user in ``directory``."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, user_id: str) -> str:
+        return os.path.join(self.directory, quote(user_id, safe='') + '.json')
+
+    def load(self, user_id: str):
+        try:
+            with open(self._path(user_id)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save(self, user_id: str, token_json: str):
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self._path(user_id), token_json)
+
+    def delete(self, user_id: str):
+        try:
+            os.remove(self._path(user_id))
+        except FileNotFoundError:
+            pass
+
+    def users(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(unquote(name[:-5]) for name in os.listdir(self.directory) if name.endswith('.json'))
+
+
+class SQLiteTokenStore:
+    """Tokens in a single SQLite table keyed by user ID."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "user_id TEXT PRIMARY KEY, token TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def load(self, user_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT token FROM tokens WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, user_id: str, token_json: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO tokens (user_id, token, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET token = excluded.token, updated_at = excluded.updated_at",
+                (user_id, token_json, time.time()),
+            )
+
+    def delete(self, user_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tokens WHERE user_id = ?", (user_id,))
+
+    def users(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT user_id FROM tokens ORDER BY user_id")]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_token_store(location: str):
+    """Open a SQLite store for ``*.db``/``*.sqlite`` paths and a directory store otherwise."""
+    if location.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SQLiteTokenStore(location)
+    return DirectoryTokenStore(location)
+
+
+class UserServices:
+    """Authorized service clients per ``(user_id, api)`` in a bounded, idle-expiring LRU."""
+
+    def __init__(self, store, maxsize: int = 256, idle_ttl: float = 900,
+                 refresh_margin: float = 300, clock=time.monotonic):
+        self.store = store
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def credentials(self, user_id: str):
+        """Load ``user_id``'s credentials, refreshing and saving them if they are about to expire."""
+        from google.auth.transport.requests import Request
+        from google.auth.exceptions import RefreshError
+        from google.oauth2.credentials import Credentials
+
+        token_json = self.store.load(user_id)
+        if token_json is None:
+            raise AuthenticationError(f"No stored credentials for user {user_id!r}")
+        try:
+            creds = Credentials.from_authorized_user_info(json.loads(token_json), SCOPES)
+        except ValueError as e:
+            raise AuthenticationError(f"Stored credentials for user {user_id!r} are invalid: {e}")
+        if self._needs_refresh(creds):
+            try:
+                creds.refresh(Request())
+            except RefreshError as e:
+                raise AuthenticationError(f"Could not refresh credentials for user {user_id!r}: {e}")
+            self.store.save(user_id, creds.to_json())
+        return creds
+
+    def _needs_refresh(self, creds) -> bool:
+        if not creds.valid:
+            return True
+        return creds.expiry is not None and creds.expiry - _utcnow() < timedelta(seconds=self.refresh_margin)
+
+    def _sweep(self, now):
+        """Drop clients idle longer than idle_ttl. Caller holds the lock."""
+        while self._clients:
+            key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            del self._clients[key]
+            self.expirations += 1
+
+    def get(self, user_id: str, api: str):
+        """Return the cached client for ``user_id`` and ``api``, building it on a miss."""
+        if api not in APIS:
+            raise ValueError(f"Unknown API: {api}")
+        key = (user_id, api)
+        now = self._clock()
+        with self._lock:
+            self._sweep(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        creds = self.credentials(user_id)
+        service = discovery_cache.build(api, APIS[api], credentials=creds, http=authorized_http(creds))
+
+        with self._lock:
+            self._clients[key] = (service, self._clock())
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.maxsize:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        return service
+
+    def calendar(self, user_id: str):
+        return self.get(user_id, 'calendar')
+
+    def tasks(self, user_id: str):
+        return self.get(user_id, 'tasks')
+
+    def evict(self, user_id: str):
+        """Forget every cached client for ``user_id`` (e.g. after their token is revoked)."""
+        with self._lock:
+            for api in APIS:
+                self._clients.pop((user_id, api), None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._clients),
+                "maxsize": self.maxsize,
+            }
+
+
+def make_user_services() -> UserServices:
+    """Build ``UserServices`` from the configured token store and cache limits."""
+    return UserServices(
+        open_token_store(Config.USER_TOKEN_STORE),
+        maxsize=Config.USER_CLIENT_CACHE_SIZE,
+        idle_ttl=Config.USER_CLIENT_IDLE_TTL,
+        refresh_margin=Config.TOKEN_REFRESH_MARGIN,
+    )
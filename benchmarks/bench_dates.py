@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Microbenchmark for date-phrase resolution in cal.parser.
+
+Times the fast-path grammar against the general-purpose backends
+(parsedatetime, then dateparser) on a corpus of phrases taken from real
+commands, and reports the fast path's hit rate and the per-backend stats of
+the date-backend registry on that corpus.
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.parser import FastDateResolver, date_backends, _parsedatetime_backend, _dateparser_backend, local_tz
+
+
+CORPUS = [
+    "today", "tomorrow", "friday", "next friday", "monday", "2024-05-03",
+    "tomorrow at 3pm", "next friday at 3pm", "friday at 10:30am", "3pm", "10am",
+    "2:30pm", "noon", "next week", "in 2 hours", "a week from now", "May 3",
+]
+
+
+def backends(text, now):
+    return _parsedatetime_backend(text, now) or _dateparser_backend(text, now)
+
+
+def time_per_phrase(func, phrases, number=200, repeat=5):
+    """Best-of-``repeat`` time per phrase, in microseconds."""
+    now = datetime.now(local_tz).replace(microsecond=0)
+    best = min(timeit.repeat(lambda: [func(p, now) for p in phrases], number=number, repeat=repeat))
+    return best / number / len(phrases) * 1e6
+
+
+def main():
+    resolver = FastDateResolver()
+    now = datetime.now(local_tz).replace(microsecond=0)
+    hits = [p for p in CORPUS if resolver.resolve(p, now) is not None]
+
+    print(f"fast-path hit rate : {resolver.stats()['hit_rate']:.0%} of {len(CORPUS)} phrases")
+    print(f"fast path          : {time_per_phrase(FastDateResolver().resolve, hits):9.2f} us/phrase")
+    print(f"backends (same set): {time_per_phrase(backends, hits):9.2f} us/phrase")
+
+    for phrase in CORPUS:
+        date_backends.resolve(phrase, now)
+    print("\nbackend chain after one pass over the corpus:")
+    for stat in date_backends.stats():
+        print(f"  {stat['name']:<14} calls={stat['calls']:<4} success={stat['success_rate']:5.0%} "
+              f"mean={stat['mean_latency_us']:9.1f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark for sequential versus batched deletes in cal.events.delete_events.
+
+The API is simulated: every HTTP round trip (a single delete or a whole batch
+request) sleeps for ``RTT`` seconds, so the numbers show how many round trips
+each strategy pays rather than real server latency.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.events import delete_events
+
+RTT = 0.02
+EVENTS = 300
+
+
+class SimulatedBatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.ids = []
+
+    def add(self, request, request_id=None):
+        self.ids.append(request_id)
+
+    def execute(self):
+        time.sleep(RTT)
+        for request_id in self.ids:
+            self.callback(request_id, {}, None)
+
+
+def simulated_service():
+    service = Mock()
+    service.events.return_value.list.return_value.execute.return_value = {
+        'items': [{'id': f'event{i}', 'summary': 'Standup'} for i in range(EVENTS)]
+    }
+    service.events.return_value.delete.return_value.execute.side_effect = lambda: time.sleep(RTT)
+    service.new_batch_http_request.side_effect = lambda callback=None: SimulatedBatch(callback)
+    return service
+
+
+def run(batch_size):
+    service = simulated_service()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = delete_events(service, None, "2024-01-01T00:00:00+00:00", "2025-01-01T00:00:00+00:00",
+                               "all", False, batch_size=batch_size)
+    assert result["deleted_count"] == EVENTS
+    return time.perf_counter() - started
+
+
+def main():
+    sequential = run(None)
+    batched = run(50)
+    print(f"{EVENTS} deletes at {RTT * 1e3:.0f} ms per round trip")
+    print(f"sequential : {sequential:7.2f} s")
+    print(f"batched    : {batched:7.2f} s  ({sequential / batched:.0f}x faster)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
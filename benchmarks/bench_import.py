@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark for one insert per event versus cal.importer's batched import.
+
+The API is simulated: every HTTP round trip (a single insert or a whole batch
+request) sleeps for ``RTT`` seconds, so the numbers show how many round trips
+each strategy pays rather than real server latency.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.events import create_event
+from cal.importer import import_events, read_csv
+
+RTT = 0.02
+EVENTS = 300
+
+
+class SimulatedBatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.ids = []
+
+    def add(self, request, request_id=None):
+        self.ids.append(request_id)
+
+    def execute(self):
+        time.sleep(RTT)
+        for request_id in self.ids:
+            self.callback(request_id, {}, None)
+
+
+def simulated_service():
+    service = Mock()
+    service.events.return_value.insert.return_value.execute.side_effect = lambda: time.sleep(RTT) or {}
+    service.new_batch_http_request.side_effect = lambda callback=None: SimulatedBatch(callback)
+    return service
+
+
+def write_timetable(directory):
+    path = os.path.join(directory, "timetable.csv")
+    with open(path, "w") as f:
+        f.write("title,start,end\n")
+        for i in range(EVENTS):
+            day = 1 + i % 28
+            f.write(f"Class {i},2024-03-{day:02d}T09:00:00-05:00,2024-03-{day:02d}T10:00:00-05:00\n")
+    return path
+
+
+def run_one_by_one(path):
+    service = simulated_service()
+    started = time.perf_counter()
+    with open(path, newline="") as f, contextlib.redirect_stdout(io.StringIO()):
+        for row in read_csv(f):
+            create_event(service, row.body["summary"], row.body["start"]["dateTime"], row.body["end"]["dateTime"])
+    return time.perf_counter() - started
+
+
+def run_import(path):
+    service = simulated_service()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = import_events(service, path)
+    assert result["imported"] == EVENTS
+    return time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_timetable(directory)
+        sequential = run_one_by_one(path)
+        batched = run_import(path)
+    print(f"{EVENTS} inserts at {RTT * 1e3:.0f} ms per round trip")
+    print(f"one by one : {sequential:7.2f} s")
+    print(f"import     : {batched:7.2f} s  ({sequential / batched:.0f}x faster)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
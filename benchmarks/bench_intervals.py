@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark for cal.intervals.IntervalIndex against a linear scan.
+
+Events are spread over several years: mostly short meetings, some all-day
+events and a few multi-week blocks. Each query is a one-week window, an
+instant, or a 30-minute overlap check, which are the shapes used by views and
+conflict checks. The last table times create_event's conflict check against a
+warm event mirror (staleness check plus busy lookup, no API call).
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.intervals import IntervalIndex
+from cal.mirror import EventMirror
+
+SIZES = (10_000, 100_000)
+QUERIES = 1_000
+WEEK = 7 * 86400
+
+
+def make_events(n, rng):
+    horizon = n * 1800  # ~one event every 30 minutes on average
+    events = []
+    for i in range(n):
+        start = rng.randrange(0, horizon)
+        if rng.random() < 0.01:
+            length = 86400 * 21
+        else:
+            length = rng.choice([900, 1800, 3600, 3600, 3600, 86400])
+        events.append((f'e{i}', start, start + length))
+    return events, horizon
+
+
+def timed(fn, queries):
+    started = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'events':>8}  {'query':<9} {'scan':>10} {'index':>10} {'speedup':>8}")
+    for n in SIZES:
+        events, horizon = make_events(n, rng)
+        started = time.perf_counter()
+        index = IntervalIndex(events)
+        build = time.perf_counter() - started
+        starts = [rng.randrange(0, horizon) for _ in range(QUERIES)]
+
+        cases = {
+            "window": (lambda lo: [k for k, s, e in events if s < lo + WEEK and e > lo],
+                       lambda lo: index.window(lo, lo + WEEK)),
+            "point": (lambda t: [k for k, s, e in events if s <= t < e],
+                      index.at),
+            "overlap": (lambda lo: any(s < lo + 1800 and e > lo for _, s, e in events),
+                        lambda lo: index.overlaps(lo, lo + 1800)),
+        }
+        for name, (scan, lookup) in cases.items():
+            scan_secs = timed(scan, starts[:50])
+            index_secs = timed(lookup, starts)
+            print(f"{n:>8}  {name:<9} {scan_secs * 1e6:8.1f}us {index_secs * 1e6:8.1f}us "
+                  f"{scan_secs / index_secs:7.0f}x")
+        print(f"{n:>8}  build     {build * 1e3:8.1f}ms")
+
+    print(f"\n{'events':>8}  warm conflict check")
+    for n in SIZES:
+        events, horizon = make_events(n, rng)
+        mirror = warm_mirror(events)
+        slots = [rng.randrange(0, horizon) for _ in range(QUERIES)]
+        service = Mock()
+
+        def check(lo):
+            mirror.ensure_fresh(service)
+            mirror.busy('primary', iso(lo), iso(lo + 1800))
+
+        print(f"{n:>8}  {timed(check, slots) * 1e6:8.1f}us")
+        service.events.assert_not_called()
+    return 0
+
+
+def iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def warm_mirror(events):
+    items = [{'id': key, 'summary': key, 'start': {'dateTime': iso(s)}, 'end': {'dateTime': iso(e)}}
+             for key, s, e in events]
+    service = Mock()
+    service.events.return_value.list.return_value.execute.return_value = {
+        'items': items, 'nextSyncToken': 'token', 'timeZone': 'UTC'}
+    mirror = EventMirror(":memory:", max_staleness=3600)
+    mirror.sync(service)
+    mirror.index()
+    return mirror
+
+
+if __name__ == '__main__':
+    sys.exit(main())
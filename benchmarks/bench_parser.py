@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Microbenchmark for the command lexer behind cal.parser.parse_input.
+
+Compares the single-pass keyword lexer against the previous approach (one regex
+per token kind, rebuilt on every call) on a corpus of real assistant commands,
+and checks that both produce the same tokens before timing them.
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.parser import lex_command
+
+
+CORPUS = [
+    "calendar create event called Meeting tomorrow at 2pm",
+    "calendar view events tomorrow",
+    "view events on friday",
+    "delete all events on friday",
+    "create task called 'buy milk' on monday",
+    "schedule event named standup on friday from 9 to 10am",
+    "add event titled \"Dentist\" on 2024-05-03 at 3pm",
+    "remove event called lunch on tuesday",
+    "view tasks for next week",
+    "delete events anyway",
+    "calendar see events in a week",
+    "yes, delete everything from my calendar on saturday",
+    "make an event called review on thursday from 1:30 to 2:30pm",
+    "look at my events between monday and friday",
+    "delete task called laundry",
+    "I'm sure, remove every event named sync on wednesday",
+]
+
+
+def legacy_lex(user_input):
+    """Token extraction as parse_input did it before the lexer, kept as the baseline."""
+    intent_re = re.compile(
+        r'\b(?P<intention>create|make|add|schedule|remove|delete|destroy|view|see|look)\b',
+        re.IGNORECASE
+    )
+    m = intent_re.search(user_input)
+    intention = m.group('intention') if m else None
+
+    object_re = re.compile(r'\b(?P<object>event|task|events|tasks)\b', re.IGNORECASE)
+    m = object_re.search(user_input)
+    obj = m.group('object') if m else None
+
+    name_re = re.compile(
+        r'\b(?:call(?:ed)?\s+it|called|named|name\s+it|titled|title\s+it|name\sof|title\sof)\b'
+        r'\s*(?P<title>"[^"]+"|\'[^\']+\'|\w+)',
+        re.IGNORECASE
+    )
+    m = name_re.search(user_input)
+    title = m.group('title').strip('"\'') if m else None
+
+    split_re = re.compile(r'(.+?)\s+(?:(on|at|from|between|in|for)\s+|(?=\ba\s+week\b))(.+)', re.IGNORECASE)
+    m = split_re.match(user_input)
+    when_text = m.group(3).strip() if m else None
+
+    start_time = end_time = None
+    if when_text:
+        range_re = re.compile(
+            r'from\s+(?P<s>[\d:\sapm]+)\s+(?:to|until|-)\s+(?P<e>[\d:\sapm]+)',
+            re.IGNORECASE
+        )
+        r = range_re.search(when_text)
+        if r:
+            start_time = r.group("s").strip()
+            end_time = r.group("e").strip()
+            when_text = when_text[:r.start()].strip()
+        else:
+            at_re = re.compile(r'\bat\s+(?P<s>[\d:\sapm]+)', re.IGNORECASE)
+            a = at_re.search(when_text)
+            if a:
+                start_time = a.group("s").strip()
+                when_text = when_text[:a.start()].strip()
+
+    scope = "all" if re.search(r'\b(all|everything|every)\b', user_input, re.IGNORECASE) else None
+    force = bool(re.search(r'\b(force|anyway|i[’\']?m sure|yes,? delete)\b', user_input, re.IGNORECASE))
+
+    return (intention, obj, title, when_text, start_time, end_time, scope, force)
+
+
+def time_per_command(func, number=2000, repeat=5):
+    """Best-of-``repeat`` time per command, in microseconds."""
+    best = min(timeit.repeat(lambda: [func(c) for c in CORPUS], number=number, repeat=repeat))
+    return best / number / len(CORPUS) * 1e6
+
+
+def main():
+    for command in CORPUS:
+        expected = legacy_lex(command)
+        # Fields added to the lexer since (e.g. dry_run) have no legacy counterpart.
+        actual = tuple(lex_command(command))[:len(expected)]
+        if expected != actual:
+            print(f"MISMATCH for {command!r}:\n  legacy: {expected}\n  lexer:  {actual}")
+            return 1
+
+    legacy_us = time_per_command(legacy_lex)
+    lexer_us = time_per_command(lex_command)
+    print(f"{len(CORPUS)} commands, identical tokens")
+    print(f"legacy regexes : {legacy_us:7.2f} us/command")
+    print(f"single-pass    : {lexer_us:7.2f} us/command")
+    print(f"speedup        : {legacy_us / lexer_us:7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark for server-expanded versus locally expanded recurring events.
+
+A calendar of ``SERIES`` daily series is listed over a year-long window. The
+API is simulated, and every page costs ``RTT`` seconds. Server expansion
+(``singleEvents: True``) returns one item per instance in pages of
+Config.MAX_EVENTS_PER_REQUEST. Local expansion returns one master per series
+and expands the instances with dateutil.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.events import iter_events
+from cal.recurrence import iter_expanded
+from config import Config
+
+RTT = 0.02
+SERIES = 20
+DAYS = 365
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def master(i):
+    first = START + timedelta(hours=8, minutes=15 * i)
+    return {'id': f'series{i}', 'summary': f'Series {i}', 'status': 'confirmed',
+            'start': {'dateTime': first.isoformat(), 'timeZone': 'UTC'},
+            'end': {'dateTime': (first + timedelta(minutes=15)).isoformat(), 'timeZone': 'UTC'},
+            'recurrence': ['RRULE:FREQ=DAILY']}
+
+
+def instances():
+    items = []
+    for day in range(DAYS):
+        for i in range(SERIES):
+            first = START + timedelta(days=day, hours=8, minutes=15 * i)
+            items.append({'id': f'series{i}_{day}', 'summary': f'Series {i}',
+                          'start': {'dateTime': first.isoformat()},
+                          'end': {'dateTime': (first + timedelta(minutes=15)).isoformat()}})
+    return items
+
+
+def simulated_service(items):
+    service = Mock()
+    stats = {'pages': 0, 'items': 0}
+
+    def page(params):
+        time.sleep(RTT)
+        offset = int(params.get('pageToken') or 0)
+        size = params['maxResults']
+        chunk = items[offset:offset + size]
+        stats['pages'] += 1
+        stats['items'] += len(chunk)
+        response = {'items': chunk}
+        if offset + size < len(items):
+            response['nextPageToken'] = str(offset + size)
+        return response
+
+    service.events.return_value.list.side_effect = lambda **params: Mock(execute=lambda: page(params))
+    return service, stats
+
+
+def run(name, service, stats, listing):
+    started = time.perf_counter()
+    count = sum(1 for _ in listing(service))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<8} {count:>6} events  {stats['items']:>6} items  {stats['pages']:>4} pages  {elapsed:6.2f} s")
+
+
+def main():
+    time_min, time_max = START.isoformat(), (START + timedelta(days=DAYS)).isoformat()
+    print(f"{SERIES} daily series over {DAYS} days, {RTT * 1e3:.0f} ms per page, "
+          f"{Config.MAX_EVENTS_PER_REQUEST} items per server-expanded page")
+
+    service, stats = simulated_service(instances())
+    run("server", service, stats, lambda s: iter_events(s, 'primary', time_min, time_max))
+
+    service, stats = simulated_service([master(i) for i in range(SERIES)])
+    run("local", service, stats, lambda s: iter_expanded(s, 'primary', time_min, time_max))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
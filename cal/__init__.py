@@ -1,27 +1,65 @@
-from auth.authentication import get_calendar_service, get_tasks_service
-from . import events, tasks, parser
+from auth.authentication import calendar_pool, get_calendar_service, get_tasks_service
+from . import events, fanout, freebusy, importer, tasks, parser
+from .mirror import get_event_mirror
 from datetime import datetime
+from config import Config
+from metrics import span
 
 
 
 def handle_calendar_command(user_input):
-    parsed = parser.parse_input(user_input)
+    """Dispatch a calendar/task command given as text, a ParsedCommand or a completed ParseResult."""
+    if isinstance(user_input, parser.ParseResult):
+        parsed = user_input.command
+    elif isinstance(user_input, parser.ParsedCommand):
+        parsed = user_input
+    else:
+        parsed = parser.parse_input(user_input)
 
-    if parsed['object'] == 'event' or parsed['object'] == 'events':
+    with span("dispatch"):
+        return _dispatch(parsed)
+
+
+def import_events_file(path, calendar_id=None):
+    """Import the events of a CSV or ICS file (see cal.importer), resuming an interrupted run."""
+    service = get_calendar_service()
+    with span("import"):
+        return importer.import_events(service, path, calendar_id or Config.DEFAULT_CALENDAR_ID,
+                                      progress=importer.print_progress, mirror=get_event_mirror())
+
+
+def _dispatch(parsed):
+    if parsed.is_free_time:
         service = get_calendar_service()
-        if parsed['intention'] == 'create' or parsed['intention'] == 'schedule':
-            return events.create_event(service, parsed['title'], parsed['start'], parsed['end'])
-        elif parsed['intention'] == 'view':
-            return events.view_events(service, parsed)
-        elif parsed['intention'] == 'delete' or parsed['intention'] == 'remove':
-            return events.delete_events(service, parsed['title'], parsed['start'], parsed['end'],
-                                        parsed['scope'], parsed['force'])
-
-    elif parsed['object'] == 'task' or parsed['object'] == 'tasks':
+        return freebusy.find_free_time(service, parsed, calendar_ids=fanout.calendar_ids(service))
+
+    if parsed.object == 'event' or parsed.object == 'events':
+        service = get_calendar_service()
+        if parsed.intention == 'create' or parsed.intention == 'schedule':
+            return events.create_event(service, parsed.title, parsed.start, parsed.end,
+                                       mirror=get_event_mirror(),
+                                       check_conflicts=Config.CHECK_CONFLICTS,
+                                       force=parsed.force)
+        # "find" outside a free-time phrase ("find events tomorrow") is a view.
+        elif parsed.intention == 'view' or parsed.intention == 'find':
+            return events.view_events(service, parsed, mirror=get_event_mirror(),
+                                      calendar_ids=fanout.calendar_ids(service), pool=calendar_pool,
+                                      expand_locally=Config.LOCAL_RECURRENCE)
+        elif parsed.intention == 'delete' or parsed.intention == 'remove':
+            return events.delete_events(service, parsed.title, parsed.start, parsed.end,
+                                        parsed.scope, parsed.force,
+                                        batch_size=Config.DELETE_BATCH_SIZE or None,
+                                        stream=Config.STREAM_DELETES,
+                                        progress=events.print_progress,
+                                        expand_locally=Config.LOCAL_RECURRENCE,
+                                        dry_run=parsed.dry_run,
+                                        mirror=get_event_mirror())
+
+    elif parsed.object == 'task' or parsed.object == 'tasks':
         tasks_service = get_tasks_service()
-        if parsed['intention'] == 'create' or parsed['intention'] == 'schedule':
-            return tasks.create_task(tasks_service, parsed['title'], parsed['date'])
-        elif parsed['intention'] == 'view':
-            return tasks.view_tasks(tasks_service, parsed['title'], parsed['date'])
-        elif parsed['intention'] == 'delete' or parsed['intention'] == 'remove':
-            return tasks.delete_tasks(tasks_service, parsed['title'], parsed['date'])
+        if parsed.intention == 'create' or parsed.intention == 'schedule':
+            return tasks.create_task(tasks_service, parsed.title, parsed.date)
+        elif parsed.intention == 'view' or parsed.intention == 'find':
+            return tasks.view_tasks(tasks_service, parsed.title, parsed.date)
+        elif parsed.intention == 'delete' or parsed.intention == 'remove':
+            return tasks.delete_tasks(tasks_service, parsed.title, parsed.date)
@@ -0,0 +1,96 @@
+"""Batched execution of Google API requests.
+
+Groups many small calls (deletes, inserts) into batch HTTP requests of at most
+``MAX_BATCH_SIZE`` items, collects the outcome of every item, and retries only
+the items that failed with a transient error.
+"""
+
+import time
+from typing import NamedTuple
+
+from metrics import span
+
+# Calendar API limit on calls per batch request.
+MAX_BATCH_SIZE = 50
+# Statuses worth retrying: rate limits and server-side errors.
+RETRYABLE_STATUSES = frozenset((403, 429, 500, 502, 503, 504))
+
+
+class BatchResult(NamedTuple):
+    """``succeeded`` holds ``(item, response)``; ``failed`` holds ``(item, error)``."""
+    succeeded: list
+    failed: list
+
+
+def error_status(error):
+    """HTTP status of an ``HttpError``, or None for transport errors."""
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None)
+    return int(status) if status is not None else None
+
+
+def is_retryable(error) -> bool:
+    status = error_status(error)
+    if status is None:
+        return True
+    if status == 403:
+        # 403 is only transient for rate limiting, not for permission errors.
+        return "rateLimitExceeded" in str(error) or "userRateLimitExceeded" in str(error)
+    return status in RETRYABLE_STATUSES
+
+
+def execute_batched(service, items, make_request, batch_size: int = MAX_BATCH_SIZE,
+                    max_attempts: int = 3, backoff: float = 1.0, sleep=time.sleep) -> BatchResult:
+    """Run ``make_request(item)`` for every item through batch requests.
+
+    Items that fail with a retryable error are sent again (in new batches) up
+    to ``max_attempts`` times in total, with exponential backoff between rounds.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    pending = list(items)
+    succeeded, failed = [], []
+    attempt = 0
+
+    while pending:
+        attempt += 1
+        retry = []
+        for offset in range(0, len(pending), batch_size):
+            chunk = pending[offset:offset + batch_size]
+            outcomes = {}
+
+            def callback(request_id, response, exception):
+                outcomes[request_id] = (response, exception)
+
+            batch = service.new_batch_http_request(callback=callback)
+            for i, item in enumerate(chunk):
+                batch.add(make_request(item), request_id=str(i))
+            try:
+                with span("api.batch"):
+                    batch.execute()
+            except Exception as e:
+                # The batch itself failed; every item without an outcome shares the error.
+                for i in range(len(chunk)):
+                    outcomes.setdefault(str(i), (None, e))
+
+            for i, item in enumerate(chunk):
+                response, error = outcomes.get(str(i), (None, RuntimeError("No response for batch item")))
+                if error is None:
+                    succeeded.append((item, response))
+                elif attempt < max_attempts and is_retryable(error):
+                    retry.append(item)
+                else:
+                    failed.append((item, error))
+
+        pending = retry
+        if pending:
+            sleep(backoff * 2 ** (attempt - 1))
+
+    return BatchResult(succeeded, failed)
+
+
+def progress_printer(verb: str):
+    """A ``progress(done, failed)`` callback for interactive use that prints "<verb>... N done"."""
+    def print_progress(done, failed):
+        suffix = f", {failed} failed" if failed else ""
+        print(f"{verb}... {done} done{suffix}", flush=True)
+    return print_progress
@@ -0,0 +1,238 @@
+"""Series-aware planning for bulk deletes.
+
+A listing with expanded instances turns "delete all standups" into one delete
+per instance. The planner groups the chosen targets by ``recurringEventId``.
+For each series it works out whether everything from the first chosen
+instance onward is chosen:
+
+* the whole series: one delete of the series master;
+* a suffix of it (earlier instances stay): one patch of the master's RRULE
+  that moves UNTIL to just before the first chosen instance;
+* anything else: one delete per chosen instance.
+
+A suffix counts as fully chosen when every listed instance from the first
+chosen one onward is chosen and the series ends inside the listed window.
+A series that goes on past the window only shows part of its future, so
+its instances are deleted one by one even when the user said "all": "all"
+means everything matching in the window, not the whole series. The series
+master is fetched (one ``get`` each) only for series that could collapse.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from metrics import span
+from . import batch, recurrence
+from .fanout import event_start
+
+MASTER_FIELDS = "id,summary,start,end,recurrence"
+
+
+class Operation(NamedTuple):
+    """One planned API call."""
+    kind: str                    # "event", "series" (delete master) or "truncate" (patch master)
+    event_id: str
+    summary: Optional[str]
+    instances: int               # listed instances this call removes
+    recurrence: Optional[list] = None   # new recurrence lines for "truncate"
+    cut: Optional[dict] = None          # start of the first removed instance, for "truncate"
+
+
+class DeletePlan(NamedTuple):
+    operations: list
+    lookups: int                 # master fetches made while planning
+
+    @property
+    def calls(self) -> int:
+        return len(self.operations)
+
+    @property
+    def instances(self) -> int:
+        return sum(op.instances for op in self.operations)
+
+
+def _original(event: dict) -> dict:
+    return event.get("originalStartTime") or event["start"]
+
+
+def truncated_recurrence(master: dict, cut: dict) -> list:
+    """The master's recurrence ending before the instance originally starting at ``cut``."""
+    rules_start = recurrence.series_time(master, cut)
+    if "date" in master["start"]:
+        until = (rules_start - timedelta(days=1)).strftime("%Y%m%d")
+    else:
+        until = (rules_start - timedelta(seconds=1)).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    lines = []
+    for line in master.get("recurrence", []):
+        name, _, value = line.partition(":")
+        kind = name.split(";")[0].upper()
+        if kind == "RRULE":
+            parts = [p for p in value.split(";") if not p.upper().startswith(("UNTIL=", "COUNT="))]
+            lines.append(f"{name}:{';'.join(parts + ['UNTIL=' + until])}")
+        elif kind == "RDATE":
+            # Extra dates after the cut would outlive the truncated rule.
+            _, dtstart, _ = recurrence.series_rules(master)
+            params = dict(p.split("=", 1) for p in name.split(";")[1:] if "=" in p)
+            kept = [v for v in value.split(",")
+                    if _comparable(recurrence.parse_ical_value(v, params, dtstart.tzinfo), dtstart) < rules_start]
+            if kept:
+                lines.append(f"{name}:{','.join(kept)}")
+        else:
+            lines.append(line)
+    return lines
+
+
+def _comparable(moment: datetime, dtstart: datetime) -> datetime:
+    if dtstart.tzinfo is None:
+        return moment.replace(tzinfo=None)
+    return moment if moment.tzinfo else moment.replace(tzinfo=dtstart.tzinfo)
+
+
+def plan_deletes(service, targets: list, listed: list, calendar_id: str = 'primary',
+                 window_end: str = None) -> DeletePlan:
+    """
+    targets: the events chosen for deletion
+    listed: everything the listing returned (targets are a subset)
+    window_end: RFC3339 end of the listed window (None = open: nothing collapses)
+    """
+    operations, lookups = [], 0
+    series = {}
+    for event in targets:
+        if event.get("recurringEventId"):
+            series.setdefault(event["recurringEventId"], []).append(event)
+        else:
+            operations.append(Operation("event", event["id"], event.get("summary"), 1))
+
+    for series_id, chosen in series.items():
+        chosen_ids = {e["id"] for e in chosen}
+        in_window = sorted((e for e in listed if e.get("recurringEventId") == series_id),
+                           key=lambda e: event_start({"start": _original(e)}))
+        first = next(i for i, e in enumerate(in_window) if e["id"] in chosen_ids)
+        suffix = all(e["id"] in chosen_ids for e in in_window[first:])
+
+        op = None
+        if suffix:
+            master = _fetch_master(service, calendar_id, series_id)
+            lookups += 1
+            op = _collapse(master, in_window[first], len(chosen), window_end)
+        if op is not None:
+            operations.append(op)
+        else:
+            operations.extend(Operation("event", e["id"], e.get("summary"), 1) for e in chosen)
+    return DeletePlan(operations, lookups)
+
+
+class StreamingPlan:
+    """Series-level calls for a listing seen one event at a time, with every event chosen.
+
+    The master is fetched when a series is first seen. For a series that ends inside the
+    window only the earliest instance and a count are kept; instances of any other series
+    are left to the caller to delete one by one as they arrive. Memory grows with the
+    number of series, not of instances.
+    """
+
+    def __init__(self, service, calendar_id: str = 'primary', window_end: str = None):
+        self.service = service
+        self.calendar_id = calendar_id
+        self.window_end = window_end
+        self.lookups = 0
+        self._series = {}        # series id -> [master, earliest instance, count], or None
+
+    def hold(self, event: dict) -> bool:
+        """Count a recurring ``event`` towards its series; False if it must be deleted on its own."""
+        series_id = event["recurringEventId"]
+        if series_id not in self._series:
+            held = None
+            if self.window_end is not None:
+                master = _fetch_master(self.service, self.calendar_id, series_id)
+                self.lookups += 1
+                if _ends_within(master, self.window_end):
+                    held = [master, event, 0]
+            self._series[series_id] = held
+        held = self._series[series_id]
+        if held is None:
+            return False
+        if event_start({"start": _original(event)}) < event_start({"start": _original(held[1])}):
+            held[1] = event
+        held[2] += 1
+        return True
+
+    def plan(self) -> DeletePlan:
+        operations = [_collapse(master, first, count, self.window_end)
+                      for master, first, count in filter(None, self._series.values())]
+        return DeletePlan(operations, self.lookups)
+
+
+def _fetch_master(service, calendar_id, series_id):
+    with span("api.events.get"):
+        return service.events().get(calendarId=calendar_id, eventId=series_id, fields=MASTER_FIELDS).execute()
+
+
+def _ends_within(master, window_end):
+    """True if the series has no instance at or after ``window_end``."""
+    if not master.get("recurrence") or window_end is None:
+        return False
+    rules, _, _ = recurrence.series_rules(master)
+    end_at = recurrence.series_time(master, datetime.fromisoformat(window_end.replace("Z", "+00:00")))
+    return rules.after(end_at, inc=True) is None
+
+
+def _collapse(master, first_chosen, count, window_end):
+    """A series-level Operation for a fully chosen suffix, or None to delete instances."""
+    if not _ends_within(master, window_end):
+        return None  # the series goes on past the window
+    rules, _, _ = recurrence.series_rules(master)
+    cut = _original(first_chosen)
+    cut_at = recurrence.series_time(master, cut)
+
+    summary = master.get("summary") or first_chosen.get("summary")
+    if rules.before(cut_at) is None:
+        return Operation("series", master["id"], summary, count)
+    return Operation("truncate", master["id"], summary, count,
+                     recurrence=truncated_recurrence(master, cut), cut=cut)
+
+
+def describe(plan: DeletePlan) -> str:
+    lines = [f"Plan: {plan.calls} API call(s) to remove {plan.instances} event(s)"
+             + (f" ({plan.lookups} lookup(s) made while planning):" if plan.lookups else ":")]
+    for op in plan.operations:
+        if op.kind == "series":
+            lines.append(f"  delete series '{op.summary}' ({op.instances} listed instance(s))")
+        elif op.kind == "truncate":
+            when = op.cut.get("dateTime") or op.cut.get("date")
+            lines.append(f"  end series '{op.summary}' before {when} ({op.instances} listed instance(s))")
+        else:
+            lines.append(f"  delete '{op.summary}'")
+    return "\n".join(lines)
+
+
+def execute(service, plan: DeletePlan, calendar_id: str, delete_ids):
+    """
+    Run ``plan``; returns (instances removed, [(event_id, error), ...]).
+
+    delete_ids: callable(event_ids) -> (deleted count, failed) that sends the deletes
+                (sequentially or in batch requests)
+    """
+    removed, failed = 0, []
+    deletes = [op for op in plan.operations if op.kind != "truncate"]
+    if deletes:
+        _, delete_failed = delete_ids([op.event_id for op in deletes])
+        failed_ids = {event_id for event_id, _ in delete_failed}
+        removed += sum(op.instances for op in deletes if op.event_id not in failed_ids)
+        failed.extend(delete_failed)
+
+    for op in plan.operations:
+        if op.kind != "truncate":
+            continue
+        try:
+            with span("api.events.patch"):
+                service.events().patch(calendarId=calendar_id, eventId=op.event_id,
+                                       body={"recurrence": op.recurrence}).execute()
+        except Exception as e:
+            if batch.error_status(e) is None:
+                raise
+            failed.append((op.event_id, e))
+            continue
+        removed += op.instances
+    return removed, failed
@@ -1,12 +1,64 @@
 from datetime import datetime, date, timedelta
-from . import datetime_utils, parser
+from . import batch, datetime_utils, delete_plan, fanout, parser, recurrence
+from config import Config
+from metrics import span
+
+
+# Partial-response masks: only the fields each caller reads are transferred.
+VIEW_FIELDS = "items(id,summary,start,end),nextPageToken"
+DELETE_FIELDS = "items(id,summary,start,end,recurringEventId,originalStartTime),nextPageToken"
 
 
 def is_date_only(value: str) -> bool:
     return "T" not in value
 
 
-def create_event(service, title, start, end):
+def _list_params(calendar_id, time_min, time_max, query, page_size, fields) -> dict:
+    params = {
+        "calendarId": calendar_id,
+        "singleEvents": True,      # expand recurring series
+        "orderBy": "startTime",
+        "maxResults": page_size or Config.MAX_EVENTS_PER_REQUEST,
+    }
+    if fields:
+        params["fields"] = fields if "nextPageToken" in fields else fields + ",nextPageToken"
+    if time_min:
+        params["timeMin"] = time_min
+    if time_max:
+        params["timeMax"] = time_max
+    if query:
+        params["q"] = query
+    return params
+
+
+def iter_events(service, calendar_id: str = 'primary', time_min=None, time_max=None, query=None,
+                page_size: int = None, fields: str = VIEW_FIELDS):
+    """
+    Yield events in start order, fetching one page of ``page_size`` (default
+    Config.MAX_EVENTS_PER_REQUEST) at a time, only when the previous page is used up.
+    """
+    params = _list_params(calendar_id, time_min, time_max, query, page_size, fields)
+
+    token = None
+    while True:
+        if token:
+            params["pageToken"] = token
+        with span("api.events.list"):
+            response = service.events().list(**params).execute()
+        yield from response.get("items", [])
+        token = response.get("nextPageToken")
+        if not token:
+            return
+
+
+def create_event(service, title, start, end, calendar_id: str = 'primary', mirror=None,
+                 check_conflicts: bool = True, force: bool = False):
+    """
+    mirror: optional cal.mirror.EventMirror; when given and check_conflicts is set, the slot is
+            checked against the mirror's busy events first (after syncing any changes older than
+            its staleness window) and nothing is inserted on a clash
+    force: the user said "force/anyway": insert without checking
+    """
 
     if is_date_only(start) and is_date_only(end):
         event_body = {
@@ -21,11 +73,35 @@ def create_event(service, title, start, end):
             'end': {'dateTime': end},
         }
 
-    created = service.events().insert(calendarId='primary', body=event_body).execute()
+    if mirror is not None and check_conflicts and not force:
+        mirror.ensure_fresh(service, calendar_id)
+        with span("conflicts.check"):
+            conflicts = mirror.busy(calendar_id, start, end)
+        if conflicts:
+            print(f"'{title}' overlaps {len(conflicts)} existing event(s):")
+            for event in conflicts:
+                print(f"  {_describe_event(event)}")
+            print("Not created. Say 'anyway' to create it regardless.\n")
+            return {"status": "conflict", "conflicts": conflicts}
+
+    with span("api.events.insert"):
+        created = service.events().insert(calendarId=calendar_id, body=event_body).execute()
+    if mirror is not None:
+        mirror.put(created, calendar_id)
     print(f"Event created: {created.get('htmlLink')}\n")
 
 
-def view_events(service, parsed: dict, calendar_id: str = 'primary'):
+def view_events(service, parsed, calendar_id: str = 'primary', mirror=None,
+                calendar_ids=None, pool=None, expand_locally: bool = False):
+    """
+    parsed: a parser.ParsedCommand (or a dict with the same keys: title, start, end, date)
+    mirror: optional cal.mirror.EventMirror; when given, events are read from it after
+            syncing any changes older than its staleness window
+    calendar_ids: read these calendars instead of ``calendar_id`` and show them merged by
+                  start time; without a mirror they are listed concurrently with clients
+                  checked out of ``pool`` (see cal.fanout)
+    expand_locally: list recurring series as masters and expand them here (see cal.recurrence)
+    """
 
     title = parsed.get('title') or None
     start = parsed.get('start')
@@ -47,47 +123,90 @@ def view_events(service, parsed: dict, calendar_id: str = 'primary'):
         # If only a date is provided, get day bounds
         time_min, time_max = datetime_utils.day_bounds(date_dt)
 
-    params = {
-        "calendarId": calendar_id,
-        "singleEvents": True,      # expand recurring series
-        "orderBy": "startTime",
-        "maxResults": 50,
-    }
+    # Without a date, show the upcoming window rather than paging through the whole history.
+    time_min, time_max = recurrence.default_window(time_min, time_max)
+
+    if calendar_ids and len(calendar_ids) > 1:
+        if mirror is not None:
+            streams = []
+            for cid in calendar_ids:
+                mirror.ensure_fresh(service, cid)
+                with span("mirror.query"):
+                    streams.append([(cid, e) for e in mirror.query(cid, time_min, time_max, title)])
+            pairs = fanout.merge_by_start(streams)
+        else:
+            params = _list_params(None, time_min, time_max, title, None, VIEW_FIELDS)
+            del params["calendarId"]
+            pairs = fanout.iter_calendars(pool, calendar_ids, params)
+        for cid, event in pairs:
+            with span("render.events"):
+                _print_event(event, prefix=f"[{cid}] ")
+        return
+    if calendar_ids:
+        calendar_id = calendar_ids[0]
+
+    if mirror is not None:
+        mirror.ensure_fresh(service, calendar_id)
+        with span("mirror.query"):
+            events = mirror.query(calendar_id, time_min, time_max, title)
+    elif expand_locally:
+        events = recurrence.iter_expanded(service, calendar_id, time_min, time_max, title)
+    else:
+        events = iter_events(service, calendar_id, time_min, time_max, title)
 
-    if time_min:
-        params["timeMin"] = time_min
-    if time_max:
-        params["timeMax"] = time_max
-    if title:
-        params["q"] = title
+    for event in events:
+        with span("render.events"):
+            _print_event(event)
 
 
-    response = service.events().list(**params).execute()
+def _print_event(event, prefix=""):
+    start_str = event["start"].get("dateTime")
+    end_str = event["end"].get("dateTime")
 
-    events = response.get("items", [])
+    if start_str and end_str:
+        start_dt = datetime.fromisoformat(start_str)
+        end_dt = datetime.fromisoformat(end_str)
 
-    for event in events:
-        start_str = event["start"].get("dateTime")
-        end_str = event["end"].get("dateTime")
+        start_fmt = start_dt.strftime("%-I %p")
+        end_fmt = end_dt.strftime("%-I %p")
 
-        if start_str and end_str:
-            start_dt = datetime.fromisoformat(start_str)
-            end_dt = datetime.fromisoformat(end_str)
+        print(f'{prefix}{event["summary"]}: {start_fmt} to {end_fmt}')
 
-            start_fmt = start_dt.strftime("%-I %p")
-            end_fmt = end_dt.strftime("%-I %p")
 
-            print(f'{event["summary"]}: {start_fmt} to {end_fmt}')
-    # return events
+def _describe_event(event):
+    summary = event.get("summary") or "(no title)"
+    start_str = event["start"].get("dateTime")
+    end_str = event["end"].get("dateTime")
+    if not (start_str and end_str):
+        return f"{summary} (all day {event['start'].get('date')})"
+    start_dt = datetime.fromisoformat(start_str)
+    end_dt = datetime.fromisoformat(end_str)
+    return f"{summary}: {start_dt.strftime('%a %-I:%M %p')} to {end_dt.strftime('%-I:%M %p')}"
 
 
 def delete_events(service, title, start, end, scoped, forced, calendar_id: str = 'primary',
-                  confirm_bulk_threshold: int = 10, default_window_days: int = 365):
+                  confirm_bulk_threshold: int = 10, default_window_days: int = 365,
+                  batch_size: int = None, stream: bool = False, window: int = 250,
+                  progress=None, cancel=None, expand_locally: bool = False, dry_run: bool = False,
+                  mirror=None):
     """
     title: str | None
     start/end: can be RFC3339 strings (from day_bounds) OR tz-aware datetime objects OR None
     scoped: "all" if the user said all/everything, else None
     forced: bool (user said "force/anyway/i'm sure/yes delete")
+    batch_size: send deletes in batch requests of this many items (None = one request per event)
+    stream: when the guardrail cannot trip (scoped "all", or forced without a title), list and
+            delete page by page, holding at most ``window`` listed-but-undeleted events
+    progress: optional callable(deleted, failed) invoked as streaming deletes complete
+    cancel: optional threading.Event; streaming stops before the next delete once it is set
+    expand_locally: outside streaming, list recurring series as masters and expand their
+                    instances here instead of paging through server-expanded instances
+    dry_run: print the delete plan (see cal.delete_plan) and its call count without deleting
+    mirror: optional cal.mirror.EventMirror; deleted events are dropped from it, and a calendar
+            whose series were truncated is marked stale so the next read syncs
+
+    Outside streaming, instances of a recurring series are collapsed into one series-level
+    call where the whole series, or everything from some instance on, is being deleted.
     """
 
     # ---- normalize timeMin/timeMax into RFC3339 strings ----
@@ -132,26 +251,18 @@ def delete_events(service, title, start, end, scoped, forced, calendar_id: str =
         pass  # if parsing fails, let API validate
 
     # ---- list candidate events ----
-    params = {
-        "calendarId": calendar_id,
-        "singleEvents": True,                 # expand recurring series
-        "orderBy": "startTime",
-        "maxResults": 2500,
-        "fields": "items(id,summary,start,end,recurringEventId),nextPageToken",
-        "timeMin": timeMin
-    }
-    if timeMax: params["timeMax"] = timeMax
-    if title:   params["q"] = title
+    listing = dict(calendar_id=calendar_id, time_min=timeMin, time_max=timeMax, query=title,
+                   fields=DELETE_FIELDS)
 
-    items, token = [], None
-    while True:
-        if token:
-            params["pageToken"] = token
-        resp = service.events().list(**params).execute()
-        items.extend(resp.get("items", []))
-        token = resp.get("nextPageToken")
-        if not token:
-            break
+    # A dry run always lists everything first so the whole plan can be shown.
+    if stream and not dry_run and (scoped == "all" or (forced and not title)):
+        events = iter_events(service, page_size=max(1, min(window, 2500)), **listing)
+        return _delete_streaming(service, events, calendar_id, batch_size, progress, cancel, timeMax, mirror)
+
+    if expand_locally:
+        items = list(recurrence.iter_expanded(service, calendar_id, timeMin, timeMax, title))
+    else:
+        items = list(iter_events(service, page_size=2500, **listing))
 
     if not items:
         print("No matching events found.")
@@ -173,11 +284,122 @@ def delete_events(service, title, start, end, scoped, forced, calendar_id: str =
               f"Re-run with 'force' wording (e.g., 'delete anyway') or say 'all' to proceed.")
         return {"status": "too_many_matches", "count": len(targets)}
 
-    # ---- delete ----
-    deleted = 0
-    for ev in targets:
-        service.events().delete(calendarId=calendar_id, eventId=ev["id"]).execute()
-        deleted += 1
-
+    # ---- plan and delete ----
+    plan = delete_plan.plan_deletes(service, targets, items, calendar_id, timeMax)
+    if dry_run:
+        print(delete_plan.describe(plan))
+        return {"status": "planned", "calls": plan.calls, "lookups": plan.lookups,
+                "instances": plan.instances, "deleted_count": 0}
+
+    deleted, failed = _execute_plan(service, plan, calendar_id, batch_size, mirror)
+    return _delete_result(deleted, failed)
+
+
+def _execute_plan(service, plan, calendar_id, batch_size, mirror):
+    result = delete_plan.execute(
+        service, plan, calendar_id,
+        lambda event_ids: _delete_ids(service, event_ids, calendar_id, batch_size, mirror))
+    if mirror is not None and any(op.kind == "truncate" for op in plan.operations):
+        # Which instances a truncated series lost is only known to the server.
+        mirror.invalidate(calendar_id)
+    return result
+
+
+def _delete_ids(service, event_ids, calendar_id, batch_size, mirror=None):
+    """Delete ``event_ids``; returns (deleted count, [(event_id, error), ...])."""
+    if not batch_size:
+        done = []
+        try:
+            for event_id in event_ids:
+                with span("api.events.delete"):
+                    service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+                done.append(event_id)
+        finally:
+            if mirror is not None:
+                mirror.discard(done, calendar_id)
+        return len(event_ids), []
+
+    result = batch.execute_batched(
+        service, event_ids,
+        lambda event_id: service.events().delete(calendarId=calendar_id, eventId=event_id),
+        batch_size=batch_size,
+    )
+    # An event that is already gone (404/410) counts as deleted.
+    failed = [(event_id, e) for event_id, e in result.failed if batch.error_status(e) not in (404, 410)]
+    if mirror is not None:
+        failed_ids = {event_id for event_id, _ in failed}
+        mirror.discard([event_id for event_id in event_ids if event_id not in failed_ids], calendar_id)
+    return len(event_ids) - len(failed), failed
+
+
+def _delete_result(deleted, failed, status="deleted"):
     print(f"Deleted {deleted} event(s).")
-    return {"status": "deleted", "deleted_count": deleted}
\ No newline at end of file
+    if failed:
+        print(f"Failed to delete {len(failed)} event(s): {[event_id for event_id, _ in failed[:5]]}")
+        return {"status": "partial" if status == "deleted" else status, "deleted_count": deleted,
+                "failed": [{"id": event_id, "error": str(e)} for event_id, e in failed]}
+    return {"status": status, "deleted_count": deleted}
+
+
+def _delete_streaming(service, events, calendar_id, batch_size, progress, cancel, window_end=None,
+                      mirror=None):
+    """
+    Delete events as ``events`` yields them, so memory stays flat for any number of events.
+
+    A recurring series that ends inside the window is counted rather than held and removed at
+    the end with one series-level call (see cal.delete_plan.StreamingPlan); instances of other
+    series are deleted as they arrive, like single events.
+    """
+    step = batch_size or 1
+    deleted, failed, seen, chunk = 0, [], 0, []
+    series = delete_plan.StreamingPlan(service, calendar_id, window_end)
+
+    def flush():
+        nonlocal deleted
+        chunk_deleted, chunk_failed = _delete_ids(service, chunk, calendar_id, batch_size, mirror)
+        deleted += chunk_deleted
+        failed.extend(chunk_failed)
+        chunk.clear()
+        if progress is not None:
+            progress(deleted, len(failed))
+
+    def cancelled():
+        return cancel is not None and cancel.is_set()
+
+    stopped = False
+    for event in events:
+        seen += 1
+        if event.get("recurringEventId") and series.hold(event):
+            continue
+        chunk.append(event["id"])
+        if len(chunk) == step:
+            if cancelled():
+                stopped = True
+                break
+            flush()
+    if chunk and not stopped:
+        if cancelled():
+            stopped = True
+        else:
+            flush()
+    plan = series.plan()
+    if plan.operations and not stopped:
+        if cancelled():
+            stopped = True
+        else:
+            plan_deleted, plan_failed = _execute_plan(service, plan, calendar_id, batch_size, mirror)
+            deleted += plan_deleted
+            failed.extend(plan_failed)
+            if progress is not None:
+                progress(deleted, len(failed))
+
+    if stopped:
+        print("Deletion cancelled.")
+        return _delete_result(deleted, failed, status="cancelled")
+    if not seen:
+        print("No matching events found.")
+        return {"status": "none", "deleted_count": 0}
+    return _delete_result(deleted, failed)
+
+
+print_progress = batch.progress_printer("Deleting")
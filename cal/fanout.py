@@ -0,0 +1,153 @@
+"""Concurrent reads across several calendars, merged into one start-ordered stream.
+
+Each calendar is listed by its own producer thread. A producer checks a client
+out of the service pool only for the duration of a page request, then hands
+that page's events to the consumer through a small bounded queue. The
+per-calendar streams are interleaved by start time with ``heapq.merge``, which
+pulls from each only as far as the consumer reads. Every calendar's first
+page is requested at once, so a view costs about the slowest calendar's
+latency rather than the sum of all of them.
+"""
+
+import heapq
+import queue
+import threading
+import time
+from datetime import datetime, date
+
+from config import Config
+from metrics import span
+
+CALENDAR_LIST_FIELDS = "items(id,primary,selected,hidden),nextPageToken"
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+
+def event_start(event: dict) -> float:
+    """Sort key for an event: its start as epoch seconds (all-day events at local midnight)."""
+    start = event.get("start", {})
+    if "dateTime" in start:
+        return datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")).timestamp()
+    day = date.fromisoformat(start["date"])
+    return datetime(day.year, day.month, day.day).astimezone().timestamp()
+
+
+def merge_by_start(streams):
+    """Lazily merge start-ordered iterables of ``(calendar_id, event)`` pairs."""
+    return heapq.merge(*streams, key=lambda pair: event_start(pair[1]))
+
+
+def _put(out, item, stop) -> bool:
+    # Blocks while the consumer is behind, but gives up once the consumer has gone.
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(pool, params, out, stop):
+    params = dict(params)
+    try:
+        token = None
+        while not stop.is_set():
+            if token:
+                params["pageToken"] = token
+            with pool.checkout() as service:
+                with span("api.events.list"):
+                    response = service.events().list(**params).execute()
+            for event in response.get("items", []):
+                if not _put(out, event, stop):
+                    return
+            token = response.get("nextPageToken")
+            if not token:
+                break
+    except Exception as e:
+        _put(out, _Failed(e), stop)
+        return
+    _put(out, _DONE, stop)
+
+
+def _drain(calendar_id, out):
+    while True:
+        item = out.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Failed):
+            raise item.error
+        yield calendar_id, item
+
+
+def iter_calendars(pool, calendar_ids, params: dict):
+    """
+    Yield ``(calendar_id, event)`` for every calendar in ``calendar_ids``, in start order.
+
+    pool: a ServicePool (anything with a ``checkout()`` context manager yielding a client)
+    params: events().list keyword arguments, without calendarId; each calendar's stream must
+            be ordered by start time (``orderBy="startTime"``)
+
+    The first error from any calendar is raised here, and the remaining producers stop.
+    """
+    stop = threading.Event()
+    buffer = 2 * params.get("maxResults", Config.MAX_EVENTS_PER_REQUEST)
+    streams = []
+    for calendar_id in calendar_ids:
+        out = queue.Queue(maxsize=buffer)
+        threading.Thread(target=_produce, args=(pool, dict(params, calendarId=calendar_id), out, stop),
+                         name=f"fanout-{calendar_id}", daemon=True).start()
+        streams.append(_drain(calendar_id, out))
+    try:
+        yield from merge_by_start(streams)
+    finally:
+        stop.set()
+
+
+_calendar_list = None   # (expires_at, ids)
+_calendar_list_lock = threading.Lock()
+
+
+def calendar_ids(service, configured=None) -> list:
+    """
+    Calendars to read: ``configured`` (default Config.CALENDAR_IDS), or, when that is
+    ``["all"]``, every selected, visible calendar in the user's calendarList (cached for
+    Config.CALENDAR_LIST_TTL seconds).
+    """
+    global _calendar_list
+
+    configured = Config.CALENDAR_IDS if configured is None else configured
+    if [c.lower() for c in configured] != ["all"]:
+        return list(configured)
+
+    with _calendar_list_lock:
+        if _calendar_list is not None and _calendar_list[0] > time.monotonic():
+            return list(_calendar_list[1])
+
+    ids, token = [], None
+    while True:
+        params = {"minAccessRole": "reader", "fields": CALENDAR_LIST_FIELDS}
+        if token:
+            params["pageToken"] = token
+        with span("api.calendarList.list"):
+            response = service.calendarList().list(**params).execute()
+        ids.extend(c["id"] for c in response.get("items", [])
+                   if (c.get("selected") or c.get("primary")) and not c.get("hidden"))
+        token = response.get("nextPageToken")
+        if not token:
+            break
+
+    with _calendar_list_lock:
+        _calendar_list = (time.monotonic() + Config.CALENDAR_LIST_TTL, ids)
+    return list(ids)
+
+
+def clear_calendar_list_cache():
+    global _calendar_list
+    with _calendar_list_lock:
+        _calendar_list = None
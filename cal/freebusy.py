@@ -0,0 +1,223 @@
+"""Free-time finder built on the freeBusy endpoint.
+
+A single ``freebusy().query`` call returns the busy blocks of every calendar
+in the search window, without event bodies. The blocks are merged into one
+sorted, non-overlapping list, and one sweep over each day's working-hours
+window yields the open gaps. Candidate slots of the requested length are
+placed in the gaps on a quarter-hour grid and ranked: slots with breathing
+room from neighbouring meetings first, then the earliest.
+"""
+
+import re
+from datetime import datetime, date, time, timedelta
+from typing import NamedTuple, Optional
+
+from config import Config
+from metrics import span
+from .parser import extract_datetime, local_tz
+
+SLOT_STEP = timedelta(minutes=15)
+BUFFER_CAP = timedelta(minutes=30)   # more room than this around a slot does not rank it higher
+
+# An explicit part of day replaces the configured working hours for that search.
+PARTS_OF_DAY = {
+    "morning": (time(9), time(12)),
+    "afternoon": (time(12), time(17)),
+    "evening": (time(17), time(21)),
+}
+
+_DURATION_RE = re.compile(
+    r'\b(?:(?P<n>\d+(?:\.\d+)?)\s*-?\s*(?P<unit>minutes?|mins?|m|hours?|hrs?|h)\b'
+    r'|(?P<half>half an? hour)\b|(?P<one>an hour)\b)',
+    re.IGNORECASE
+)
+_PART_RE = re.compile(r'\b(?:' + '|'.join(PARTS_OF_DAY) + r')\b', re.IGNORECASE)
+_FILLER_RE = re.compile(
+    r'\b(?:find|free|time|slots?|when|am|is|are|do|does|we|i|have|any|some|open|available|'
+    r'calendar|me|my|for|a|an)\b|[?!.,]',
+    re.IGNORECASE
+)
+
+
+class FreeQuery(NamedTuple):
+    """What a free-time request asks for."""
+    day: Optional[date]          # None: search the next Config.FREE_SEARCH_DAYS working days
+    duration: timedelta
+    part_of_day: Optional[str]
+
+
+class Gap(NamedTuple):
+    """An open stretch; ``after_busy``/``before_busy`` tell whether a meeting borders it."""
+    start: datetime
+    end: datetime
+    after_busy: bool
+    before_busy: bool
+
+
+def parse_free_query(text: str) -> FreeQuery:
+    """Pull the day, slot length and part of day out of e.g. 'find 45 min free tomorrow afternoon'."""
+    duration = timedelta(minutes=Config.FREE_SLOT_MINUTES)
+    m = _DURATION_RE.search(text)
+    if m:
+        if m.group("half"):
+            duration = timedelta(minutes=30)
+        elif m.group("one"):
+            duration = timedelta(hours=1)
+        else:
+            amount = float(m.group("n"))
+            duration = timedelta(hours=amount) if m.group("unit").lower().startswith("h") else timedelta(minutes=amount)
+        text = text[:m.start()] + text[m.end():]
+
+    part = _PART_RE.search(text)
+    if part:
+        text = text[:part.start()] + text[part.end():]
+    rest = " ".join(_FILLER_RE.sub(" ", text).split())
+    resolved = extract_datetime(rest) if rest else None
+    return FreeQuery(day=resolved.date() if resolved else None, duration=duration,
+                     part_of_day=part.group(0).lower() if part else None)
+
+
+def _working_hours():
+    start, end = Config.WORKING_HOURS.split("-")
+    return time.fromisoformat(start.strip()), time.fromisoformat(end.strip())
+
+
+def search_windows(query: FreeQuery, now: datetime) -> list:
+    """(start, end) local datetimes to search: one per day, clipped to working hours and to now."""
+    hours = PARTS_OF_DAY[query.part_of_day] if query.part_of_day else _working_hours()
+    if query.day is not None:
+        days = [query.day]
+    else:
+        days, day = [], now.date()
+        while len(days) < Config.FREE_SEARCH_DAYS:
+            if day.weekday() in Config.WORKING_DAYS:
+                days.append(day)
+            day += timedelta(days=1)
+
+    windows = []
+    for day in days:
+        start = datetime.combine(day, hours[0], tzinfo=local_tz)
+        end = datetime.combine(day, hours[1], tzinfo=local_tz)
+        start = max(start, now)
+        if end - start > timedelta(0):
+            windows.append((start, end))
+    return windows
+
+
+def query_busy(service, calendar_ids, time_min: datetime, time_max: datetime):
+    """One freeBusy call; returns ([(start, end), ...] busy blocks, {calendar_id: reason} errors)."""
+    body = {
+        "timeMin": time_min.isoformat(),
+        "timeMax": time_max.isoformat(),
+        "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+    }
+    with span("api.freebusy.query"):
+        response = service.freebusy().query(body=body).execute()
+
+    busy, errors = [], {}
+    for calendar_id, calendar in response.get("calendars", {}).items():
+        if calendar.get("errors"):
+            errors[calendar_id] = calendar["errors"][0].get("reason", "unknown")
+        for block in calendar.get("busy", []):
+            busy.append((_parse_time(block["start"]), _parse_time(block["end"])))
+    return busy, errors
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(local_tz)
+
+
+def merge_intervals(intervals) -> list:
+    """Sort and coalesce overlapping or touching (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_gaps(busy: list, windows: list) -> list:
+    """Open Gaps inside ``windows``, given merged ``busy`` blocks; both sorted by start."""
+    gaps = []
+    i = 0
+    for w_start, w_end in windows:
+        while i < len(busy) and busy[i][1] <= w_start:
+            i += 1
+        cursor, after_busy = w_start, False
+        j = i
+        while j < len(busy) and busy[j][0] < w_end:
+            b_start, b_end = busy[j]
+            if b_start > cursor:
+                gaps.append(Gap(cursor, b_start, after_busy, True))
+            if b_end > cursor:
+                cursor, after_busy = b_end, True
+            j += 1
+        if cursor < w_end:
+            gaps.append(Gap(cursor, w_end, after_busy, False))
+    return gaps
+
+
+def _ceil(dt: datetime, step: timedelta) -> datetime:
+    midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    steps = -(-(dt - midnight) // step)
+    return midnight + steps * step
+
+
+def rank_slots(gaps: list, duration: timedelta, limit: int = None) -> list:
+    """Up to ``limit`` non-overlapping (start, end) slots, best first."""
+    limit = limit or Config.FREE_SLOT_RESULTS
+    candidates = []
+    for gap in gaps:
+        t = _ceil(gap.start, SLOT_STEP)
+        while t + duration <= gap.end:
+            before = t - gap.start if gap.after_busy else BUFFER_CAP
+            after = gap.end - (t + duration) if gap.before_busy else BUFFER_CAP
+            candidates.append((-min(before, after, BUFFER_CAP), t))
+            t += SLOT_STEP
+    candidates.sort()
+
+    chosen = []
+    for _, start in candidates:
+        if all(start + duration <= other or start >= other + duration for other in chosen):
+            chosen.append(start)
+            if len(chosen) == limit:
+                break
+    return [(start, start + duration) for start in chosen]
+
+
+def find_free_time(service, parsed, calendar_ids=('primary',), now: datetime = None, limit: int = None):
+    """
+    Print and return ranked open slots for a free-time request.
+
+    parsed: a parser.ParsedCommand (its raw text is read for day, length and part of day) or a string
+    calendar_ids: calendars whose busy time counts; all are covered by the same single API call
+    """
+    now = (now or datetime.now(local_tz)).astimezone(local_tz)
+    text = parsed if isinstance(parsed, str) else parsed.raw_text
+    query = parse_free_query(text)
+    minutes = int(query.duration.total_seconds() // 60)
+
+    windows = search_windows(query, now)
+    if not windows:
+        print(f"No working hours left to search for a {minutes}-minute slot.\n")
+        return {"status": "none", "slots": []}
+
+    busy, errors = query_busy(service, calendar_ids, windows[0][0], windows[-1][1])
+    for calendar_id, reason in errors.items():
+        print(f"Could not read free/busy for {calendar_id}: {reason}")
+
+    with span("freebusy.sweep"):
+        slots = rank_slots(free_gaps(merge_intervals(busy), windows), query.duration, limit)
+
+    if not slots:
+        print(f"No free {minutes}-minute slot found.\n")
+        return {"status": "none", "slots": [], "errors": errors}
+
+    print(f"Free {minutes}-minute slots:")
+    for start, end in slots:
+        print(f"  {start.strftime('%a %b %-d, %-I:%M %p')} to {end.strftime('%-I:%M %p')}")
+    print()
+    return {"status": "found", "slots": slots, "errors": errors}
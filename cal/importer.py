@@ -0,0 +1,365 @@
+"""Bulk import of events from CSV or ICS files.
+
+Rows are read one at a time and turned into event bodies. Invalid rows are
+reported and skipped. Valid rows are inserted in chunks through batch
+requests (see cal.batch), so a timetable of hundreds of events costs a
+handful of HTTP requests rather than one per event.
+
+After every chunk a JSON checkpoint next to the source file records how far
+the import got and which rows failed. Running the same import again resumes
+after the last finished chunk and retries the failed rows. The checkpoint is
+ignored if the file has changed since, and removed once everything is in.
+Every row gets an event id derived from its contents and position. A chunk
+that was sent again after a crash therefore gets "409 duplicate" for the
+rows already created, and those count as imported rather than being created twice.
+
+CSV columns (header names are case-insensitive):
+    title (or summary/subject), start, end, description, location, timezone
+``start``/``end`` are ISO dates or datetimes, or US-style ``03/04/2024 9:00 AM``.
+A row of dates is an all-day event whose ``end`` is the last day (inclusive).
+A missing ``end`` means one day, or Config.IMPORT_DEFAULT_MINUTES for timed rows.
+
+ICS files are read for their VEVENTs: SUMMARY, DTSTART, DTEND or DURATION,
+DESCRIPTION, LOCATION and the RRULE/RDATE/EXDATE lines.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from config import Config
+from files import atomic_write
+from . import batch, datetime_utils
+from .recurrence import parse_ical_value
+
+CHECKPOINT_FORMAT = 1   # layout version of the checkpoint JSON, checked by Checkpoint.load
+
+_US_FORMATS = ("%m/%d/%Y %I:%M %p", "%m/%d/%Y %H:%M", "%m/%d/%Y")
+_TITLE_COLUMNS = ("title", "summary", "subject")
+_DURATION_RE = re.compile(r'^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+
+class ImportRow(NamedTuple):
+    """One record of the source; ``body`` is None when ``error`` says why it is invalid."""
+    number: int                  # 0-based record number, used for checkpoints
+    line: int                    # line in the file, for messages
+    body: Optional[dict]
+    error: Optional[str] = None
+
+
+def parse_when(text: str):
+    """A date or datetime from an ISO or US-style string; naive datetimes are left naive."""
+    text = text.strip()
+    try:
+        return date.fromisoformat(text) if len(text) == 10 and "-" in text else datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in _US_FORMATS:
+        try:
+            moment = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return moment.date() if fmt == "%m/%d/%Y" else moment
+    raise ValueError(f"unrecognised date/time {text!r}")
+
+
+def _zone(name: str):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"unknown time zone {name!r}")
+
+
+def _when(moment, tz_name: str = None) -> dict:
+    """An event start/end from a date or datetime; naive datetimes are local (or ``tz_name``)."""
+    if not isinstance(moment, datetime):
+        return {"date": moment.isoformat()}
+    if moment.tzinfo is None and tz_name:
+        moment = moment.replace(tzinfo=_zone(tz_name))
+    when = {"dateTime": datetime_utils.iso_with_offset(moment)}
+    if tz_name:
+        when["timeZone"] = tz_name
+    return when
+
+
+def _event_body(title, start, end, tz_name=None, description=None, location=None, recurrence=None) -> dict:
+    if not title:
+        raise ValueError("missing title")
+    if isinstance(start, datetime) != isinstance(end, datetime):
+        raise ValueError("start and end must both be dates or both be times")
+    if isinstance(start, datetime):
+        if tz_name:
+            start, end = (m if m.tzinfo else m.replace(tzinfo=_zone(tz_name)) for m in (start, end))
+        if (start.tzinfo is None) != (end.tzinfo is None):
+            start, end = (m if m.tzinfo else m.astimezone() for m in (start, end))
+    if end <= start:
+        raise ValueError("end is not after start")
+
+    body = {"summary": title, "start": _when(start, tz_name), "end": _when(end, tz_name)}
+    if description:
+        body["description"] = description
+    if location:
+        body["location"] = location
+    if recurrence:
+        body["recurrence"] = recurrence
+        if "dateTime" in body["start"] and "timeZone" not in body["start"]:
+            # Recurring timed events need a zone to keep their wall time across DST.
+            body["start"]["timeZone"] = body["end"]["timeZone"] = Config.DEFAULT_TIMEZONE
+    return body
+
+
+def read_csv(f):
+    """Yield an ImportRow per CSV record of the open file ``f``."""
+    reader = csv.DictReader(f)
+    for number, record in enumerate(reader):
+        # Extra fields beyond the header land under None; they are ignored.
+        row = {k.strip().lower(): (v or "").strip() for k, v in record.items() if k is not None}
+        try:
+            title = next((row[c] for c in _TITLE_COLUMNS if row.get(c)), None)
+            if not row.get("start"):
+                raise ValueError("missing start")
+            start = parse_when(row["start"])
+            if row.get("end"):
+                end = parse_when(row["end"])
+                if not isinstance(end, datetime):
+                    end += timedelta(days=1)          # inclusive last day -> exclusive end
+            elif isinstance(start, datetime):
+                end = start + timedelta(minutes=Config.IMPORT_DEFAULT_MINUTES)
+            else:
+                end = start + timedelta(days=1)
+            body = _event_body(title, start, end, row.get("timezone") or None,
+                               row.get("description"), row.get("location"))
+        except ValueError as e:
+            yield ImportRow(number, reader.line_num, None, str(e))
+            continue
+        yield ImportRow(number, reader.line_num, body)
+
+
+def _unfolded(f):
+    """(line number, content line) pairs with RFC 5545 continuation lines joined."""
+    pending, start = None, 0
+    for number, raw in enumerate(f, 1):
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and pending is not None:
+            pending += raw[1:]
+            continue
+        if pending is not None:
+            yield start, pending
+        pending, start = raw, number
+    if pending is not None:
+        yield start, pending
+
+
+def _ics_text(value: str) -> str:
+    return re.sub(r'\\([\\;,nN])', lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _ics_duration(value: str) -> timedelta:
+    m = _DURATION_RE.match(value.strip().lstrip("+"))
+    if not m or not any(m.groups()):
+        raise ValueError(f"unsupported DURATION {value!r}")
+    weeks, days, hours, minutes, seconds = (int(g or 0) for g in m.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def _ics_event(props: list) -> dict:
+    fields, recurrence = {}, []
+    for name, params, value, line in props:
+        if name in ("RRULE", "RDATE", "EXDATE", "EXRULE"):
+            recurrence.append(line)
+        else:
+            fields.setdefault(name, (params, value))
+
+    if "DTSTART" not in fields:
+        raise ValueError("missing DTSTART")
+    params, value = fields["DTSTART"]
+    tz_name = params.get("TZID")
+    if tz_name:
+        _zone(tz_name)
+    start = parse_ical_value(value, params, None)
+    all_day = params.get("VALUE") == "DATE" or len(value) == 8
+    if all_day:
+        start = start.date()
+
+    if "DTEND" in fields:
+        end_params, end_value = fields["DTEND"]
+        end = parse_ical_value(end_value, end_params, None)
+        if all_day:
+            end = end.date()
+    elif "DURATION" in fields:
+        end = start + _ics_duration(fields["DURATION"][1])
+    elif all_day:
+        end = start + timedelta(days=1)
+    else:
+        end = start + timedelta(minutes=Config.IMPORT_DEFAULT_MINUTES)
+
+    title = _ics_text(fields["SUMMARY"][1]) if "SUMMARY" in fields else None
+    return _event_body(title, start, end, tz_name,
+                       _ics_text(fields["DESCRIPTION"][1]) if "DESCRIPTION" in fields else None,
+                       _ics_text(fields["LOCATION"][1]) if "LOCATION" in fields else None,
+                       recurrence)
+
+
+def read_ics(f):
+    """Yield an ImportRow per VEVENT of the open file ``f``; nested components are skipped."""
+    number, depth, props, first_line = 0, 0, None, 0
+    for line_no, line in _unfolded(f):
+        name, _, value = line.partition(":")
+        name, *raw_params = name.split(";")
+        name = name.upper()
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and props is None:
+                props, depth, first_line = [], 0, line_no
+            elif props is not None:
+                depth += 1                            # VALARM and friends
+            continue
+        if name == "END" and props is not None:
+            if depth:
+                depth -= 1
+                continue
+            try:
+                row = ImportRow(number, first_line, _ics_event(props))
+            except ValueError as e:
+                row = ImportRow(number, first_line, None, str(e))
+            yield row
+            number, props = number + 1, None
+            continue
+        if props is not None and not depth:
+            params = dict(p.split("=", 1) for p in raw_params if "=" in p)
+            props.append((name, {k.upper(): v.strip('"') for k, v in params.items()}, value, line))
+
+
+def read_rows(path: str, f):
+    """ImportRows of ``f``, read as ICS or CSV by the extension of ``path``."""
+    return read_ics(f) if path.lower().endswith((".ics", ".ical", ".ifb")) else read_csv(f)
+
+
+def event_id(row: ImportRow, calendar_id: str) -> str:
+    """Stable client-side id for ``row`` (hex digits are valid base32hex event id characters)."""
+    key = json.dumps([calendar_id, row.number, row.body], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+class Checkpoint:
+    """Progress of one import, saved atomically as JSON."""
+
+    def __init__(self, path: str, source: dict, next_row: int = 0, imported: int = 0, failed=()):
+        self.path = path
+        self.source = source
+        self.next_row = next_row
+        self.imported = imported
+        self.failed = set(failed)
+
+    @staticmethod
+    def describe_source(source_path: str, calendar_id: str) -> dict:
+        stat = os.stat(source_path)
+        return {"path": os.path.abspath(source_path), "size": stat.st_size,
+                "mtime": stat.st_mtime, "calendar_id": calendar_id}
+
+    @classmethod
+    def load(cls, path: str, source: dict):
+        """The saved checkpoint for ``source``, or a fresh one if none matches."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, source)
+        if data.get("format") != CHECKPOINT_FORMAT or data.get("source") != source:
+            return cls(path, source)
+        return cls(path, source, data.get("next", 0), data.get("imported", 0), data.get("failed", ()))
+
+    @property
+    def resumed(self) -> bool:
+        return self.next_row > 0
+
+    def save(self):
+        data = {"format": CHECKPOINT_FORMAT, "source": self.source, "next": self.next_row,
+                "imported": self.imported, "failed": sorted(self.failed)}
+        atomic_write(self.path, json.dumps(data))
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def import_events(service, path: str, calendar_id: str = 'primary', batch_size: int = batch.MAX_BATCH_SIZE,
+                  checkpoint_path: str = None, progress=None, sleep=time.sleep, mirror=None):
+    """
+    Insert every valid event of the CSV/ICS file at ``path``.
+
+    checkpoint_path: where progress is kept between runs (default: ``<path>.checkpoint.json``)
+    progress: optional callable(imported, failed) invoked after every chunk
+    mirror: optional cal.mirror.EventMirror; inserted single events are recorded in it, and
+            the calendar is marked stale if a recurring series was inserted
+    """
+    checkpoint = Checkpoint.load(checkpoint_path or path + ".checkpoint.json",
+                                 Checkpoint.describe_source(path, calendar_id))
+    if checkpoint.resumed:
+        print(f"Resuming import of {path} at row {checkpoint.next_row + 1} "
+              f"({checkpoint.imported} already imported).")
+    retry = set(checkpoint.failed)
+    invalid = []
+    failed = []
+
+    def body(row):
+        return dict(row.body, id=event_id(row, calendar_id))
+
+    def insert(row):
+        return service.events().insert(calendarId=calendar_id, body=body(row))
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = (row for row in read_rows(path, f) if row.number >= checkpoint.next_row or row.number in retry)
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            for row in chunk:
+                if row.body is None:
+                    invalid.append(row)
+            pending = [row for row in chunk if row.body is not None]
+            result = batch.execute_batched(service, pending, insert, batch_size=batch_size, sleep=sleep)
+
+            # An id that already exists means an earlier, interrupted run created the event.
+            gone = [(row, e) for row, e in result.failed if batch.error_status(e) != 409]
+            checkpoint.imported += len(pending) - len(gone)
+            checkpoint.failed.difference_update(row.number for row in chunk)
+            checkpoint.failed.update(row.number for row, _ in gone)
+            checkpoint.next_row = max(checkpoint.next_row, chunk[-1].number + 1)
+            checkpoint.save()
+            failed.extend(gone)
+            if mirror is not None:
+                for row, _ in result.succeeded:
+                    if "recurrence" in row.body:
+                        # The mirror holds expanded instances, which only a sync brings in.
+                        mirror.invalidate(calendar_id)
+                    else:
+                        mirror.put(body(row), calendar_id)
+            if progress is not None:
+                progress(checkpoint.imported, len(checkpoint.failed))
+
+    print(f"Imported {checkpoint.imported} event(s) from {path}.")
+    for row in invalid[:10]:
+        print(f"  line {row.line}: {row.error}")
+    if invalid:
+        print(f"Skipped {len(invalid)} invalid row(s).")
+    if failed:
+        print(f"Failed to insert {len(failed)} event(s); run the import again to retry them.")
+        return {"status": "partial", "imported": checkpoint.imported,
+                "invalid": [{"line": row.line, "error": row.error} for row in invalid],
+                "failed": [{"line": row.line, "title": row.body["summary"], "error": str(e)} for row, e in failed]}
+
+    checkpoint.remove()
+    return {"status": "imported", "imported": checkpoint.imported,
+            "invalid": [{"line": row.line, "error": row.error} for row in invalid]}
+
+
+print_progress = batch.progress_printer("Importing")
@@ -0,0 +1,146 @@
+"""Interval index for window, overlap and point-in-time queries over events.
+
+Intervals are kept in an array sorted by start. No interval in that array is
+longer than ``max_span``, so a window query can bisect straight to the first
+interval that might still be running when the window opens and walk forward
+only until the window closes, instead of scanning every event. A few very long
+intervals (multi-week holidays, out-of-office blocks) would inflate that bound
+for everyone, so intervals longer than ``long_threshold`` live in a separate
+small table that is checked in full.
+
+Intervals are half-open: ``[start, end)`` overlaps ``[lo, hi)`` when
+``start < hi`` and ``end > lo``. Times are plain numbers (epoch seconds).
+"""
+
+import bisect
+import heapq
+
+DEFAULT_LONG_THRESHOLD = 86400  # one day: all-day events stay in the sorted array
+
+
+class IntervalIndex:
+    """Half-open intervals keyed by id, each carrying an optional value.
+
+    Queries return values (the key when no value was given) in ``(start, key)``
+    order. Values are stored as-is, so treat returned objects as read-only.
+    """
+
+    def __init__(self, intervals=(), long_threshold: float = DEFAULT_LONG_THRESHOLD):
+        """Build from ``(key, start, end)`` or ``(key, start, end, value)`` tuples."""
+        self.long_threshold = long_threshold
+        self._items = {}       # key -> (start, end, value)
+        self._entries = []     # sorted (start, key) of short intervals
+        self._starts = []      # parallel to _entries, for fast bisect
+        self._long = {}        # key -> (start, end, value) longer than long_threshold
+        self.max_span = 0
+        for key, start, end, *value in intervals:
+            self._items[key] = (start, end, value[0] if value else key)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._long = {}
+        self.max_span = 0
+        entries = []
+        for key, (start, end, value) in self._items.items():
+            if end - start > self.long_threshold:
+                self._long[key] = (start, end, value)
+            else:
+                entries.append((start, key))
+                self.max_span = max(self.max_span, end - start)
+        entries.sort()
+        self._entries = entries
+        self._starts = [start for start, _ in entries]
+
+    # ---- updates ----
+
+    def add(self, key, start: float, end: float, value=None):
+        """Insert an interval, replacing any existing one with the same key."""
+        if end < start:
+            raise ValueError(f"interval {key!r} ends before it starts")
+        self.discard(key)
+        value = key if value is None else value
+        self._items[key] = (start, end, value)
+        if end - start > self.long_threshold:
+            self._long[key] = (start, end, value)
+            return
+        i = bisect.bisect(self._entries, (start, key))
+        self._entries.insert(i, (start, key))
+        self._starts.insert(i, start)
+        self.max_span = max(self.max_span, end - start)
+
+    def discard(self, key):
+        """Remove an interval if present.
+
+        ``max_span`` is left as an upper bound; it only shrinks on ``rebuild()``.
+        """
+        item = self._items.pop(key, None)
+        if item is None:
+            return
+        if self._long.pop(key, None) is not None:
+            return
+        i = bisect.bisect_left(self._entries, (item[0], key))
+        del self._entries[i]
+        del self._starts[i]
+
+    def rebuild(self):
+        """Re-sort from scratch, tightening ``max_span`` after many removals."""
+        self._rebuild()
+
+    def clear(self):
+        self._items.clear()
+        self._rebuild()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        """The ``(start, end, value)`` stored for ``key``, or None."""
+        return self._items.get(key)
+
+    # ---- queries ----
+
+    def window(self, lo: float = None, hi: float = None) -> list:
+        """Values of intervals overlapping ``[lo, hi)``; a missing bound is open."""
+        first = 0 if lo is None else bisect.bisect_right(self._starts, lo - self.max_span)
+        last = len(self._starts) if hi is None else bisect.bisect_left(self._starts, hi)
+        return self._collect(first, last, lo, hi)
+
+    def at(self, t: float) -> list:
+        """Values of intervals running at instant ``t`` (``start <= t < end``)."""
+        first = bisect.bisect_right(self._starts, t - self.max_span)
+        last = bisect.bisect_right(self._starts, t)
+        return self._collect(first, last, t, None, point=True)
+
+    def overlaps(self, start: float, end: float) -> bool:
+        """True if any interval overlaps ``[start, end)``; stops at the first hit."""
+        first = bisect.bisect_right(self._starts, start - self.max_span)
+        last = bisect.bisect_left(self._starts, end)
+        items = self._items
+        for i in range(first, last):
+            if items[self._entries[i][1]][1] > start:
+                return True
+        return any(s < end and e > start for s, e, _ in self._long.values())
+
+    def _collect(self, first, last, lo, hi, point=False):
+        items = self._items
+        entries = self._entries
+        if lo is None:
+            short = [entries[i] for i in range(first, last)]
+        else:
+            short = [entries[i] for i in range(first, last) if items[entries[i][1]][1] > lo]
+
+        long_hits = []
+        for key, (s, e, _) in self._long.items():
+            if point:
+                hit = s <= lo < e
+            else:
+                hit = (hi is None or s < hi) and (lo is None or e > lo)
+            if hit:
+                long_hits.append((s, key))
+        if long_hits:
+            long_hits.sort()
+            short = heapq.merge(short, long_hits)
+        return [items[key][2] for _, key in short]
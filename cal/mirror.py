@@ -0,0 +1,311 @@
+"""Local SQLite mirror of calendar events kept current with sync tokens.
+
+The first sync lists every event once; later syncs send the stored
+``syncToken`` and receive only what changed since (cancelled events arrive
+with ``status: cancelled`` and are removed). If the server rejects the token
+with 410 Gone, the calendar is resynced from scratch. Reads are answered from
+the local table, so a view over a day or a week needs no network call while
+the mirror is within its staleness window. Window queries go through an
+in-memory ``IntervalIndex`` per calendar, loaded from the table on first use
+and patched with each sync's deltas.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, date
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+from config import Config
+from metrics import span
+from .intervals import IntervalIndex
+
+SYNC_FIELDS = ("items(id,status,summary,start,end,recurringEventId,updated,transparency,attendees(self,responseStatus)),"
+               "nextPageToken,nextSyncToken,timeZone")
+
+
+class SyncResult(NamedTuple):
+    """What one sync changed: ``full`` is True when the calendar was reloaded from scratch."""
+    full: bool
+    upserted: list
+    removed: list
+
+
+def _timestamp(when: dict, tz) -> float:
+    """Epoch seconds for an event ``start``/``end`` object (all-day dates use ``tz`` midnight)."""
+    if "dateTime" in when:
+        return datetime.fromisoformat(when["dateTime"].replace("Z", "+00:00")).timestamp()
+    day = date.fromisoformat(when["date"])
+    return datetime(day.year, day.month, day.day, tzinfo=tz).timestamp()
+
+
+def _zone(time_zone):
+    return ZoneInfo(time_zone) if time_zone else datetime.now().astimezone().tzinfo
+
+
+def _to_timestamp(value, tz=None) -> float:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        if len(value) == 10:
+            return _timestamp({"date": value}, tz or _zone(None))
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.timestamp()
+
+
+def _is_busy(event: dict) -> bool:
+    if event.get("transparency") == "transparent":
+        return False
+    for attendee in event.get("attendees", ()):
+        if attendee.get("self") and attendee.get("responseStatus") == "declined":
+            return False
+    return True
+
+
+class EventMirror:
+    """Events of one or more calendars mirrored into SQLite."""
+
+    def __init__(self, path: str = ":memory:", max_staleness: float = 60, clock=time.time):
+        self.path = path
+        self.max_staleness = max_staleness
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._indexes = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    calendar_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    summary TEXT,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    recurring_event_id TEXT,
+                    body TEXT NOT NULL,
+                    PRIMARY KEY (calendar_id, id)
+                );
+                CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start_ts);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    calendar_id TEXT PRIMARY KEY,
+                    sync_token TEXT,
+                    time_zone TEXT,
+                    synced_at REAL NOT NULL
+                );
+                """
+            )
+
+    # ---- sync ----
+
+    def sync(self, service, calendar_id: str = 'primary') -> SyncResult:
+        """Pull changes since the last sync, or everything if there is no usable sync token."""
+        from googleapiclient.errors import HttpError
+
+        with self._lock:
+            state = self._state(calendar_id)
+            if state is None or not state[0]:
+                return self._full_sync(service, calendar_id)
+            try:
+                return self._apply(service, calendar_id, {"syncToken": state[0]}, full=False,
+                                   time_zone=state[1])
+            except HttpError as e:
+                if getattr(e.resp, "status", None) != 410:
+                    raise
+                # Sync token expired or invalidated: start over.
+                return self._full_sync(service, calendar_id)
+
+    def _full_sync(self, service, calendar_id):
+        return self._apply(service, calendar_id, {}, full=True, time_zone=None)
+
+    def _apply(self, service, calendar_id, extra, full, time_zone):
+        params = {
+            "calendarId": calendar_id,
+            "singleEvents": True,
+            "maxResults": 2500,
+            "fields": SYNC_FIELDS,
+            **extra,
+        }
+        # Fetch every page before touching the table so a failed sync leaves it intact.
+        pages, token = [], None
+        while True:
+            if token:
+                params["pageToken"] = token
+            with span("mirror.list"):
+                response = service.events().list(**params).execute()
+            pages.append(response)
+            token = response.get("nextPageToken")
+            if not token:
+                break
+
+        time_zone = pages[0].get("timeZone") or time_zone
+        tz = _zone(time_zone)
+        upserted, removed, changes = [], [], {}
+        with self._conn:
+            if full:
+                self._conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+            for page in pages:
+                for event in page.get("items", []):
+                    if event.get("status") == "cancelled" or "start" not in event:
+                        removed.append(event["id"])
+                        changes[event["id"]] = None
+                        self._conn.execute("DELETE FROM events WHERE calendar_id = ? AND id = ?",
+                                           (calendar_id, event["id"]))
+                        continue
+                    start, end = _timestamp(event["start"], tz), _timestamp(event["end"], tz)
+                    upserted.append(event)
+                    changes[event["id"]] = (event["id"], start, end, event)
+                    self._write(calendar_id, event, start, end)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, time_zone, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (calendar_id, pages[-1].get("nextSyncToken"), time_zone, self._clock()),
+            )
+
+        index = self._indexes.get(calendar_id)
+        if full:
+            self._indexes[calendar_id] = IntervalIndex(row for row in changes.values() if row)
+        elif index is not None:
+            for event_id, row in changes.items():
+                if row is None:
+                    index.discard(event_id)
+                else:
+                    index.add(*row)
+        return SyncResult(full, upserted, removed)
+
+    def put(self, event: dict, calendar_id: str = 'primary'):
+        """Record an event written through the API, so reads see it before the next sync."""
+        with self._lock:
+            state = self._state(calendar_id)
+            tz = _zone(state[1] if state else None)
+            start, end = _timestamp(event["start"], tz), _timestamp(event["end"], tz)
+            with self._conn:
+                self._write(calendar_id, event, start, end)
+            index = self._indexes.get(calendar_id)
+            if index is not None:
+                index.add(event["id"], start, end, event)
+
+    def discard(self, event_ids, calendar_id: str = 'primary'):
+        """Forget events deleted through the API, along with the instances of any deleted series."""
+        event_ids = list(event_ids)
+        with self._lock:
+            gone = []
+            # Stay well under SQLite's limit on bound parameters.
+            for i in range(0, len(event_ids), 400):
+                ids = event_ids[i:i + 400]
+                marks = ",".join("?" * len(ids))
+                gone.extend(event_id for (event_id,) in self._conn.execute(
+                    f"SELECT id FROM events WHERE calendar_id = ? "
+                    f"AND (id IN ({marks}) OR recurring_event_id IN ({marks}))",
+                    (calendar_id, *ids, *ids)))
+            with self._conn:
+                self._conn.executemany("DELETE FROM events WHERE calendar_id = ? AND id = ?",
+                                       [(calendar_id, event_id) for event_id in gone])
+            index = self._indexes.get(calendar_id)
+            if index is not None:
+                for event_id in gone:
+                    index.discard(event_id)
+
+    def invalidate(self, calendar_id: str = 'primary'):
+        """Mark a calendar stale after a change the mirror cannot apply locally, so the next read syncs."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE sync_state SET synced_at = ? WHERE calendar_id = ?",
+                               (float("-inf"), calendar_id))
+
+    def _write(self, calendar_id, event, start, end):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events "
+            "(calendar_id, id, summary, start_ts, end_ts, recurring_event_id, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (calendar_id, event["id"], event.get("summary"), start, end,
+             event.get("recurringEventId"), json.dumps(event)),
+        )
+
+    def _state(self, calendar_id):
+        return self._conn.execute("SELECT sync_token, time_zone, synced_at FROM sync_state WHERE calendar_id = ?",
+                                  (calendar_id,)).fetchone()
+
+    def age(self, calendar_id: str = 'primary'):
+        """Seconds since the last sync, or None if the calendar was never synced."""
+        with self._lock:
+            state = self._state(calendar_id)
+        return None if state is None else self._clock() - state[2]
+
+    def ensure_fresh(self, service, calendar_id: str = 'primary', max_staleness: float = None):
+        """Sync if the last sync is older than ``max_staleness`` seconds; returns the SyncResult or None."""
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        age = self.age(calendar_id)
+        if age is not None and age <= limit:
+            return None
+        return self.sync(service, calendar_id)
+
+    # ---- queries ----
+
+    def index(self, calendar_id: str = 'primary') -> IntervalIndex:
+        """The interval index over a calendar's events, loaded from the table on first use."""
+        with self._lock:
+            index = self._indexes.get(calendar_id)
+            if index is None:
+                rows = self._conn.execute("SELECT id, start_ts, end_ts, body FROM events WHERE calendar_id = ?",
+                                          (calendar_id,))
+                index = IntervalIndex((event_id, start, end, json.loads(body)) for event_id, start, end, body in rows)
+                self._indexes[calendar_id] = index
+            return index
+
+    def query(self, calendar_id: str = 'primary', time_min=None, time_max=None, title: str = None):
+        """Events overlapping [time_min, time_max), in start order; ``title`` matches summaries case-insensitively.
+
+        The returned event dicts are shared with the index; treat them as read-only.
+        """
+        with self._lock:
+            events = self.index(calendar_id).window(_to_timestamp(time_min), _to_timestamp(time_max))
+        if title:
+            needle = title.casefold()
+            events = [e for e in events if needle in (e.get("summary") or "").casefold()]
+        return events
+
+    def busy(self, calendar_id: str = 'primary', start=None, end=None):
+        """Events that block ``[start, end)``: overlapping, not transparent and not declined.
+
+        Date-only bounds are read in the calendar's time zone; an all-day range whose
+        end equals its start covers that whole day.
+        """
+        with self._lock:
+            state = self._state(calendar_id)
+            tz = _zone(state[1] if state else None)
+            lo, hi = _to_timestamp(start, tz), _to_timestamp(end, tz)
+            if hi is not None and lo is not None and hi <= lo and len(str(end)) == 10:
+                hi = lo + 86400
+            events = self.index(calendar_id).window(lo, hi)
+        return [e for e in events if _is_busy(e)]
+
+    def count(self, calendar_id: str = 'primary') -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events WHERE calendar_id = ?",
+                                      (calendar_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._indexes.clear()
+            self._conn.close()
+
+
+_event_mirror = None
+_event_mirror_lock = threading.Lock()
+
+
+def get_event_mirror():
+    """Return the process-wide mirror, or None when ``EVENT_MIRROR`` is off."""
+    global _event_mirror
+
+    if not Config.EVENT_MIRROR:
+        return None
+    with _event_mirror_lock:
+        if _event_mirror is None:
+            _event_mirror = EventMirror(Config.EVENT_MIRROR_PATH, max_staleness=Config.EVENT_MIRROR_MAX_STALENESS)
+        return _event_mirror
@@ -1,13 +1,21 @@
+import os
 import re
-from datetime import timedelta, datetime
+import threading
+from collections import OrderedDict, deque
+from datetime import timedelta, datetime, time
+from itertools import islice
+from time import perf_counter
+from typing import NamedTuple, Optional
 from . import datetime_utils
-import dateparser
-import parsedatetime
+from config import Config
+from metrics import metrics
 from zoneinfo import ZoneInfo
 from dateutil import tz
 
 
-_cal = parsedatetime.Calendar()
+# parsedatetime and dateparser are slow to import (dateparser especially), so
+# they are loaded the first time a phrase actually reaches them.
+_pdt_calendar = None
 local_tz = tz.tzlocal()
 DP_SETTINGS = {
     "TIMEZONE": "America/Denver",
@@ -16,167 +24,877 @@ DP_SETTINGS = {
 }
 
 
+# ---- date resolution cache ----
+# Phrases whose result moves with the clock rather than the calendar day.
+_CLOCK_RELATIVE_RE = re.compile(r'\b(?:now|ago|hours?|hrs?|minutes?|mins?|seconds?|secs?)\b')
+# Phrases that name a calendar date outright, so their result does not depend on today.
+_ABSOLUTE_DATE_RE = re.compile(
+    r'\b\d{4}-\d{1,2}-\d{1,2}\b|\b\d{1,2}/\d{1,2}/\d{4}\b'
+    r'|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}\b'
+)
+_RELATIVE_WORD_RE = re.compile(r'\b(?:next|last|this|ago|from|after|before|in)\b')
+
+
+class DateCache:
+    """Bounded LRU of resolved date phrases.
+
+    Entries are keyed on the normalized phrase, the local UTC offset and the
+    reference (local) date. Results are stored in one of three shapes so a hit
+    returns what the backends would return now:
+
+    * ``fixed``  - the datetime itself (or None for an unparseable phrase)
+    * ``clock``  - a date whose time of day was taken from the clock ("friday")
+    * ``offset`` - a distance from now ("in 2 hours")
+
+    Phrases that name an explicit date are keyed without a reference date and
+    survive a change of day; all other entries are dropped once the local day
+    rolls over.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._day = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _expire(self, today):
+        """Drop entries resolved against an earlier day. Caller holds the lock."""
+        stale = [k for k in self._entries if k[2] is not None and k[2] != today]
+        for k in stale:
+            del self._entries[k]
+        self.expirations += len(stale)
+        self._day = today
+
+    def resolve(self, text: str, resolver, now: Optional[datetime] = None):
+        """Return ``resolver(text, now)`` from the cache, computing and storing it on a miss."""
+        if now is None:
+            now = datetime.now(local_tz)
+        now = now.replace(microsecond=0)
+        if self.maxsize <= 0:
+            return resolver(text, now)
+
+        norm = self.normalize(text)
+        today = now.date()
+        tz_key = now.utcoffset()
+        rel_key = (norm, tz_key, today)
+        abs_key = (norm, tz_key, None)
+
+        with self._lock:
+            if self._day != today:
+                self._expire(today)
+            for key in (rel_key, abs_key):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._rehydrate(entry, now)
+            self.misses += 1
+
+        result = resolver(text, now)
+        entry = self._classify(norm, result, now)
+        absolute = (entry[0] != "offset" and _ABSOLUTE_DATE_RE.search(norm) is not None
+                    and _RELATIVE_WORD_RE.search(norm) is None)
+
+        with self._lock:
+            self._entries[abs_key if absolute else rel_key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    @staticmethod
+    def _classify(norm, result, now):
+        if result is None:
+            return ("fixed", None)
+        if _CLOCK_RELATIVE_RE.search(norm):
+            return ("offset", result - now, result.tzinfo)
+        if result.time() == now.astimezone(result.tzinfo).time():
+            return ("clock", result)
+        return ("fixed", result)
+
+    @staticmethod
+    def _rehydrate(entry, now):
+        kind = entry[0]
+        if kind == "fixed":
+            return entry[1]
+        if kind == "clock":
+            value = entry[1]
+            clock = now.astimezone(value.tzinfo)
+            return value.replace(hour=clock.hour, minute=clock.minute, second=clock.second)
+        return (now + entry[1]).astimezone(entry[2])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._day = None
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+date_cache = DateCache(Config.DATE_CACHE_SIZE)
+
+
+# ---- fast path for common phrase shapes ----
+_WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tuesday": 1, "wed": 2, "wednesday": 2,
+    "thu": 3, "thursday": 3, "fri": 4, "friday": 4, "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+_FAST_DATE_RE = re.compile(
+    r'(?:(?P<rel>today|tomorrow)'
+    r'|(?P<next>next\s+)?(?P<wd>' + '|'.join(sorted(_WEEKDAYS, key=len, reverse=True)) + r')'
+    r'|(?P<y>\d{4})-(?P<mo>\d{1,2})-(?P<d>\d{1,2}))'
+    r'(?:\s+at\s+(?P<time>.+))?',
+    re.IGNORECASE
+)
+_FAST_TIME_RE = re.compile(
+    r'(?P<h>\d{1,2})(?::(?P<m>\d{2}))?\s*(?P<ap>[ap]m)'
+    r'|(?P<h24>\d{1,2}):(?P<m24>\d{2})'
+    r'|(?P<word>noon|midnight)',
+    re.IGNORECASE
+)
+_FAST_AT_RE = re.compile(r'at\s+', re.IGNORECASE)
+_DEFAULT_HOUR = 9  # parsedatetime's time of day for a bare relative date
+
+
+class FastDateResolver:
+    """Deterministic resolver for the phrase shapes most commands use:
+
+    today / tomorrow / <weekday> / next <weekday> / YYYY-MM-DD, each optionally
+    followed by "at <time>", or a bare "[at] <time>" such as 3pm, 10:30am,
+    14:00, noon or midnight. Results match what parsedatetime returns for the
+    same phrase; anything else is a miss and goes to the general backends.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _time(text):
+        """Return (hour, minute) for a time phrase, or None."""
+        t = _FAST_TIME_RE.fullmatch(text)
+        if not t:
+            return None
+        if t.group('word'):
+            return (12, 0) if t.group('word').lower() == "noon" else (0, 0)
+        if t.group('ap'):
+            hour, minute = int(t.group('h')), int(t.group('m') or 0)
+            if not 1 <= hour <= 12 or minute > 59:
+                return None
+            return hour % 12 + (12 if t.group('ap').lower() == "pm" else 0), minute
+        hour, minute = int(t.group('h24')), int(t.group('m24'))
+        if hour > 23 or minute > 59:
+            return None
+        return hour, minute
+
+    def _resolve(self, text, now):
+        text = text.strip()
+        m = _FAST_DATE_RE.fullmatch(text)
+        if not m:
+            a = _FAST_AT_RE.match(text)
+            hm = self._time(text[a.end():] if a else text)
+            if hm is None:
+                return None
+            return now.replace(hour=hm[0], minute=hm[1], second=0)
+
+        today = now.date()
+        keeps_clock = False
+        if m.group('rel'):
+            day = today + timedelta(days=1 if m.group('rel').lower() == "tomorrow" else 0)
+        elif m.group('wd'):
+            target = _WEEKDAYS[m.group('wd').lower()]
+            if m.group('next'):
+                # the named day in the following Monday-to-Sunday week
+                day = today + timedelta(days=7 - today.weekday() + target)
+            else:
+                day = today + timedelta(days=(target - today.weekday()) % 7 or 7)
+                keeps_clock = True
+        else:
+            try:
+                day = datetime(int(m.group('y')), int(m.group('mo')), int(m.group('d'))).date()
+            except ValueError:
+                return None
+            keeps_clock = True
+
+        if m.group('time'):
+            hm = self._time(m.group('time'))
+            if hm is None:
+                return None
+        elif keeps_clock:
+            hm = (now.hour, now.minute, now.second)
+        else:
+            hm = (_DEFAULT_HOUR, 0)
+        return datetime.combine(day, time(*hm), tzinfo=now.tzinfo)
+
+    def resolve(self, text, now):
+        """Return the datetime for ``text`` relative to ``now``, or None on a miss."""
+        result = self._resolve(text, now)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+fast_dates = FastDateResolver()
+
+
+# ---- date backends ----
+class DateBackend:
+    """One way of turning a phrase into a datetime, with call statistics."""
+
+    def __init__(self, name: str, func, group=None):
+        self.name = name
+        self.func = func
+        self.group = group
+        self.calls = 0
+        self.successes = 0
+        self.total_time = 0.0
+
+    def __call__(self, text, now):
+        started = perf_counter()
+        result = self.func(text, now)
+        elapsed = perf_counter() - started
+        self.record(elapsed, result is not None)
+        metrics.observe("date." + self.name, elapsed)
+        return result
+
+    def record(self, elapsed: float, success: bool):
+        self.calls += 1
+        self.successes += success
+        self.total_time += elapsed
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.calls if self.calls else 0.0
+
+    @property
+    def cost(self) -> float:
+        """Expected time spent per successful resolution (smoothed success rate)."""
+        return self.mean_latency * (self.calls + 2) / (self.successes + 1)
+
+
+class DateBackendRegistry:
+    """Ordered chain of date backends; the first non-None result wins.
+
+    Every ``reorder_every`` resolutions the chain is re-sorted so backends with
+    the lowest expected cost per success run first. A backend with fewer than
+    ``min_calls`` calls keeps its place until it has enough data.
+
+    Backends can disagree on the same phrase (dateparser reads "friday 3pm" as
+    last Friday where parsedatetime reads next Friday), so a backend only ever
+    trades places with backends of its own ``group``: backends that agree
+    wherever both succeed. Backends registered without a group share one.
+    """
+
+    def __init__(self, reorder_every: int = 100, min_calls: int = 20):
+        self.reorder_every = reorder_every
+        self.min_calls = min_calls
+        self._backends = []
+        self._resolutions = 0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, func, position: Optional[int] = None, group=None) -> DateBackend:
+        backend = DateBackend(name, func, group)
+        with self._lock:
+            backends = [b for b in self._backends if b.name != name]
+            backends.insert(len(backends) if position is None else position, backend)
+            self._backends = backends
+        return backend
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._backends = [b for b in self._backends if b.name != name]
+
+    @property
+    def order(self) -> list:
+        return [b.name for b in self._backends]
+
+    def reorder(self):
+        """Sort backends with enough samples by cost within their group, leaving the others in place."""
+        with self._lock:
+            backends = list(self._backends)
+            ranked = {}
+            for b in sorted((b for b in backends if b.calls >= self.min_calls), key=lambda b: b.cost):
+                ranked.setdefault(b.group, []).append(b)
+            ranked = {group: iter(members) for group, members in ranked.items()}
+            self._backends = [next(ranked[b.group]) if b.calls >= self.min_calls else b for b in backends]
+
+    def resolve(self, text, now):
+        result = None
+        for backend in self._backends:
+            result = backend(text, now)
+            if result is not None:
+                break
+        self._resolutions += 1
+        if self.reorder_every and self._resolutions % self.reorder_every == 0:
+            self.reorder()
+        return result
+
+    def stats(self) -> list:
+        """Per-backend calls, success rate and mean latency (microseconds), in chain order."""
+        return [
+            {
+                "name": b.name,
+                "calls": b.calls,
+                "success_rate": b.success_rate,
+                "mean_latency_us": b.mean_latency * 1e6,
+            }
+            for b in self._backends
+        ]
+
+
+def _get_pdt_calendar():
+    """Return the shared parsedatetime.Calendar, creating it on first use."""
+    global _pdt_calendar
+
+    if _pdt_calendar is None:
+        import parsedatetime
+        _pdt_calendar = parsedatetime.Calendar()
+
+    return _pdt_calendar
+
+
+def _parsedatetime_backend(text, now):
+    # great for relative phrases
+    dt, status = _get_pdt_calendar().parseDT(text, sourceTime=now, tzinfo=local_tz)
+    return dt if status > 0 else None
+
+
+def _dateparser_backend(text, now):
+    import dateparser
+    dt = dateparser.parse(text, languages=Config.DATE_LANGUAGES, settings=DP_SETTINGS)
+    if dt and dt.tzinfo is None:
+        return dt.replace(tzinfo=local_tz)
+    return dt
+
+
+date_backends = DateBackendRegistry()
+date_backends.register("fast_path", fast_dates.resolve, group="relative")
+date_backends.register("parsedatetime", _parsedatetime_backend, group="relative")
+# dateparser answers some phrases differently, so it stays the last fallback.
+date_backends.register("dateparser", _dateparser_backend, group="dateparser")
+
+
+def _resolve_datetime(text, now):
+    return date_backends.resolve(text, now)
+
+
 def extract_datetime(text):
+    """Resolve a date/time phrase to a tz-aware datetime (or None), memoized in ``date_cache``."""
+    return date_cache.resolve(text, _resolve_datetime)
 
-    # try parsedatetime first (great for relative)
-    dt, status = _cal.parseDT(text, tzinfo=local_tz)
-    if status > 0:
-        return dt
-    # fallback to dateparser
-    dt2 = dateparser.parse(text, settings=DP_SETTINGS)
-    if dt2 and dt2.tzinfo is None:
-        return dt2.replace(tzinfo=local_tz)
-    return dt2
 
+# ---- lexer tables ----
+# Every word that can start a token the parser cares about, mapped to the token
+# kinds it may start. One scan for these words replaces a regex search per token
+# kind; multi-word tokens are confirmed with an anchored match at their lead word.
+_INTENTS = ("create", "make", "add", "schedule", "remove", "delete", "destroy", "view", "see", "look", "find")
+_OBJECTS = ("event", "task", "events", "tasks")
+_SCOPE_WORDS = ("all", "everything", "every")
+_SPLIT_WORDS = ("on", "at", "from", "between", "in", "for")
+_TITLE_LEADS = ("call", "called", "named", "name", "titled", "title")
+_FORCE_WORDS = ("force", "anyway")
+_FORCE_LEADS = ("i", "im", "yes")
+_DRY_RUN_WORDS = ("preview", "dry")
 
-def parse_input(user_input):
+_KEYWORD_KINDS = {}
+for _kind, _words in (("intention", _INTENTS), ("object", _OBJECTS), ("scope", _SCOPE_WORDS),
+                      ("split", _SPLIT_WORDS), ("title", _TITLE_LEADS), ("force", _FORCE_WORDS),
+                      ("force_phrase", _FORCE_LEADS), ("dry_run", _DRY_RUN_WORDS), ("free", ("free",)),
+                      ("week", ("a",))):
+    for _word in _words:
+        _KEYWORD_KINDS.setdefault(_word, []).append(_kind)
+del _kind, _words, _word
 
-    intent_re = re.compile(
-        r'\b(?P<intention>create|make|add|schedule|remove|delete|destroy|view|see|look)\b',
-        re.IGNORECASE
-    )
+_KEYWORD_ALTERNATION = r'\b(?:' + '|'.join(sorted(_KEYWORD_KINDS, key=len, reverse=True)) + r')\b'
+# ASCII input is scanned lower-cased with a case-sensitive pattern, which is markedly
+# cheaper than IGNORECASE; anything else keeps the case-insensitive scan.
+_KEYWORD_RE = re.compile(_KEYWORD_ALTERNATION)
+_KEYWORD_RE_I = re.compile(_KEYWORD_ALTERNATION, re.IGNORECASE)
+_TITLE_RE = re.compile(
+    r'(?:call(?:ed)?\s+it|called|named|name\s+it|titled|title\s+it|name\sof|title\sof)\b'  # trigger
+    r'\s*'
+    r'(?P<title>'
+    r'"[^"]+"|'  # double‑quoted text
+    r"\'[^\']+\'|"  # single‑quoted text
+    r'\w+'  # or a single word
+    r')',
+    re.IGNORECASE
+)
+_FORCE_PHRASE_RE = re.compile(r'(?:i[’\']?m sure|yes,? delete)\b', re.IGNORECASE)
+# "preview"/"dry run" asks for a dry run only at the start or the very end of the command,
+# never as a word of the title ("delete the product preview event").
+_DRY_RUN_RE = re.compile(r'(?:preview|dry[\s-]?run)\b', re.IGNORECASE)
+_COMMAND_END_RE = re.compile(r'[\s.!?]*$')
+# "free" is the free-time object only in a free-time phrase ("am I free", "2 hours free",
+# "free time", "free for an hour", "a free 30 min slot"), not as a word in a title
+# ("schedule free consultation event").
+_FREE_BEFORE_RE = re.compile(
+    r'(?:\b(?:am\s+i|are\s+(?:we|you|they))|\b(?:\d+(?:\.\d+)?|an?|half\s+an)\s*(?:h|hrs?|hours?|mins?|minutes?))\s+$',
+    re.IGNORECASE)
+_FREE_AFTER_RE = re.compile(
+    r'\s*(?:$|[?.!]|(?:time|slots?|window)\b|for\s+(?:an?|half|\d)|[\d.]+\s*\w*\s+slots?\b)',
+    re.IGNORECASE)
+_WEEK_RE = re.compile(r'a\s+week\b', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_RANGE_RE = re.compile(
+    r'from\s+(?P<s>[\d:\sapm]+)\s+(?:to|until|-)\s+(?P<e>[\d:\sapm]+)',
+    re.IGNORECASE
+)
+_AT_RE = re.compile(r'\bat\s+(?P<s>[\d:\sapm]+)', re.IGNORECASE)
 
-    intent_m = intent_re.search(user_input)
-    if intent_m:
-        intention = intent_m.group('intention')
-    else:
-        intention = input("What are you trying to do? ")
 
-    object_re = re.compile(
-        r'\b(?P<object>event|task|events|tasks)\b',
-        re.IGNORECASE
-    )
+class Lexed(NamedTuple):
+    """Raw pieces of a command, before any date resolution."""
+    intention: Optional[str]
+    object: Optional[str]
+    title: Optional[str]
+    when_text: Optional[str]
+    start_time: Optional[str]
+    end_time: Optional[str]
+    scope: Optional[str]
+    force: bool
+    dry_run: bool = False
+
+
+def _split_when(text, start, end):
+    """Return the date phrase following the split word at ``text[start:end]``, if it qualifies.
 
-    object_m = object_re.search(user_input)
-    if object_m:
-        obj = object_m.group('object')
+    A split word must be surrounded by whitespace and have at least one character on
+    the first line before it; the phrase runs from the next word to the end of the line.
+    """
+    if start < 2 or not text[start - 1].isspace():
+        return None
+    ws_start = start - 1
+    while ws_start > 0 and text[ws_start - 1].isspace():
+        ws_start -= 1
+    if "\n" in text[:max(ws_start, 1)]:
+        return None
+
+    if end - start == 1 and text[start] in "aA":
+        if not _WEEK_RE.match(text, start):
+            return None
+        phrase_start = start
     else:
-        obj = input("Is this an event, appointment, or task? ")
-
-    name_re = re.compile(
-        r'\b(?:call(?:ed)?\s+it|called|named|name\s+it|titled|title\s+it|name\sof|title\sof)\b'  # trigger
-        r'\s*'
-        r'(?P<title>'
-        r'"[^"]+"|'  # double‑quoted text
-        r"\'[^\']+\'|"  # single‑quoted text
-        r'\w+'  # or a single word
-        r')',
-        re.IGNORECASE
-    )
+        ws = _WS_RE.match(text, end)
+        if not ws:
+            return None
+        phrase_start = ws.end()
+        if phrase_start >= len(text):
+            # only whitespace follows; it still counts as an (empty) phrase unless it is all newlines
+            return "" if text[end + 1:].strip("\n") else None
+    line_end = text.find("\n", phrase_start)
+    return text[phrase_start:line_end if line_end != -1 else len(text)].strip()
 
-    name_m = name_re.search(user_input)
-    title = None
-    if name_m:
-        raw = name_m.group('title')  # e.g.  "'test'"
-        title = raw.strip('"\'')
-
-    split_re = re.compile(r'(.+?)\s+(?:(on|at|from|between|in|for)\s+|(?=\ba\s+week\b))(.+)', re.IGNORECASE)
-    m = split_re.match(user_input)
-    if m:
-        # summary = m.group(1).strip()
-        when_text = m.group(3).strip()
+
+def lex_command(user_input):
+    """Pull intention, object, title, date phrase, time range, scope and force out of
+    ``user_input`` in one scan over the precompiled keyword table."""
+    if user_input.isascii():
+        hits = _KEYWORD_RE.finditer(user_input.lower())
     else:
-        # summary = user_input.strip()
-        when_text = None
+        hits = _KEYWORD_RE_I.finditer(user_input)
+
+    found = {}
+    when_text = None
+    split_done = False
+    title_end = 0
+
+    for m in hits:
+        word = user_input[m.start():m.end()]
+        for kind in _KEYWORD_KINDS.get(word.casefold(), ()):
+            if kind in found:
+                continue
+            if kind in ("intention", "object"):
+                found[kind] = word
+            elif kind == "scope":
+                found[kind] = "all"
+            elif kind == "force":
+                found[kind] = True
+            elif kind == "force_phrase":
+                if _FORCE_PHRASE_RE.match(user_input, m.start()):
+                    found["force"] = True
+            elif kind == "free":
+                if "object" not in found and (_FREE_AFTER_RE.match(user_input, m.end())
+                                              or _FREE_BEFORE_RE.search(user_input, 0, m.start())):
+                    found["object"] = word
+            elif kind == "dry_run":
+                d = _DRY_RUN_RE.match(user_input, m.start())
+                if d and m.start() >= title_end and (not user_input[:m.start()].strip()
+                                                     or _COMMAND_END_RE.match(user_input, d.end())):
+                    found[kind] = True
+            elif kind == "title":
+                t = _TITLE_RE.match(user_input, m.start())
+                if t:
+                    found[kind] = t.group('title').strip('"\'')
+                    title_end = t.end()
+            elif not split_done:  # "split" or "week"
+                phrase = _split_when(user_input, m.start(), m.end())
+                if phrase is not None:
+                    when_text = phrase
+                    split_done = True
 
     start_time = end_time = None
     if when_text:
-        range_re = re.compile(
-            r'from\s+(?P<s>[\d:\sapm]+)\s+(?:to|until|-)\s+(?P<e>[\d:\sapm]+)',
-            re.IGNORECASE
-        )
-        r = range_re.search(when_text)
+        r = _RANGE_RE.search(when_text)
         if r:
             start_time = r.group("s").strip()
             end_time = r.group("e").strip()
             when_text = when_text[:r.start()].strip()
-
         else:
-            at_re = re.compile(r'\bat\s+(?P<s>[\d:\sapm]+)', re.IGNORECASE)
-            a = at_re.search(when_text)
+            a = _AT_RE.search(when_text)
             if a:
                 start_time = a.group("s").strip()
                 when_text = when_text[:a.start()].strip()
 
-    # if title:
-    #     summary = title
+    return Lexed(
+        intention=found.get("intention"),
+        object=found.get("object"),
+        title=found.get("title"),
+        when_text=when_text,
+        start_time=start_time,
+        end_time=end_time,
+        scope=found.get("scope"),
+        force=found.get("force", False),
+        dry_run=found.get("dry_run", False),
+    )
 
-    # Parse the date
-    dt_date = extract_datetime(when_text) if when_text else None
 
-    time_min = time_max = None
-    if dt_date and start_time is None and end_time is None:
-        time_min, time_max = datetime_utils.day_bounds(dt_date)
+_CREATE_INTENTS = ("create", "make", "add", "schedule")
 
+# Follow-up question for each field a command can be missing, in asking order.
+PROMPTS = {
+    'intention': "What are you trying to do? ",
+    'object': "Is this an event, appointment, or task? ",
+    'title': "What should this event be called? ",
+    'start': "When should it start? ",
+    'end': "When should it end? ",
+}
 
 
-    # If date only but you have a start time, merge them
-    if dt_date and start_time:
-        t = extract_datetime(start_time)
-        if t:
-            dt_date = dt_date.replace(hour=t.hour, minute=t.minute)
+class _Unset:
+    """Marker for a lazily computed field that has not been computed yet."""
 
-    # Build start/end datetimes
-    start_dt = dt_date
-    if start_time and not when_text:
-        # if no date part, maybe the entire phrase was a time
-        start_dt = extract_datetime(start_time)
+    def __repr__(self):
+        return "<unset>"
 
-    if end_time:
-        t2 = extract_datetime(end_time)
-        # merge date if needed
-        if dt_date and t2:
-            end_dt = dt_date.replace(hour=t2.hour, minute=t2.minute)
-        elif t2:
-            end_dt = t2
-        else:
+    def __reduce__(self):
+        return "_UNSET"
+
+
+_UNSET = _Unset()
+_setattr = object.__setattr__
+
+
+class ParsedCommand:
+    """Immutable result of parsing one command.
+
+    Holds the lexed pieces of the command plus any start/end the user supplied
+    in a follow-up. Date-dependent fields (``date``, ``start_dt``, ``end_dt``,
+    the RFC3339 ``start``/``end`` and ``day_bounds``) are resolved on first
+    access and remembered, so each phrase is resolved at most once per command.
+
+    ``get()`` and ``[]`` accept the keys of the old ``cal_info`` dict, so code
+    written against that dict keeps working.
+    """
+
+    _FIELDS = ('intention', 'object', 'title', 'scope', 'force', 'raw_text',
+               'when_text', 'start_time', 'end_time', 'given_start', 'given_end', 'dry_run')
+    _LAZY = ('_date', '_parsed_start', '_parsed_end', '_bounds', '_day_bounds')
+    _KEYS = ('intention', 'object', 'title', 'start', 'end', 'date', 'scope', 'force', 'raw_text')
+    __slots__ = _FIELDS + _LAZY
+
+    def __init__(self, intention=None, object=None, title=None, scope=None, force=False,
+                 raw_text='', when_text=None, start_time=None, end_time=None,
+                 given_start=None, given_end=None, dry_run=False):
+        for name, value in zip(self._FIELDS, (intention, object, title, scope, force, raw_text,
+                                              when_text, start_time, end_time, given_start, given_end,
+                                              dry_run)):
+            _setattr(self, name, value)
+        for name in self._LAZY:
+            _setattr(self, name, _UNSET)
+
+    @classmethod
+    def from_lexed(cls, lexed: Lexed, raw_text: str) -> 'ParsedCommand':
+        return cls(intention=lexed.intention, object=lexed.object, title=lexed.title,
+                   scope=lexed.scope, force=lexed.force, raw_text=raw_text,
+                   when_text=lexed.when_text, start_time=lexed.start_time, end_time=lexed.end_time,
+                   dry_run=lexed.dry_run)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            _setattr(self, name, value)
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedCommand):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._FIELDS)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, f) for f in self._FIELDS))
+
+    def __repr__(self):
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._FIELDS if getattr(self, f) is not None)
+        return f"{type(self).__name__}({fields})"
+
+    def replace(self, **changes) -> 'ParsedCommand':
+        """Return a copy with some fields changed; derived fields are recomputed lazily."""
+        values = {f: getattr(self, f) for f in self._FIELDS}
+        values.update(changes)
+        return type(self)(**values)
+
+    def _lazy(self, slot, compute):
+        value = getattr(self, slot)
+        if value is _UNSET:
+            value = compute()
+            _setattr(self, slot, value)
+        return value
+
+    # ---- derived fields ----
+    @property
+    def is_create(self) -> bool:
+        return self.intention is not None and self.intention.lower() in _CREATE_INTENTS
+
+    @property
+    def is_free_time(self) -> bool:
+        """True for a free-time request ("find free time tomorrow", "when am I free")."""
+        return self.object is not None and self.object.lower() == "free"
+
+    @property
+    def is_date_only(self) -> bool:
+        """True when the command named a day but no time, so it spans that whole day."""
+        return self.start_time is None and self.end_time is None
+
+    @property
+    def date(self) -> Optional[datetime]:
+        """The date phrase resolved on its own (no time-of-day merged in)."""
+        return self._lazy('_date', lambda: extract_datetime(self.when_text) if self.when_text else None)
+
+    @property
+    def day_bounds(self) -> Optional[tuple]:
+        """RFC3339 start/end of the named day, or None without a date."""
+        return self._lazy('_day_bounds', lambda: datetime_utils.day_bounds(self.date) if self.date else None)
+
+    def _compute_start(self):
+        dt_date = self.date
+        if self.start_time and not self.when_text:
+            # if no date part, maybe the entire phrase was a time
+            return extract_datetime(self.start_time)
+        # If date only but you have a start time, merge them
+        if dt_date and self.start_time:
+            t = extract_datetime(self.start_time)
+            if t:
+                return dt_date.replace(hour=t.hour, minute=t.minute)
+        return dt_date
+
+    def _compute_end(self):
+        end_dt = None
+        if self.end_time:
+            t2 = extract_datetime(self.end_time)
+            # merge date if needed
+            if self.date and t2:
+                end_dt = self.date.replace(hour=t2.hour, minute=t2.minute)
+            elif t2:
+                end_dt = t2
+        start_dt = self._lazy('_parsed_start', self._compute_start)
+        if end_dt is None and start_dt:
             end_dt = start_dt + timedelta(hours=1)
-    else:
-        end_dt = (start_dt + timedelta(hours=1)) if start_dt else None
-
-    scope = "all" if re.search(r'\b(all|everything|every)\b', user_input, re.IGNORECASE) else None
-    force = bool(re.search(r'\b(force|anyway|i[’\']?m sure|yes,? delete)\b', user_input, re.IGNORECASE))
-
-    is_create = intention.lower() in ("create", "make", "add", "schedule")
-    if is_create:
-        # if not summary:
-        if not title:
-            title = input("What should this event be called? ")
-            # summary = input("What should this event be called? ")
-        if not start_dt:
-            raw = input("When should it start? ")
-            start_dt = extract_datetime(raw)
-        if not end_dt:
-            raw = input("When should it end? ")
-            end_dt = extract_datetime(raw)
-
-    dt_date = extract_datetime(when_text) if when_text else None
-
-    if start_time is None and end_time is None:
-        cal_info = {
-            'intention': intention,
-            'object': obj,
-            'title': title,
-            # 'title': summary,
-            'start': time_min,
-            'end': time_max,
-            'date': dt_date,
-            'scope': scope,
-            'force': force,
-            'raw_text': user_input
-        }
-    else:
-        cal_info = {
-            'intention': intention,
-            'object': obj,
-            'title': title,
-            # 'title': summary,
-            'start': start_dt.isoformat(),
-            'end': end_dt.isoformat(),
-            'date': dt_date,
-            'scope': scope,
-            'force': force,
-            'raw_text': user_input
-        }
+        return end_dt
+
+    @property
+    def start_dt(self) -> Optional[datetime]:
+        if self.given_start is not None:
+            return self.given_start
+        return self._lazy('_parsed_start', self._compute_start)
+
+    @property
+    def end_dt(self) -> Optional[datetime]:
+        if self.given_end is not None:
+            return self.given_end
+        return self._lazy('_parsed_end', self._compute_end)
+
+    def _compute_bounds(self):
+        if self.is_date_only:
+            start, end = self.day_bounds or (None, None)
+        else:
+            start_dt = self._lazy('_parsed_start', self._compute_start)
+            end_dt = self._lazy('_parsed_end', self._compute_end)
+            start = start_dt.isoformat() if start_dt else None
+            end = end_dt.isoformat() if end_dt else None
+        if self.given_start is not None:
+            start = self.given_start.isoformat()
+        if self.given_end is not None:
+            end = self.given_end.isoformat()
+        return start, end
+
+    @property
+    def rfc3339_bounds(self) -> tuple:
+        """(start, end) as RFC3339 strings: day bounds for a date-only command."""
+        return self._lazy('_bounds', self._compute_bounds)
+
+    @property
+    def start(self) -> Optional[str]:
+        return self.rfc3339_bounds[0]
+
+    @property
+    def end(self) -> Optional[str]:
+        return self.rfc3339_bounds[1]
+
+    def resolve(self) -> 'ParsedCommand':
+        """Resolve every date-dependent field now instead of on first access; returns self."""
+        self.rfc3339_bounds, self.start_dt, self.end_dt
+        return self
+
+    # ---- cal_info compatibility ----
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def as_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self._KEYS}
+
+    def missing_fields(self) -> tuple:
+        """Fields (keys of ``PROMPTS``) that still need an answer, in asking order."""
+        if self.is_free_time:
+            return ()
+        missing = [f for f in ('intention', 'object') if getattr(self, f) is None]
+        if self.is_create:
+            missing += [f for f in ('title', 'start', 'end') if getattr(self, f) is None]
+        return tuple(missing)
+
+
+class ParseResult(NamedTuple):
+    """A parsed command plus the fields the user still has to supply."""
+    command: ParsedCommand
+    missing: tuple
+
+    @classmethod
+    def of(cls, command: ParsedCommand) -> 'ParseResult':
+        return cls(command, command.missing_fields())
+
+    def answer(self, name: str, text: str) -> 'ParseResult':
+        """Return a new result with one missing field filled in from the user's reply.
+
+        Start/end replies are resolved to datetimes; a reply that cannot be
+        resolved leaves the field missing so it can be asked again.
+        """
+        if name in ('start', 'end'):
+            dt = extract_datetime(text)
+            if dt is None:
+                return self
+            return ParseResult.of(self.command.replace(**{'given_' + name: dt}))
+        return ParseResult.of(self.command.replace(**{name: text}))
+
+
+def _parse(user_input):
+    """Build a ParseResult from the command text alone, without prompting."""
+    return ParseResult.of(ParsedCommand.from_lexed(lex_command(user_input), user_input))
+
+
+def parse_input(user_input, interactive: bool = True):
+    """Parse a calendar/task command into a ParsedCommand.
+
+    Interactively (the default) any missing field is asked for with ``input()``.
+    With ``interactive=False`` nothing is read from stdin: a ParseResult is
+    returned and its ``missing`` tuple tells the caller which follow-up
+    questions (see ``PROMPTS``) to ask.
+    """
+    with metrics.span("parse"):
+        result = _parse(user_input)
+    if not interactive:
+        return result
+
+    while result.missing:
+        name = result.missing[0]
+        result = result.answer(name, input(PROMPTS[name]))
+    return result.command
+
+
+def _warm_worker():
+    """Process-pool initializer: load every date backend once per worker."""
+    fast_dates.resolve("tomorrow at 3pm", datetime.now(local_tz))
+    _parsedatetime_backend("a week from now", datetime.now(local_tz))
+    _dateparser_backend("3 days ago", datetime.now(local_tz))
+
+
+def _parse_chunk(chunk):
+    # Date fields are lazy; resolve them here so the date work happens in the worker, not the parent.
+    results = [_parse(text) for text in chunk]
+    for result in results:
+        result.command.resolve()
+    return results
+
+
+def parse_many(utterances, workers: Optional[int] = None, chunk_size: int = 256):
+    """Parse many commands without prompting, yielding a ParseResult per utterance.
+
+    Utterances are read lazily from any iterable and sent to a process pool in
+    chunks of ``chunk_size``; results come back in input order. At most two
+    chunks per worker are in flight, so memory stays bounded however long the
+    input is. ``workers=1`` parses in the calling process.
+    """
+    it = iter(utterances)
+    chunks = iter(lambda: list(islice(it, chunk_size)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
 
-    return cal_info
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+    try:
+        pending = deque(pool.submit(_parse_chunk, c) for c in islice(chunks, workers * 2))
+        while pending:
+            results = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(pool.submit(_parse_chunk, chunk))
+            yield from results
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
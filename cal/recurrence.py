@@ -0,0 +1,232 @@
+"""Local expansion of recurring events.
+
+Listing with ``singleEvents: True`` makes the server expand every series into
+instances, so a daily standup over a year-long window costs hundreds of items
+and several pages. In this mode the list call asks for series masters instead
+(``singleEvents: False``), and each master's RRULE/RDATE/EXDATE lines are
+expanded here with ``dateutil.rrule``, only inside the requested window.
+Payload and paging then grow with the number of series, not the number of
+instances.
+
+Modified and cancelled instances come back from the same list call as
+exception events carrying ``recurringEventId`` and ``originalStartTime``
+(``showDeleted`` is set so cancelled ones are included). An exception replaces
+the instance it was cut from. Expanded instances get the same ids the server
+would give them (``<master id>_<UTC start>``), so they can be deleted or
+updated directly.
+"""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from dateutil.rrule import rrulestr, rruleset
+
+from config import Config
+from metrics import span
+from .fanout import event_start
+
+SERIES_FIELDS = ("items(id,status,summary,start,end,recurrence,recurringEventId,originalStartTime),"
+                 "nextPageToken")
+
+
+def _local_tz():
+    return datetime.now().astimezone().tzinfo
+
+
+def _parse_when(text: str):
+    return datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+def parse_ical_value(value: str, params: dict, default_tz):
+    """One RDATE/EXDATE value: a date, a UTC time, a TZID time or a floating time."""
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d")
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+    tz = ZoneInfo(params["TZID"]) if "TZID" in params else default_tz
+    moment = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    return moment.replace(tzinfo=tz) if tz is not None else moment
+
+
+def _rule_line(line: str, aware: bool) -> str:
+    # dateutil requires a UTC UNTIL when DTSTART is aware and a floating one when it is
+    # naive (all-day series); servers send either form for both.
+    parts = []
+    for part in line.split(";"):
+        if part.upper().startswith("UNTIL="):
+            until = part[6:]
+            if not aware and until.endswith("Z"):
+                part = f"UNTIL={until[:8]}"
+            elif aware and not until.endswith("Z"):
+                part = f"UNTIL={until[:8]}T235959Z" if len(until) == 8 else f"UNTIL={until}Z"
+        parts.append(part)
+    return ";".join(parts)
+
+
+def build_rruleset(recurrence: list, dtstart: datetime) -> rruleset:
+    """An rruleset from a master's ``recurrence`` lines (RRULE, EXRULE, RDATE, EXDATE)."""
+    aware = dtstart.tzinfo is not None
+    rules = rruleset()
+    rules.rdate(dtstart)  # DTSTART is always an instance, even if the RRULE would skip it
+    for line in recurrence:
+        name, _, value = line.partition(":")
+        name, *raw_params = name.split(";")
+        name = name.upper()
+        if name in ("RRULE", "EXRULE"):
+            rule = rrulestr(_rule_line(value, aware), dtstart=dtstart)
+            (rules.rrule if name == "RRULE" else rules.exrule)(rule)
+        elif name in ("RDATE", "EXDATE"):
+            params = dict(p.split("=", 1) for p in raw_params if "=" in p)
+            for item in value.split(","):
+                moment = parse_ical_value(item, params, dtstart.tzinfo)
+                if aware and moment.tzinfo is None:
+                    moment = moment.replace(hour=dtstart.hour, minute=dtstart.minute, tzinfo=dtstart.tzinfo)
+                elif not aware:
+                    moment = moment.replace(tzinfo=None)
+                (rules.rdate if name == "RDATE" else rules.exdate)(moment)
+    return rules
+
+
+def _instance_key(moment: datetime, all_day: bool):
+    return moment.date().isoformat() if all_day else moment.timestamp()
+
+
+def _original_key(original: dict):
+    if "date" in original:
+        return original["date"]
+    return _parse_when(original["dateTime"]).timestamp()
+
+
+def series_rules(master: dict):
+    """(rruleset, dtstart, duration) for a series master; all-day series use naive datetimes."""
+    start, end = master["start"], master["end"]
+    if "date" in start:
+        dtstart = datetime.fromisoformat(start["date"])
+        duration = datetime.fromisoformat(end["date"]) - dtstart
+    else:
+        dtstart = _parse_when(start["dateTime"])
+        if start.get("timeZone"):
+            dtstart = dtstart.astimezone(ZoneInfo(start["timeZone"]))
+        duration = _parse_when(end["dateTime"]) - dtstart
+    return build_rruleset(master.get("recurrence", []), dtstart), dtstart, duration
+
+
+def series_time(master: dict, moment) -> datetime:
+    """``moment`` (an aware datetime or an event start/originalStartTime) comparable with the series' rules."""
+    if isinstance(moment, dict):
+        moment = datetime.fromisoformat(moment["date"]) if "date" in moment else _parse_when(moment["dateTime"])
+    if "date" in master["start"]:
+        # All-day instances are compared in local dates.
+        return moment.astimezone(_local_tz()).replace(tzinfo=None) if moment.tzinfo else moment
+    return moment if moment.tzinfo else moment.replace(tzinfo=_local_tz())
+
+
+def expand(master: dict, window_start: datetime, window_end: datetime, exceptions: dict = None):
+    """
+    Yield the instances of ``master`` that overlap [window_start, window_end).
+
+    window_start/window_end: tz-aware datetimes
+    exceptions: {originalStartTime key: exception event} for this series; those instances
+                are skipped here (the caller yields the exceptions themselves)
+    """
+    exceptions = exceptions or {}
+    start = master["start"]
+    rules, dtstart, duration = series_rules(master)
+    all_day = "date" in start
+    lo, hi = series_time(master, window_start), series_time(master, window_end)
+
+    base = {k: v for k, v in master.items() if k not in ("id", "recurrence", "start", "end")}
+    for moment in rules.between(lo - duration, hi, inc=True):
+        if moment >= hi or moment + duration <= lo:
+            continue
+        if _instance_key(moment, all_day) in exceptions:
+            continue
+        if all_day:
+            suffix = moment.strftime("%Y%m%d")
+            when = {"date": moment.date().isoformat()}
+            until = {"date": (moment + duration).date().isoformat()}
+        else:
+            suffix = moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            when = {"dateTime": moment.isoformat()}
+            until = {"dateTime": (moment + duration).isoformat()}
+            if start.get("timeZone"):
+                when["timeZone"] = until["timeZone"] = start["timeZone"]
+        yield dict(base, id=f"{master['id']}_{suffix}", recurringEventId=master["id"],
+                   originalStartTime=dict(when), start=when, end=until)
+
+
+def _overlaps(event: dict, lo: datetime, hi: datetime) -> bool:
+    if "date" in event["start"]:
+        tz = _local_tz()
+        start = datetime.fromisoformat(event["start"]["date"]).replace(tzinfo=tz)
+        end = datetime.fromisoformat(event["end"]["date"]).replace(tzinfo=tz)
+    else:
+        start, end = _parse_when(event["start"]["dateTime"]), _parse_when(event["end"]["dateTime"])
+    return start < hi and end > lo
+
+
+def iter_series(service, calendar_id: str = 'primary', time_min=None, time_max=None, query=None,
+                page_size: int = None, fields: str = SERIES_FIELDS):
+    """Yield the raw items of a ``singleEvents: False`` listing: masters, single events and exceptions."""
+    params = {
+        "calendarId": calendar_id,
+        "singleEvents": False,
+        "showDeleted": True,       # cancelled exceptions mark removed instances
+        "maxResults": page_size or 2500,
+        "timeMin": time_min,
+        "timeMax": time_max,
+        "fields": fields,
+    }
+    if query:
+        params["q"] = query
+
+    token = None
+    while True:
+        if token:
+            params["pageToken"] = token
+        with span("api.events.list"):
+            response = service.events().list(**params).execute()
+        yield from response.get("items", [])
+        token = response.get("nextPageToken")
+        if not token:
+            return
+
+
+def default_window(time_min=None, time_max=None):
+    """RFC3339 bounds for an expansion: open ends become now and now + Config.DEFAULT_WINDOW_DAYS."""
+    now = datetime.now(_local_tz())
+    if time_min is None:
+        time_min = now.isoformat()
+    if time_max is None:
+        time_max = (_parse_when(time_min) + timedelta(days=Config.DEFAULT_WINDOW_DAYS)).isoformat()
+    return time_min, time_max
+
+
+def iter_expanded(service, calendar_id: str = 'primary', time_min=None, time_max=None, query=None,
+                  page_size: int = None):
+    """
+    Events in [time_min, time_max) in start order, shaped like a ``singleEvents: True`` listing,
+    but with recurring series expanded locally. Open bounds default as in ``default_window``.
+    """
+    time_min, time_max = default_window(time_min, time_max)
+    lo, hi = _parse_when(time_min), _parse_when(time_max)
+
+    masters, exceptions, events = [], {}, []
+    for item in iter_series(service, calendar_id, time_min, time_max, query, page_size):
+        if item.get("recurringEventId"):
+            exceptions.setdefault(item["recurringEventId"], {})[_original_key(item["originalStartTime"])] = item
+        elif item.get("status") == "cancelled":
+            continue
+        elif item.get("recurrence"):
+            masters.append(item)
+        elif "start" in item and _overlaps(item, lo, hi):
+            events.append(item)
+
+    with span("recurrence.expand"):
+        for master in masters:
+            events.extend(expand(master, lo, hi, exceptions.get(master["id"])))
+        for series in exceptions.values():
+            events.extend(e for e in series.values()
+                          if e.get("status") != "cancelled" and "start" in e and _overlaps(e, lo, hi))
+        events.sort(key=event_start)
+    yield from events
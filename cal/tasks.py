@@ -3,6 +3,7 @@
 from datetime import datetime
 from . import datetime_utils
 from exceptions import AssistantError
+from metrics import span
 # from ..exceptions import AssistantError
 
 
@@ -28,7 +29,8 @@ def create_task(service, title: str, date: datetime = None):
             task_body['due'] = due_date
         
         # Get the default task list
-        tasklists = service.tasklists().list().execute()
+        with span("api.tasklists.list"):
+            tasklists = service.tasklists().list().execute()
         tasklist_items = tasklists.get('items', [])
         
         if not tasklist_items:
@@ -36,10 +38,11 @@ def create_task(service, title: str, date: datetime = None):
         
         tasklist_id = tasklist_items[0]['id']
         
-        created_task = service.tasks().insert(
-            tasklist=tasklist_id, 
-            body=task_body
-        ).execute()
+        with span("api.tasks.insert"):
+            created_task = service.tasks().insert(
+                tasklist=tasklist_id, 
+                body=task_body
+            ).execute()
         
         task_title = created_task.get('title')
         # task_link = created_task.get('selfLink', 'Link not available')
@@ -62,7 +65,8 @@ def delete_tasks(service, title: str = None, date: datetime = None):
     """
     try:
         # Get the default task list
-        tasklists = service.tasklists().list().execute()
+        with span("api.tasklists.list"):
+            tasklists = service.tasklists().list().execute()
         tasklist_items = tasklists.get('items', [])
         
         if not tasklist_items:
@@ -71,7 +75,8 @@ def delete_tasks(service, title: str = None, date: datetime = None):
         tasklist_id = tasklist_items[0]['id']
         
         # List tasks
-        tasks = service.tasks().list(tasklist=tasklist_id).execute()
+        with span("api.tasks.list"):
+            tasks = service.tasks().list(tasklist=tasklist_id).execute()
         task_items = tasks.get('items', [])
         
         if not task_items:
@@ -99,7 +104,8 @@ def delete_tasks(service, title: str = None, date: datetime = None):
         # Delete tasks
         deleted_count = 0
         for task in tasks_to_delete:
-            service.tasks().delete(tasklist=tasklist_id, task=task['id']).execute()
+            with span("api.tasks.delete"):
+                service.tasks().delete(tasklist=tasklist_id, task=task['id']).execute()
             deleted_count += 1
         
         print(f"Deleted {deleted_count} task(s).")
@@ -119,7 +125,8 @@ def view_tasks(service, title: str = None, date: datetime = None):
     """
     try:
         # Get the default task list
-        tasklists = service.tasklists().list().execute()
+        with span("api.tasklists.list"):
+            tasklists = service.tasklists().list().execute()
         tasklist_items = tasklists.get('items', [])
         
         if not tasklist_items:
@@ -128,7 +135,8 @@ def view_tasks(service, title: str = None, date: datetime = None):
         tasklist_id = tasklist_items[0]['id']
         
         # List tasks
-        tasks = service.tasks().list(tasklist=tasklist_id).execute()
+        with span("api.tasks.list"):
+            tasks = service.tasks().list(tasklist=tasklist_id).execute()
         task_items = tasks.get('items', [])
         
         if not task_items:
@@ -152,12 +160,13 @@ def view_tasks(service, title: str = None, date: datetime = None):
             print("No matching tasks found.")
             return
         
-        print(f"\nFound {len(matching_tasks)} task(s):")
-        for task in matching_tasks:
-            title_str = task.get('title', 'Untitled')
-            due_str = task.get('due', 'No due date')
-            status_str = task.get('status', 'unknown')
-            print(f"• {title_str} (Due: {due_str}, Status: {status_str})")
+        with span("render.tasks"):
+            print(f"\nFound {len(matching_tasks)} task(s):")
+            for task in matching_tasks:
+                title_str = task.get('title', 'Untitled')
+                due_str = task.get('due', 'No due date')
+                status_str = task.get('status', 'unknown')
+                print(f"• {title_str} (Due: {due_str}, Status: {status_str})")
         
     except Exception as e:
         raise AssistantError(f"Failed to view tasks: {str(e)}")
\ No newline at end of file
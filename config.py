@@ -17,7 +17,38 @@ class Config:
     DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'America/Denver')
     MAX_EVENTS_PER_REQUEST = int(os.getenv('MAX_EVENTS_PER_REQUEST', '50'))
     MAX_DELETE_THRESHOLD = int(os.getenv('MAX_DELETE_THRESHOLD', '10'))
+    DELETE_BATCH_SIZE = int(os.getenv('DELETE_BATCH_SIZE', '50'))
+    EVENT_MIRROR = os.getenv('EVENT_MIRROR', '').lower() in ('1', 'true', 'yes')
+    EVENT_MIRROR_PATH = os.getenv('EVENT_MIRROR_PATH', 'events.sqlite3')
+    EVENT_MIRROR_MAX_STALENESS = float(os.getenv('EVENT_MIRROR_MAX_STALENESS', '60'))
+    CALENDAR_IDS = [c.strip() for c in os.getenv('CALENDAR_IDS', 'primary').split(',') if c.strip()]
+    CALENDAR_LIST_TTL = float(os.getenv('CALENDAR_LIST_TTL', '3600'))
+    WORKING_HOURS = os.getenv('WORKING_HOURS', '09:00-17:00')
+    WORKING_DAYS = [int(d) for d in os.getenv('WORKING_DAYS', '0,1,2,3,4').split(',') if d.strip()]
+    FREE_SLOT_MINUTES = int(os.getenv('FREE_SLOT_MINUTES', '30'))
+    FREE_SLOT_RESULTS = int(os.getenv('FREE_SLOT_RESULTS', '5'))
+    FREE_SEARCH_DAYS = int(os.getenv('FREE_SEARCH_DAYS', '5'))
+    CHECK_CONFLICTS = os.getenv('CHECK_CONFLICTS', '1').lower() in ('1', 'true', 'yes')
+    LOCAL_RECURRENCE = os.getenv('LOCAL_RECURRENCE', '').lower() in ('1', 'true', 'yes')
+    STREAM_DELETES = os.getenv('STREAM_DELETES', '1').lower() in ('1', 'true', 'yes')
     DEFAULT_WINDOW_DAYS = int(os.getenv('DEFAULT_WINDOW_DAYS', '365'))
+    IMPORT_DEFAULT_MINUTES = int(os.getenv('IMPORT_DEFAULT_MINUTES', '60'))
+    DATE_CACHE_SIZE = int(os.getenv('DATE_CACHE_SIZE', '512'))
+    DATE_LANGUAGES = os.getenv('DATE_LANGUAGES', 'en').split(',')
+    ENABLE_METRICS = os.getenv('ENABLE_METRICS', '').lower() in ('1', 'true', 'yes')
+    DISCOVERY_CACHE_DIR = os.getenv('DISCOVERY_CACHE_DIR', '.discovery_cache')
+    DISCOVERY_CACHE_TTL = int(os.getenv('DISCOVERY_CACHE_TTL', str(24 * 60 * 60)))
+    SERVICE_POOL_SIZE = int(os.getenv('SERVICE_POOL_SIZE', '4'))
+    SERVICE_POOL_TIMEOUT = float(os.getenv('SERVICE_POOL_TIMEOUT', '30'))
+    TOKEN_REFRESH_MARGIN = int(os.getenv('TOKEN_REFRESH_MARGIN', '300'))
+    HTTP_TRANSPORT = os.getenv('HTTP_TRANSPORT', 'requests')
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', '1').lower() in ('1', 'true', 'yes')
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+    USER_TOKEN_STORE = os.getenv('USER_TOKEN_STORE', 'tokens')
+    USER_CLIENT_CACHE_SIZE = int(os.getenv('USER_CLIENT_CACHE_SIZE', '256'))
+    USER_CLIENT_IDLE_TTL = int(os.getenv('USER_CLIENT_IDLE_TTL', '900'))
     
     # API settings
     JOKE_API_URL = os.getenv('JOKE_API_URL', 'https://icanhazdadjoke.com/')
@@ -24,3 +24,8 @@ class ParsingError(AssistantError):
 class ConfigurationError(AssistantError):
     """Raised when configuration is invalid."""
     pass
+
+
+class ServiceUnavailableError(AssistantError):
+    """Raised when no API service client becomes available in time."""
+    pass
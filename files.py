@@ -0,0 +1,21 @@
+"""File helpers shared by the auth and cal packages."""
+
+import os
+import tempfile
+
+
+def atomic_write(path: str, text: str, prefix: str = None):
+    """Replace ``path`` with ``text`` so readers see the old or the new file, never a partial one.
+
+    The text goes to a temporary file in the same directory, which is then renamed over
+    ``path``; on any failure the temporary file is removed and ``path`` is left untouched.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=prefix, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -1,8 +1,8 @@
-import requests
-from requests.exceptions import HTTPError
-
-
 def tell_joke():
+    # requests is only needed here, so keep it out of startup
+    import requests
+    from requests.exceptions import HTTPError
+
     try:
         headers = {"Accept": "application/json"}
         response = requests.get("https://icanhazdadjoke.com/", headers=headers)
@@ -0,0 +1,140 @@
+"""Optional per-stage latency instrumentation.
+
+Spans are cheap no-ops unless metrics are enabled (``ENABLE_METRICS=1`` or
+``metrics.enable()``). When enabled, every span's duration is recorded in a
+per-stage histogram that can be dumped on demand.
+"""
+
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+from config import Config
+
+
+# Histogram bucket upper bounds, in seconds (roughly 1-2.5-5 per decade).
+BUCKETS = (
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0,
+    10.0, 30.0, float('inf'),
+)
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with count, sum, min and max."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1), capped at max."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": dict(zip(BUCKETS, self.counts)),
+        }
+
+
+class Metrics:
+    """Registry of per-stage histograms."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def observe(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, stage: str):
+        """Context manager timing the enclosed block as one observation of ``stage``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {stage: h.snapshot() for stage, h in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def dump(self) -> str:
+        """Return a per-stage latency table (milliseconds)."""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "No timings recorded." if self.enabled else "Metrics are disabled (set ENABLE_METRICS=1)."
+        width = max(len(stage) for stage in snapshot)
+        lines = [f"{'stage':<{width}}  {'count':>6}  {'mean':>9}  {'p50':>9}  {'p95':>9}  {'max':>9}"]
+        for stage, s in snapshot.items():
+            lines.append(
+                f"{stage:<{width}}  {s['count']:>6}  {s['mean'] * 1e3:>9.2f}  {s['p50'] * 1e3:>9.2f}  "
+                f"{s['p95'] * 1e3:>9.2f}  {s['max'] * 1e3:>9.2f}"
+            )
+        return "\n".join(lines)
+
+
+metrics = Metrics(enabled=Config.ENABLE_METRICS)
+
+
+def span(stage: str):
+    """Time a block as one observation of ``stage`` on the global registry."""
+    return metrics.span(stage)
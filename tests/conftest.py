@@ -52,6 +52,56 @@ def mock_tasks_service():
     return service
 
 
+class FakeBatch:
+    """Stand-in for ``BatchHttpRequest`` that resolves each request from its service."""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append([request for _, request in self.requests])
+        for request_id, request in self.requests:
+            key = request.get('eventId') or request.get('body', {}).get('summary')
+            errors = self.service.batch_errors.get(key)
+            if errors:
+                self.callback(request_id, None, errors.pop(0))
+            else:
+                self.callback(request_id, {'id': key}, None)
+
+
+@pytest.fixture
+def batch_calendar_service():
+    """A Calendar service mock whose batch requests run against per-item outcomes.
+
+    Requests are recorded as dicts of their keyword arguments in ``service.batches``
+    (one list per batch). ``service.batch_errors`` maps an event id (or an inserted
+    summary) to a list of exceptions raised on successive attempts.
+    """
+    service = Mock()
+    service.batches = []
+    service.batch_errors = {}
+    service.events.return_value.delete.side_effect = lambda **kw: dict(kw, op='delete')
+    service.events.return_value.insert.side_effect = lambda **kw: dict(kw, op='insert')
+    service.new_batch_http_request.side_effect = lambda callback=None: FakeBatch(service, callback)
+    return service
+
+
+@pytest.fixture
+def http_error():
+    """Factory for ``HttpError`` instances with a given status."""
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    def make(status, reason=''):
+        return HttpError(httplib2.Response({'status': str(status)}), reason.encode())
+    return make
+
+
 @pytest.fixture
 def sample_datetime():
     """Provide a sample datetime for testing."""
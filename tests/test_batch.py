@@ -0,0 +1,122 @@
+"""Pytest tests for batched API request execution."""
+
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.batch import execute_batched, is_retryable, progress_printer, MAX_BATCH_SIZE
+
+
+def delete_request(service):
+    return lambda event_id: service.events().delete(calendarId='primary', eventId=event_id)
+
+
+class TestExecuteBatched:
+    """Test grouping, per-item outcomes and retries."""
+
+    def test_items_grouped_into_batches(self, batch_calendar_service):
+        """Test that items are split into batches of at most batch_size."""
+        service = batch_calendar_service
+        ids = [f'e{i}' for i in range(120)]
+        result = execute_batched(service, ids, delete_request(service), batch_size=50)
+
+        assert [len(b) for b in service.batches] == [50, 50, 20]
+        assert [item for item, _ in result.succeeded] == ids
+        assert result.failed == []
+
+    def test_batch_size_capped_at_api_limit(self, batch_calendar_service):
+        """Test that oversized batches are clamped to the API limit."""
+        service = batch_calendar_service
+        execute_batched(service, [f'e{i}' for i in range(120)], delete_request(service), batch_size=1000)
+
+        assert max(len(b) for b in service.batches) == MAX_BATCH_SIZE
+
+    def test_only_failed_items_retried(self, batch_calendar_service, http_error):
+        """Test that a retry round contains just the items that failed transiently."""
+        service = batch_calendar_service
+        service.batch_errors = {'e1': [http_error(503)], 'e3': [http_error(429), http_error(500)]}
+        sleep = Mock()
+        result = execute_batched(service, ['e0', 'e1', 'e2', 'e3'], delete_request(service), sleep=sleep)
+
+        assert [[r['eventId'] for r in b] for b in service.batches] == [['e0', 'e1', 'e2', 'e3'], ['e1', 'e3'], ['e3']]
+        assert sorted(item for item, _ in result.succeeded) == ['e0', 'e1', 'e2', 'e3']
+        assert [c[0][0] for c in sleep.call_args_list] == [1.0, 2.0]
+
+    def test_permanent_errors_not_retried(self, batch_calendar_service, http_error):
+        """Test that non-transient errors are reported without another attempt."""
+        service = batch_calendar_service
+        service.batch_errors = {'e1': [http_error(404)]}
+        result = execute_batched(service, ['e0', 'e1'], delete_request(service), sleep=Mock())
+
+        assert len(service.batches) == 1
+        assert [item for item, _ in result.failed] == ['e1']
+
+    def test_attempts_are_bounded(self, batch_calendar_service, http_error):
+        """Test that an item failing every time is reported after max_attempts."""
+        service = batch_calendar_service
+        service.batch_errors = {'e0': [http_error(503)] * 5}
+        result = execute_batched(service, ['e0'], delete_request(service), max_attempts=3, sleep=Mock())
+
+        assert len(service.batches) == 3
+        assert result.failed[0][0] == 'e0'
+
+    def test_whole_batch_failure_retried(self, batch_calendar_service):
+        """Test that a transport error on the batch itself retries its items."""
+        service = batch_calendar_service
+        batches = []
+
+        def new_batch(callback=None):
+            batch = Mock()
+            if batches:
+                batch.execute.side_effect = lambda: callback('0', {}, None)
+            else:
+                batch.execute.side_effect = OSError("connection reset")
+            batches.append(batch)
+            return batch
+
+        service.new_batch_http_request.side_effect = new_batch
+        result = execute_batched(service, ['e0'], delete_request(service), sleep=Mock())
+
+        assert len(batches) == 2
+        assert [item for item, _ in result.succeeded] == ['e0']
+
+    def test_empty_input(self, batch_calendar_service):
+        """Test that nothing is sent for an empty item list."""
+        result = execute_batched(batch_calendar_service, [], Mock())
+        assert result.succeeded == [] and result.failed == []
+        batch_calendar_service.new_batch_http_request.assert_not_called()
+
+
+class TestIsRetryable:
+    """Test the transient-error classification."""
+
+    def test_statuses(self, http_error):
+        assert is_retryable(http_error(503))
+        assert is_retryable(http_error(429))
+        assert not is_retryable(http_error(404))
+        assert not is_retryable(http_error(400))
+
+    def test_rate_limit_403_only(self, http_error):
+        """Test that a 403 is retried only when it signals rate limiting."""
+        assert is_retryable(http_error(403, 'rateLimitExceeded'))
+        assert not is_retryable(http_error(403, 'forbidden'))
+
+    def test_transport_errors(self):
+        assert is_retryable(OSError("timed out"))
+
+
+class TestProgressPrinter:
+    """Test the interactive progress callback."""
+
+    def test_counts_and_failures(self):
+        progress = progress_printer("Deleting")
+
+        with patch('builtins.print') as mock_print:
+            progress(50, 0)
+            progress(100, 2)
+
+        assert [c.args[0] for c in mock_print.call_args_list] == ["Deleting... 50 done",
+                                                                "Deleting... 100 done, 2 failed"]
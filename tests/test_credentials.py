@@ -0,0 +1,178 @@
+"""Pytest tests for the shared credential manager."""
+
+import json
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+from auth.credentials import CredentialManager, _utcnow
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+
+def make_credentials(token='token-1', expires_in=timedelta(hours=1)):
+    """Authorized-user credentials expiring ``expires_in`` from now."""
+    return Credentials(
+        token=token,
+        refresh_token='refresh',
+        token_uri='https://oauth2.googleapis.com/token',
+        client_id='client',
+        client_secret='secret',
+        scopes=SCOPES,
+        expiry=_utcnow() + expires_in,
+    )
+
+
+def write_token(path, creds):
+    with open(path, 'w') as f:
+        f.write(creds.to_json())
+
+
+@pytest.fixture
+def token_path(tmp_path):
+    return str(tmp_path / 'token.json')
+
+
+@pytest.fixture
+def manager(token_path):
+    manager = CredentialManager(token_path, 'client_secret.json', SCOPES, refresh_margin=300)
+    yield manager
+    manager.stop()
+
+
+class TestCredentialLoading:
+    """Test that credentials are loaded once and shared."""
+
+    def test_loads_token_file_once(self, manager, token_path):
+        """Test that repeated calls return the same object without re-reading the file."""
+        write_token(token_path, make_credentials())
+        with patch.object(Credentials, 'from_authorized_user_file',
+                          wraps=Credentials.from_authorized_user_file) as load:
+            first = manager.get()
+            second = manager.get()
+
+        assert first is second
+        load.assert_called_once()
+
+    def test_valid_token_not_rewritten(self, manager, token_path):
+        """Test that loading a valid token leaves the file untouched."""
+        write_token(token_path, make_credentials())
+        mtime = os.stat(token_path).st_mtime_ns
+        manager.get()
+
+        assert os.stat(token_path).st_mtime_ns == mtime
+
+    def test_expired_token_refreshed_and_saved(self, manager, token_path):
+        """Test that an expired token is refreshed on load and written back."""
+        write_token(token_path, make_credentials(expires_in=timedelta(hours=-1)))
+
+        def refresh(creds, request):
+            creds.token = 'token-2'
+            creds.expiry = _utcnow() + timedelta(hours=1)
+
+        with patch.object(Credentials, 'refresh', autospec=True, side_effect=refresh):
+            creds = manager.get()
+
+        assert creds.token == 'token-2'
+        with open(token_path) as f:
+            assert json.load(f)['token'] == 'token-2'
+
+    def test_invalid_refresh_token_reauthorizes(self, manager, token_path):
+        """Test that a revoked refresh token falls back to the browser flow."""
+        write_token(token_path, make_credentials(expires_in=timedelta(hours=-1)))
+        fresh = make_credentials(token='reauthorized')
+        flow = Mock()
+        flow.run_local_server.return_value = fresh
+
+        with patch.object(Credentials, 'refresh', side_effect=RefreshError('revoked')), \
+                patch('google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file', return_value=flow):
+            creds = manager.get()
+
+        assert creds is fresh
+        with open(token_path) as f:
+            assert json.load(f)['token'] == 'reauthorized'
+
+
+class TestBackgroundRefresh:
+    """Test proactive refresh ahead of expiry."""
+
+    def test_refresh_scheduled_before_expiry(self, manager, token_path):
+        """Test that a timer is armed refresh_margin seconds before the token expires."""
+        write_token(token_path, make_credentials())
+        with patch('auth.credentials.threading.Timer') as timer:
+            manager.get()
+
+        delay = timer.call_args[0][0]
+        assert 3300 - 5 <= delay <= 3300
+        timer.return_value.start.assert_called_once()
+
+    def test_token_inside_margin_refreshes_immediately(self, manager, token_path):
+        """Test that a token about to expire is refreshed without delay."""
+        write_token(token_path, make_credentials(expires_in=timedelta(minutes=10)))
+        manager.refresh_margin = 900
+        with patch('auth.credentials.threading.Timer') as timer:
+            manager.get()
+
+        assert timer.call_args[0][0] == 0
+
+    def test_refresh_updates_shared_object_and_file(self, manager, token_path):
+        """Test that a background refresh updates the shared credentials in place."""
+        write_token(token_path, make_credentials())
+        with patch('auth.credentials.threading.Timer'):
+            creds = manager.get()
+
+            def refresh(c, request):
+                c.token = 'token-2'
+                c.expiry = _utcnow() + timedelta(hours=1)
+
+            with patch.object(Credentials, 'refresh', autospec=True, side_effect=refresh):
+                manager.refresh()
+
+        assert manager.get() is creds
+        assert creds.token == 'token-2'
+        assert manager.refreshes == 1
+        with open(token_path) as f:
+            assert json.load(f)['token'] == 'token-2'
+
+    def test_transient_failure_retries(self, manager, token_path):
+        """Test that a network error reschedules the refresh instead of giving up."""
+        write_token(token_path, make_credentials())
+        with patch('auth.credentials.threading.Timer') as timer:
+            manager.get()
+            with patch.object(Credentials, 'refresh', side_effect=OSError('offline')):
+                manager.refresh()
+
+        assert manager.failures == 1
+        assert timer.call_args[0][0] == 30
+
+    def test_save_is_atomic(self, manager, token_path):
+        """Test that a failed write leaves the previous token file intact."""
+        write_token(token_path, make_credentials(token='old'))
+        with patch('auth.credentials.threading.Timer'):
+            creds = manager.get()
+        creds.token = 'new'
+
+        with patch('auth.credentials.os.replace', side_effect=OSError('disk full')):
+            with pytest.raises(OSError):
+                manager.save()
+
+        with open(token_path) as f:
+            assert json.load(f)['token'] == 'old'
+        assert os.listdir(os.path.dirname(token_path)) == ['token.json']
+
+    def test_reset_cancels_timer(self, manager, token_path):
+        """Test that reset stops the background refresh and forgets the credentials."""
+        write_token(token_path, make_credentials())
+        manager.get()
+        assert manager.refresh_scheduled
+
+        manager.reset()
+        assert not manager.refresh_scheduled
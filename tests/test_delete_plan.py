@@ -0,0 +1,339 @@
+"""Pytest tests for series-aware delete planning."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from zoneinfo import ZoneInfo
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal import handle_calendar_command
+from cal.delete_plan import (DeletePlan, Operation, StreamingPlan, describe, execute, plan_deletes,
+                             truncated_recurrence)
+from cal.events import delete_events
+from cal.parser import parse_input
+from cal.recurrence import build_rruleset
+
+NY = ZoneInfo("America/New_York")
+
+
+def standup(recurrence):
+    return {
+        'id': 'standup', 'summary': 'Standup',
+        'start': {'dateTime': '2024-03-04T09:00:00-05:00', 'timeZone': 'America/New_York'},
+        'end': {'dateTime': '2024-03-04T09:15:00-05:00', 'timeZone': 'America/New_York'},
+        'recurrence': recurrence,
+    }
+
+
+def instances(first_day, days, series='standup'):
+    """Server-expanded daily 9 AM instances starting on March ``first_day``."""
+    events = []
+    for day in range(first_day, first_day + days):
+        start = datetime(2024, 3, day, 9, tzinfo=NY)
+        when = {'dateTime': start.isoformat(), 'timeZone': 'America/New_York'}
+        events.append({'id': f"{series}_{start.astimezone(ZoneInfo('UTC')):%Y%m%dT%H%M%SZ}",
+                       'summary': 'Standup', 'recurringEventId': series, 'originalStartTime': when,
+                       'start': when, 'end': {'dateTime': (start + timedelta(minutes=15)).isoformat()}})
+    return events
+
+
+def fake_service(listed, master=None):
+    service = Mock()
+    service.events.return_value.list.return_value.execute.return_value = {'items': listed}
+    service.events.return_value.get.return_value.execute.return_value = master
+    return service
+
+
+def deleted_ids(service):
+    return [c.kwargs['eventId'] for c in service.events.return_value.delete.call_args_list]
+
+
+class TestPlanDeletes:
+    """Test grouping targets by series and collapsing them."""
+
+    def test_whole_finite_series_is_one_master_delete(self):
+        """Test that every instance of a series ending in the window becomes one delete."""
+        listed = instances(4, 5)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5']))
+
+        plan = plan_deletes(service, listed, listed, window_end='2024-04-01T00:00:00-04:00')
+
+        assert plan.operations == [Operation('series', 'standup', 'Standup', 5)]
+        assert (plan.calls, plan.lookups, plan.instances) == (1, 1, 5)
+
+    def test_trailing_instances_of_finite_series_are_truncated(self):
+        """Test that a series ending in the window, chosen from a later instance on, ends before it."""
+        master = standup(['RRULE:FREQ=DAILY;COUNT=10'])
+        listed = instances(6, 8)
+
+        plan = plan_deletes(fake_service(listed, master), listed, listed,
+                            window_end='2024-03-20T00:00:00-04:00')
+
+        [op] = plan.operations
+        assert (op.kind, op.event_id, op.instances) == ('truncate', 'standup', 8)
+        assert op.recurrence == ['RRULE:FREQ=DAILY;UNTIL=20240306T135959Z']
+        remaining = list(build_rruleset(op.recurrence, datetime(2024, 3, 4, 9, tzinfo=NY)))
+        assert remaining[-1] == datetime(2024, 3, 5, 9, tzinfo=NY)
+
+    def test_open_series_deletes_instances(self):
+        """Test that a series going on past the window is never collapsed, so only the window is affected."""
+        listed = instances(6, 3)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY']))
+
+        plan = plan_deletes(service, listed, listed, window_end='2024-03-09T00:00:00-05:00')
+
+        assert [op.kind for op in plan.operations] == ['event'] * 3
+
+    def test_open_window_deletes_instances(self):
+        listed = instances(4, 5)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5']))
+
+        assert [op.kind for op in plan_deletes(service, listed, listed).operations] == ['event'] * 5
+
+    def test_partial_selection_skips_lookup(self):
+        """Test that a selection with gaps is deleted per instance without fetching the master."""
+        listed = instances(4, 5)
+        service = fake_service(listed)
+
+        plan = plan_deletes(service, [listed[0], listed[2]], listed, window_end='2024-04-01T00:00:00-04:00')
+
+        assert [op.event_id for op in plan.operations] == [listed[0]['id'], listed[2]['id']]
+        assert plan.lookups == 0
+        service.events.return_value.get.assert_not_called()
+
+    def test_single_events_stay_plain_deletes(self):
+        single = {'id': 'lunch', 'summary': 'Lunch', 'start': {'dateTime': '2024-03-05T12:00:00-05:00'}}
+
+        plan = plan_deletes(Mock(), [single], [single], window_end='2024-04-01T00:00:00-04:00')
+
+        assert plan == DeletePlan([Operation('event', 'lunch', 'Lunch', 1)], 0)
+
+
+class TestStreamingPlan:
+    """Test planning series calls for a listing seen one event at a time."""
+
+    def test_finished_series_counted_not_held(self):
+        """Test that a series ending in the window collapses from its earliest instance and a count."""
+        listed = instances(4, 5)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5']))
+        streaming = StreamingPlan(service, window_end='2024-04-01T00:00:00-04:00')
+
+        assert all(streaming.hold(event) for event in reversed(listed))
+
+        assert streaming.plan() == DeletePlan([Operation('series', 'standup', 'Standup', 5)], 1)
+        service.events.return_value.get.assert_called_once()
+
+    def test_open_series_left_to_caller(self):
+        listed = instances(6, 3)
+        streaming = StreamingPlan(fake_service(listed, standup(['RRULE:FREQ=DAILY'])),
+                                  window_end='2024-03-09T00:00:00-05:00')
+
+        assert not any(streaming.hold(event) for event in listed)
+        assert streaming.plan() == DeletePlan([], 1)
+
+    def test_open_window_needs_no_lookup(self):
+        service = fake_service([])
+        streaming = StreamingPlan(service)
+
+        assert not streaming.hold(instances(4, 1)[0])
+        service.events.return_value.get.assert_not_called()
+
+
+class TestTruncatedRecurrence:
+    """Test rewriting a master's recurrence to end before a cut."""
+
+    def test_count_replaced_and_late_rdates_dropped(self):
+        master = standup(['RRULE:FREQ=WEEKLY;COUNT=10',
+                          'RDATE;TZID=America/New_York:20240306T090000,20240320T090000',
+                          'EXDATE;TZID=America/New_York:20240311T090000'])
+
+        lines = truncated_recurrence(master, {'dateTime': '2024-03-18T09:00:00-04:00'})
+
+        assert lines == ['RRULE:FREQ=WEEKLY;UNTIL=20240318T125959Z',
+                         'RDATE;TZID=America/New_York:20240306T090000',
+                         'EXDATE;TZID=America/New_York:20240311T090000']
+
+    def test_all_day_series(self):
+        master = {'id': 'gym', 'start': {'date': '2024-03-01'}, 'end': {'date': '2024-03-02'},
+                  'recurrence': ['RRULE:FREQ=WEEKLY']}
+        assert truncated_recurrence(master, {'date': '2024-03-15'}) == ['RRULE:FREQ=WEEKLY;UNTIL=20240314']
+
+
+class TestExecute:
+    """Test running a plan."""
+
+    def test_deletes_and_patches(self):
+        service = Mock()
+        plan = DeletePlan([Operation('series', 'standup', 'Standup', 5), Operation('event', 'lunch', 'Lunch', 1),
+                           Operation('truncate', 'gym', 'Gym', 3, ['RRULE:FREQ=WEEKLY;UNTIL=20240314'],
+                                     {'date': '2024-03-15'})], 1)
+        delete_ids = Mock(return_value=(2, []))
+
+        assert execute(service, plan, 'primary', delete_ids) == (9, [])
+
+        delete_ids.assert_called_once_with(['standup', 'lunch'])
+        service.events.return_value.patch.assert_called_once_with(
+            calendarId='primary', eventId='gym', body={'recurrence': ['RRULE:FREQ=WEEKLY;UNTIL=20240314']})
+
+    def test_failed_patch_is_reported(self, http_error):
+        service = Mock()
+        error = http_error(403, 'Forbidden')
+        service.events.return_value.patch.return_value.execute.side_effect = error
+        plan = DeletePlan([Operation('truncate', 'gym', 'Gym', 3, [], {'date': '2024-03-15'})], 1)
+
+        assert execute(service, plan, 'primary', Mock()) == (0, [('gym', error)])
+
+    def test_describe(self):
+        plan = DeletePlan([Operation('series', 'standup', 'Standup', 5), Operation('event', 'lunch', 'Lunch', 1)], 1)
+
+        text = describe(plan)
+
+        assert text.startswith("Plan: 2 API call(s) to remove 6 event(s) (1 lookup(s) made while planning):")
+        assert "delete series 'Standup' (5 listed instance(s))" in text
+
+
+class TestDeleteEventsWithPlan:
+    """Test delete_events running through the planner."""
+
+    def test_whole_series_deleted_with_one_call(self):
+        listed = instances(4, 5)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5']))
+
+        with patch('builtins.print'):
+            result = delete_events(service, 'Standup', '2024-03-01T00:00:00-05:00',
+                                   '2024-04-01T00:00:00-04:00', None, True)
+
+        assert deleted_ids(service) == ['standup']
+        assert result == {'status': 'deleted', 'deleted_count': 5}
+
+    def test_mirror_told_about_series_changes(self):
+        """Test that a deleted master is dropped from the mirror and a truncation marks it stale."""
+        listed = instances(4, 5)
+        mirror = Mock()
+
+        with patch('builtins.print'):
+            delete_events(fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5'])), 'Standup',
+                          '2024-03-01T00:00:00-05:00', '2024-04-01T00:00:00-04:00', None, True, mirror=mirror)
+        mirror.discard.assert_called_once_with(['standup'], 'primary')
+        mirror.invalidate.assert_not_called()
+
+        listed = instances(6, 8)
+        with patch('builtins.print'):
+            delete_events(fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=10'])), 'Standup',
+                          '2024-03-01T00:00:00-05:00', '2024-03-20T00:00:00-04:00', None, True, mirror=mirror)
+        mirror.invalidate.assert_called_once_with('primary')
+
+    def test_dry_run_deletes_nothing(self):
+        """Test that a dry run prints the plan and its call count without deleting."""
+        listed = instances(4, 5)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5']))
+
+        with patch('builtins.print') as mock_print:
+            result = delete_events(service, 'Standup', '2024-03-01T00:00:00-05:00',
+                                   '2024-04-01T00:00:00-04:00', None, True, dry_run=True)
+
+        service.events.return_value.delete.assert_not_called()
+        assert result == {'status': 'planned', 'calls': 1, 'lookups': 1, 'instances': 5, 'deleted_count': 0}
+        assert "Plan: 1 API call(s)" in mock_print.call_args[0][0]
+
+
+    def test_all_on_a_day_keeps_open_series(self):
+        """Test that "all" in a one-day window deletes that day's instance, not the rest of the series."""
+        listed = instances(8, 1)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY']))
+
+        with patch('builtins.print'):
+            result = delete_events(service, None, '2024-03-08T00:00:00-05:00', '2024-03-09T00:00:00-05:00',
+                                   'all', False, stream=True)
+
+        assert deleted_ids(service) == [listed[0]['id']]
+        service.events.return_value.patch.assert_not_called()
+        assert result['deleted_count'] == 1
+
+    def test_streaming_plans_recurring_instances(self):
+        """Test that streaming deletes single events as listed and collapses a finished series."""
+        single = {'id': 'lunch', 'summary': 'Lunch', 'start': {'dateTime': '2024-03-05T12:00:00-05:00'}}
+        listed = instances(4, 5) + [single]
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY;COUNT=5']))
+
+        with patch('builtins.print'):
+            result = delete_events(service, None, '2024-03-01T00:00:00-05:00', '2024-04-01T00:00:00-04:00',
+                                   'all', False, stream=True)
+
+        assert deleted_ids(service) == ['lunch', 'standup']
+        assert result == {'status': 'deleted', 'deleted_count': 6}
+
+    def test_streaming_deletes_open_series_as_listed(self):
+        """Test that instances of a series going on past the window are not held until the end."""
+        single = {'id': 'lunch', 'summary': 'Lunch', 'start': {'dateTime': '2024-03-07T12:00:00-05:00'}}
+        listed = instances(6, 1) + [single] + instances(7, 2)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY']))
+
+        with patch('builtins.print'):
+            result = delete_events(service, None, '2024-03-06T00:00:00-05:00', '2024-03-09T00:00:00-05:00',
+                                   'all', False, stream=True)
+
+        assert deleted_ids(service) == [event['id'] for event in listed]
+        assert service.events.return_value.get.call_count == 1
+        assert result['deleted_count'] == 4
+
+    @pytest.mark.parametrize("stream", [True, False])
+    @pytest.mark.parametrize("batch_size", [None, 50])
+    @pytest.mark.parametrize("scoped,forced,title", [('all', False, 'Standup'), (None, True, None),
+                                                     (None, True, 'Standup'), ('all', True, None)])
+    def test_dry_run_never_deletes(self, batch_calendar_service, stream, batch_size, scoped, forced, title):
+        """Test that a dry run sends no deletes or patches in any delete mode."""
+        service = batch_calendar_service
+        listed = instances(4, 5) + instances(4, 3, series='retro')
+        service.events.return_value.list.return_value.execute.return_value = {'items': listed}
+        service.events.return_value.get.return_value.execute.return_value = standup(['RRULE:FREQ=DAILY;COUNT=5'])
+
+        with patch('builtins.print') as mock_print:
+            result = delete_events(service, title, '2024-03-01T00:00:00-05:00', '2024-04-01T00:00:00-04:00',
+                                   scoped, forced, batch_size=batch_size, stream=stream, dry_run=True)
+
+        service.events.return_value.delete.assert_not_called()
+        service.events.return_value.patch.assert_not_called()
+        service.new_batch_http_request.assert_not_called()
+        assert result['status'] == 'planned'
+        assert "Plan:" in mock_print.call_args[0][0]
+
+
+    def test_preview_command_sends_no_deletes(self):
+        """Test the dispatched "preview ... all" command, which would otherwise stream deletes."""
+        listed = instances(4, 3)
+        service = fake_service(listed, standup(['RRULE:FREQ=DAILY']))
+
+        with patch('cal.get_calendar_service', return_value=service), \
+                patch('cal.get_event_mirror', return_value=None), patch('builtins.print'):
+            result = handle_calendar_command("preview delete all events called standup")
+
+        service.events.return_value.delete.assert_not_called()
+        assert result['status'] == 'planned'
+
+
+class TestDryRunParsing:
+    """Test the preview / dry run wording."""
+
+    @pytest.mark.parametrize("text", [
+        "preview delete all standups",
+        "delete all standups dry run",
+        "dry-run delete meeting tomorrow",
+    ])
+    def test_dry_run_words(self, text):
+        assert parse_input(text, interactive=False).command.dry_run
+
+    @pytest.mark.parametrize("text", [
+        "delete all standups",
+        "delete event called preview on friday",
+        "delete the product preview event tomorrow",
+        "delete event called preview",
+        "delete the dry run rehearsal event on monday",
+    ])
+    def test_not_a_dry_run(self, text):
+        """Test that the words only ask for a dry run at the start or end of the command."""
+        assert not parse_input(text, interactive=False).command.dry_run
@@ -0,0 +1,161 @@
+"""Pytest tests for the on-disk discovery document cache."""
+
+import json
+import pytest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.discovery import DiscoveryCache, CACHE_FORMAT
+
+DOCUMENT = json.dumps({"name": "calendar", "version": "v3", "revision": "20260101"})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A discovery cache in a temporary directory with a one hour TTL."""
+    return DiscoveryCache(str(tmp_path / "discovery"), ttl=3600)
+
+
+class TestDiscoveryCacheStorage:
+    """Test reading and writing cached documents."""
+
+    def test_store_and_load_round_trip(self, cache):
+        """Test that a stored document is loaded back with its revision."""
+        cache.store('calendar', 'v3', DOCUMENT)
+        entry = cache.load('calendar', 'v3')
+
+        assert entry["document"] == DOCUMENT
+        assert entry["revision"] == "20260101"
+        assert entry["format"] == CACHE_FORMAT
+
+    def test_load_missing_returns_none(self, cache):
+        """Test that nothing is returned before anything is cached."""
+        assert cache.load('calendar', 'v3') is None
+
+    def test_load_ignores_other_format(self, cache):
+        """Test that entries written by another cache format are ignored."""
+        cache.store('calendar', 'v3', DOCUMENT)
+        path = cache.path('calendar', 'v3')
+        with open(path) as f:
+            entry = json.load(f)
+        entry["format"] = CACHE_FORMAT + 1
+        with open(path, 'w') as f:
+            json.dump(entry, f)
+
+        assert cache.load('calendar', 'v3') is None
+
+    def test_load_ignores_corrupt_file(self, cache):
+        """Test that a truncated cache file is treated as missing."""
+        os.makedirs(cache.directory)
+        with open(cache.path('calendar', 'v3'), 'w') as f:
+            f.write('{"format": 1, "docu')
+
+        assert cache.load('calendar', 'v3') is None
+
+    def test_store_rejects_invalid_json(self, cache):
+        """Test that an invalid document is not written."""
+        with pytest.raises(ValueError):
+            cache.store('calendar', 'v3', 'not json')
+        assert not os.path.exists(cache.path('calendar', 'v3'))
+
+    def test_store_leaves_no_temp_files(self, cache):
+        """Test that the atomic write cleans up after itself."""
+        cache.store('calendar', 'v3', DOCUMENT)
+        assert os.listdir(cache.directory) == ['calendar.v3.json']
+
+    def test_clear(self, cache):
+        """Test that clear removes cached documents."""
+        cache.store('calendar', 'v3', DOCUMENT)
+        cache.clear()
+        assert cache.load('calendar', 'v3') is None
+
+
+class TestDiscoveryCacheLookup:
+    """Test where documents come from and when they are refreshed."""
+
+    def test_fresh_entry_skips_network(self, cache):
+        """Test that a fresh cached document is served without fetching."""
+        cache.store('calendar', 'v3', DOCUMENT)
+        with patch.object(cache, 'fetch') as fetch, patch.object(cache, 'refresh_async') as refresh:
+            assert cache.get_document('calendar', 'v3') == DOCUMENT
+
+        fetch.assert_not_called()
+        refresh.assert_not_called()
+
+    def test_stale_entry_served_and_refreshed_in_background(self, cache):
+        """Test that a stale document is returned immediately and refreshed asynchronously."""
+        cache.store('calendar', 'v3', DOCUMENT, fetched_at=0)
+        with patch.object(cache, 'fetch') as fetch, patch.object(cache, 'refresh_async') as refresh:
+            assert cache.get_document('calendar', 'v3') == DOCUMENT
+
+        fetch.assert_not_called()
+        refresh.assert_called_once_with('calendar', 'v3')
+
+    def test_cold_cache_uses_bundled_document(self, cache):
+        """Test that an empty cache is seeded from the bundled document without waiting on the network."""
+        with patch.object(cache, 'fetch') as fetch, patch.object(cache, 'refresh_async') as refresh:
+            document = cache.get_document('calendar', 'v3')
+
+        assert json.loads(document)["name"] == "calendar"
+        fetch.assert_not_called()
+        refresh.assert_called_once_with('calendar', 'v3')
+        assert cache.load('calendar', 'v3')["document"] == document
+
+    def test_unknown_api_fetched_synchronously(self, cache):
+        """Test that the network is used when no bundled document exists."""
+        with patch('googleapiclient.discovery_cache.get_static_doc', return_value=None), \
+                patch.object(cache, 'fetch', return_value=DOCUMENT) as fetch:
+            assert cache.get_document('calendar', 'v3') == DOCUMENT
+
+        fetch.assert_called_once_with('calendar', 'v3')
+        assert not cache.is_stale(cache.load('calendar', 'v3'))
+
+    def test_refresh_replaces_document(self, cache):
+        """Test that a background refresh stores the fetched document."""
+        cache.store('calendar', 'v3', '{"revision": "old"}', fetched_at=0)
+        with patch.object(cache, 'fetch', return_value=DOCUMENT):
+            cache.refresh_async('calendar', 'v3').join()
+
+        assert cache.load('calendar', 'v3')["revision"] == "20260101"
+
+    def test_failed_refresh_keeps_existing_document(self, cache):
+        """Test that a network error leaves the stale copy in place."""
+        cache.store('calendar', 'v3', DOCUMENT, fetched_at=0)
+        with patch.object(cache, 'fetch', side_effect=OSError("offline")):
+            cache.refresh_async('calendar', 'v3').join()
+
+        assert cache.load('calendar', 'v3')["document"] == DOCUMENT
+
+    def test_refresh_not_started_twice(self, cache):
+        """Test that concurrent refreshes of one API are deduplicated."""
+        cache._refreshing.add(('calendar', 'v3'))
+        assert cache.refresh_async('calendar', 'v3') is None
+
+
+class TestDiscoveryCacheBuild:
+    """Test building service clients from cached documents."""
+
+    def test_build_from_cached_document(self, cache):
+        """Test that the service is built from the local document and timed."""
+        with patch.object(cache, 'fetch') as fetch, patch.object(cache, 'refresh_async'):
+            service = cache.build('calendar', 'v3', credentials=Mock())
+
+        assert hasattr(service, 'events')
+        fetch.assert_not_called()
+        assert cache.build_seconds[('calendar', 'v3')] > 0
+
+    def test_build_records_metric(self, cache):
+        """Test that construction time is recorded when metrics are enabled."""
+        fake_metrics = Mock()
+        with patch('auth.discovery.metrics', fake_metrics), \
+                patch('googleapiclient.discovery.build_from_document', return_value=Mock()):
+            cache.store('tasks', 'v1', DOCUMENT)
+            cache.build('tasks', 'v1')
+
+        stage, seconds = fake_metrics.observe.call_args[0]
+        assert stage == "discovery.build.tasks"
+        assert seconds >= 0
@@ -2,14 +2,16 @@
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 import sys
 import os
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from cal.events import create_event, view_events, delete_events, is_date_only
+from cal.events import create_event, view_events, delete_events, is_date_only, iter_events
+from cal.parser import ParsedCommand
+from config import Config
 from exceptions import AssistantError
 
 
@@ -156,6 +158,19 @@ class TestViewEvents:
             assert list_call.call_args[1]['singleEvents'] is True
             assert list_call.call_args[1]['orderBy'] == 'startTime'
     
+    def test_view_events_without_date_uses_default_window(self, mock_service, sample_events_response):
+        """Test that a view with no date shows now .. now + DEFAULT_WINDOW_DAYS, like local expansion."""
+        mock_service.events.return_value.list.return_value.execute.return_value = sample_events_response
+
+        with patch('builtins.print'):
+            view_events(mock_service, {})
+
+        params = mock_service.events.return_value.list.call_args[1]
+        time_min = datetime.fromisoformat(params['timeMin'])
+        time_max = datetime.fromisoformat(params['timeMax'])
+        assert abs((time_min - datetime.now(time_min.tzinfo)).total_seconds()) < 60
+        assert time_max - time_min == timedelta(days=Config.DEFAULT_WINDOW_DAYS)
+    
     def test_view_events_with_datetime_range(self, mock_service, sample_events_response):
         """Test viewing events with datetime range."""
         mock_service.events.return_value.list.return_value.execute.return_value = sample_events_response
@@ -203,6 +218,23 @@ class TestViewEvents:
             assert list_call.call_args[1]['timeMin'] == '2024-01-15T09:00:00+00:00'
             assert list_call.call_args[1]['timeMax'] == '2024-01-15T17:00:00+00:00'
     
+    def test_view_events_with_parsed_command(self, mock_service, sample_events_response):
+        """Test viewing events with a ParsedCommand instead of a dict."""
+        mock_service.events.return_value.list.return_value.execute.return_value = sample_events_response
+        command = ParsedCommand(
+            intention='view', object='events', title='Meeting', start_time='9am', end_time='5pm',
+            given_start=datetime(2024, 1, 15, 9, 0, tzinfo=timezone.utc),
+            given_end=datetime(2024, 1, 15, 17, 0, tzinfo=timezone.utc),
+        )
+        
+        with patch('builtins.print'):
+            view_events(mock_service, command)
+            
+            list_call = mock_service.events.return_value.list
+            assert list_call.call_args[1]['q'] == 'Meeting'
+            assert list_call.call_args[1]['timeMin'] == '2024-01-15T09:00:00+00:00'
+            assert list_call.call_args[1]['timeMax'] == '2024-01-15T17:00:00+00:00'
+    
     def test_view_events_no_events_found(self, mock_service):
         """Test viewing events when no events are found."""
         mock_service.events.return_value.list.return_value.execute.return_value = {'items': []}
@@ -449,3 +481,242 @@ class TestDeleteEvents:
                 scoped=None,
                 forced=False
             )
+
+
+class TestDeleteEventsBatched:
+    """Test delete_events with deletes sent as batch requests."""
+
+    @pytest.fixture
+    def service(self, batch_calendar_service):
+        batch_calendar_service.events.return_value.list.return_value.execute.return_value = {
+            'items': [{'id': f'event{i}', 'summary': f'Event {i}'} for i in range(120)]
+        }
+        return batch_calendar_service
+
+    def _delete(self, service, **kwargs):
+        with patch('builtins.print') as mock_print:
+            result = delete_events(service, title=None, start="2024-01-15T00:00:00+00:00",
+                                   end="2024-01-15T23:59:59+00:00", scoped="all", forced=False,
+                                   batch_size=50, **kwargs)
+        return result, mock_print
+
+    def test_deletes_grouped_into_batches(self, service):
+        """Test that 120 deletes go out as three batch requests."""
+        result, mock_print = self._delete(service)
+
+        assert result == {"status": "deleted", "deleted_count": 120}
+        assert [len(b) for b in service.batches] == [50, 50, 20]
+        assert all(r['calendarId'] == 'primary' for b in service.batches for r in b)
+        service.events.return_value.delete.return_value.execute.assert_not_called()
+        mock_print.assert_called_with("Deleted 120 event(s).")
+
+    def test_failures_reported(self, service, http_error):
+        """Test that permanent failures are listed and the rest still deleted."""
+        service.batch_errors = {'event7': [http_error(400)]}
+        result, _ = self._delete(service)
+
+        assert result["status"] == "partial"
+        assert result["deleted_count"] == 119
+        assert [f["id"] for f in result["failed"]] == ['event7']
+
+    def test_already_deleted_counts_as_deleted(self, service, http_error):
+        """Test that events that are already gone are not reported as failures."""
+        service.batch_errors = {'event3': [http_error(410)], 'event4': [http_error(404)]}
+        result, _ = self._delete(service)
+
+        assert result == {"status": "deleted", "deleted_count": 120}
+
+    def test_transient_failures_retried(self, service, http_error):
+        """Test that only the failed deletes are retried."""
+        service.batch_errors = {'event5': [http_error(503)]}
+        with patch('cal.batch.time.sleep'):
+            result, _ = self._delete(service)
+
+        assert result["deleted_count"] == 120
+        assert [r['eventId'] for r in service.batches[-1]] == ['event5']
+
+    def test_guardrail_still_applies(self, service):
+        """Test that an unforced bulk delete is still refused before batching."""
+        with patch('builtins.print'):
+            result = delete_events(service, title=None, start="2024-01-15T00:00:00+00:00",
+                                   end="2024-01-15T23:59:59+00:00", scoped=None, forced=False,
+                                   batch_size=50)
+
+        assert result["status"] == "too_many_matches"
+        assert service.batches == []
+
+
+class TestDeleteEventsStreaming:
+    """Test page-by-page list-and-delete."""
+
+    @pytest.fixture
+    def service(self, batch_calendar_service):
+        """Three pages of 100 events."""
+        pages = [
+            {'items': [{'id': f'event{p * 100 + i}', 'summary': 'Standup'} for i in range(100)],
+             'nextPageToken': f'page{p + 1}' if p < 2 else None}
+            for p in range(3)
+        ]
+        for page in pages:
+            if page['nextPageToken'] is None:
+                del page['nextPageToken']
+        batch_calendar_service.events.return_value.list.return_value.execute.side_effect = pages
+        return batch_calendar_service
+
+    def _delete(self, service, scoped="all", forced=False, title=None, **kwargs):
+        with patch('builtins.print'):
+            return delete_events(service, title=title, start="2024-01-01T00:00:00+00:00",
+                                 end="2025-01-01T00:00:00+00:00", scoped=scoped, forced=forced,
+                                 batch_size=50, stream=True, window=100, **kwargs)
+
+    def test_deletes_page_by_page(self, service):
+        """Test that each page is deleted before the next one is listed."""
+        order = []
+        list_execute = service.events.return_value.list.return_value.execute
+        pages = list(list_execute.side_effect)
+        list_execute.side_effect = lambda: order.append('list') or pages.pop(0)
+        new_batch = service.new_batch_http_request.side_effect
+        service.new_batch_http_request.side_effect = lambda callback=None: order.append('batch') or new_batch(callback)
+
+        result = self._delete(service)
+
+        assert result == {"status": "deleted", "deleted_count": 300}
+        assert order == ['list', 'batch', 'batch'] * 3
+        assert service.events.return_value.list.call_args[1]['maxResults'] == 100
+
+    def test_window_bounds_page_size(self, service):
+        """Test that the in-flight window caps the page size requested."""
+        self._delete(service)
+        assert all(c[1]['maxResults'] == 100 for c in service.events.return_value.list.call_args_list)
+
+    def test_progress_reported(self, service):
+        """Test that progress is reported after every batch."""
+        progress = Mock()
+        self._delete(service, progress=progress)
+
+        assert [c[0] for c in progress.call_args_list] == [(n, 0) for n in range(50, 301, 50)]
+
+    def test_cancellation(self, service):
+        """Test that setting the cancel event stops before the next delete."""
+        import threading
+        cancel = threading.Event()
+
+        def progress(deleted, failed):
+            if deleted >= 150:
+                cancel.set()
+
+        result = self._delete(service, progress=progress, cancel=cancel)
+
+        assert result == {"status": "cancelled", "deleted_count": 150}
+        assert service.events.return_value.list.call_count == 2
+
+    def test_failures_collected(self, service, http_error):
+        """Test that permanent failures are reported at the end."""
+        service.batch_errors = {'event150': [http_error(400)]}
+        result = self._delete(service)
+
+        assert result["status"] == "partial"
+        assert result["deleted_count"] == 299
+        assert result["failed"][0]["id"] == 'event150'
+
+    def test_sequential_streaming(self, service):
+        """Test streaming without batching deletes one event per request."""
+        service.events.return_value.delete.side_effect = None
+        with patch('builtins.print'):
+            result = delete_events(service, title=None, start=None, end=None, scoped="all",
+                                   forced=False, stream=True, window=100)
+
+        assert result["deleted_count"] == 300
+        assert service.events.return_value.delete.call_count == 300
+
+    def test_forced_without_title_streams(self, service):
+        """Test that a forced, untitled delete also streams."""
+        result = self._delete(service, scoped=None, forced=True)
+        assert result["deleted_count"] == 300
+        assert service.events.return_value.list.call_count == 3
+
+    def test_guarded_delete_does_not_stream(self, service):
+        """Test that a delete that may still need confirmation lists everything first."""
+        result = self._delete(service, scoped=None, forced=False)
+
+        assert result == {"status": "too_many_matches", "count": 300}
+        assert service.batches == []
+
+    def test_no_matches(self, batch_calendar_service):
+        batch_calendar_service.events.return_value.list.return_value.execute.return_value = {'items': []}
+        result = self._delete(batch_calendar_service)
+        assert result == {"status": "none", "deleted_count": 0}
+
+
+class TestIterEvents:
+    """Test the lazy paginated event iterator."""
+
+    @pytest.fixture
+    def paged_service(self):
+        """Three pages of two events each."""
+        service = Mock()
+        service.events.return_value.list.return_value.execute.side_effect = [
+            {'items': [{'id': 'e1'}, {'id': 'e2'}], 'nextPageToken': 't2'},
+            {'items': [{'id': 'e3'}, {'id': 'e4'}], 'nextPageToken': 't3'},
+            {'items': [{'id': 'e5'}, {'id': 'e6'}]},
+        ]
+        return service
+
+    def test_follows_page_tokens(self, paged_service):
+        """Test that every page is fetched and events come back in order."""
+        events = list(iter_events(paged_service))
+
+        assert [e['id'] for e in events] == ['e1', 'e2', 'e3', 'e4', 'e5', 'e6']
+        calls = paged_service.events.return_value.list.call_args_list
+        assert [c[1].get('pageToken') for c in calls] == [None, 't2', 't3']
+
+    def test_pages_fetched_on_demand(self, paged_service):
+        """Test that the next page is only requested once the current one is used up."""
+        events = iter_events(paged_service)
+        assert next(events)['id'] == 'e1'
+        assert next(events)['id'] == 'e2'
+        assert paged_service.events.return_value.list.return_value.execute.call_count == 1
+
+        next(events)
+        assert paged_service.events.return_value.list.return_value.execute.call_count == 2
+
+    def test_page_size_and_fields(self, paged_service):
+        """Test that the configured page size and a fields mask are sent."""
+        list(iter_events(paged_service, fields='items(id)'))
+
+        params = paged_service.events.return_value.list.call_args[1]
+        assert params['maxResults'] == Config.MAX_EVENTS_PER_REQUEST
+        assert params['fields'] == 'items(id),nextPageToken'
+
+    def test_filters(self, paged_service):
+        """Test that time bounds and the query are passed through."""
+        list(iter_events(paged_service, 'work', '2024-01-15T00:00:00Z', '2024-01-16T00:00:00Z', 'standup',
+                         page_size=10))
+
+        params = paged_service.events.return_value.list.call_args[1]
+        assert params['calendarId'] == 'work'
+        assert params['timeMin'] == '2024-01-15T00:00:00Z'
+        assert params['timeMax'] == '2024-01-16T00:00:00Z'
+        assert params['q'] == 'standup'
+        assert params['maxResults'] == 10
+
+    def test_view_events_renders_every_page(self):
+        """Test that view_events prints events from all pages as they arrive."""
+        def event(summary):
+            return {'summary': summary, 'start': {'dateTime': '2024-01-15T09:00:00+00:00'},
+                    'end': {'dateTime': '2024-01-15T10:00:00+00:00'}}
+
+        service = Mock()
+        printed = []
+        service.events.return_value.list.return_value.execute.side_effect = [
+            {'items': [event('First')], 'nextPageToken': 't2'},
+            {'items': [event('Second')]},
+        ]
+
+        def fake_print(line):
+            printed.append((line, service.events.return_value.list.return_value.execute.call_count))
+
+        with patch('builtins.print', side_effect=fake_print):
+            view_events(service, {})
+
+        assert printed == [('First: 9 AM to 10 AM', 1), ('Second: 9 AM to 10 AM', 2)]
@@ -0,0 +1,206 @@
+"""Pytest tests for concurrent multi-calendar reads."""
+
+import pytest
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal import fanout
+from cal.events import view_events
+from cal.fanout import iter_calendars, calendar_ids, merge_by_start
+from cal.mirror import EventMirror
+from config import Config
+
+
+def event(event_id, hour, minute=0):
+    return {'id': event_id, 'summary': event_id,
+            'start': {'dateTime': f'2024-01-15T{hour:02d}:{minute:02d}:00+00:00'},
+            'end': {'dateTime': f'2024-01-15T{hour:02d}:{minute + 30:02d}:00+00:00'}}
+
+
+class FakeCalendars:
+    """Pool of fake clients over several calendars, each list call taking ``latency`` seconds."""
+
+    def __init__(self, calendars, page_size=2, latency=0.0):
+        self.calendars = calendars
+        self.page_size = page_size
+        self.latency = latency
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.checked_out = 0
+        self._lock = threading.Lock()
+
+    def _list(self, params):
+        with self._lock:
+            self.calls.append(params)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.latency)
+            items = self.calendars[params['calendarId']]
+            if isinstance(items, Exception):
+                raise items
+            offset = int(params.get('pageToken') or 0)
+            response = {'items': items[offset:offset + self.page_size]}
+            if offset + self.page_size < len(items):
+                response['nextPageToken'] = str(offset + self.page_size)
+            return response
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    @contextmanager
+    def checkout(self):
+        service = Mock()
+        service.events.return_value.list.side_effect = lambda **params: Mock(
+            execute=lambda: self._list(params))
+        with self._lock:
+            self.checked_out += 1
+        try:
+            yield service
+        finally:
+            with self._lock:
+                self.checked_out -= 1
+
+
+PARAMS = {'singleEvents': True, 'orderBy': 'startTime', 'maxResults': 2}
+
+
+class TestIterCalendars:
+    """Test the concurrent fan-out and k-way merge."""
+
+    def test_streams_merged_by_start(self):
+        """Test that events from every calendar come out in one start-ordered stream."""
+        pool = FakeCalendars({
+            'work': [event('w1', 9), event('w2', 11), event('w3', 15)],
+            'home': [event('h1', 8), event('h2', 12)],
+            'team': [event('t1', 10)],
+        })
+
+        pairs = list(iter_calendars(pool, ['work', 'home', 'team'], PARAMS))
+
+        assert [e['id'] for _, e in pairs] == ['h1', 'w1', 't1', 'w2', 'h2', 'w3']
+        assert pairs[0][0] == 'home'
+
+    def test_calendars_listed_concurrently(self):
+        """Test that total latency is about one calendar's, not the sum."""
+        pool = FakeCalendars({cid: [event(cid, 9)] for cid in ('a', 'b', 'c', 'd')}, latency=0.2)
+
+        started = time.perf_counter()
+        assert len(list(iter_calendars(pool, ['a', 'b', 'c', 'd'], PARAMS))) == 4
+        elapsed = time.perf_counter() - started
+
+        assert pool.peak == 4
+        assert elapsed < 0.6
+
+    def test_error_raised_to_consumer(self, http_error):
+        """Test that a failing calendar surfaces its error."""
+        pool = FakeCalendars({'ok': [event('x', 9)], 'gone': http_error(404)})
+
+        with pytest.raises(Exception) as excinfo:
+            list(iter_calendars(pool, ['ok', 'gone'], PARAMS))
+        assert excinfo.value.resp.status == 404
+
+    def test_abandoned_stream_stops_producers(self):
+        """Test that closing the merged stream early releases clients and stops paging."""
+        pool = FakeCalendars({cid: [event(f'{cid}{i}', 9 + i % 10) for i in range(50)] for cid in ('a', 'b')})
+        stream = iter_calendars(pool, ['a', 'b'], dict(PARAMS, maxResults=1))
+
+        next(stream)
+        stream.close()
+        time.sleep(0.3)
+        calls = len(pool.calls)
+        time.sleep(0.2)
+
+        assert len(pool.calls) == calls < 50
+        assert pool.checked_out == 0
+
+    def test_merge_by_start_handles_all_day(self):
+        """Test that all-day events sort with timed events."""
+        all_day = {'id': 'd', 'start': {'date': '2024-01-14'}, 'end': {'date': '2024-01-15'}}
+        merged = merge_by_start([[('a', event('x', 9))], [('b', all_day)]])
+
+        assert [e['id'] for _, e in merged] == ['d', 'x']
+
+
+class TestCalendarIds:
+    """Test choosing which calendars to read."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        fanout.clear_calendar_list_cache()
+        yield
+        fanout.clear_calendar_list_cache()
+
+    def test_configured_list(self):
+        service = Mock()
+        assert calendar_ids(service, ['primary', 'team@example.com']) == ['primary', 'team@example.com']
+        service.calendarList.assert_not_called()
+
+    def test_default_from_config(self):
+        with patch.object(Config, 'CALENDAR_IDS', ['primary']):
+            assert calendar_ids(Mock()) == ['primary']
+
+    def test_all_reads_calendar_list_once(self):
+        """Test that 'all' lists visible, selected calendars and caches the result."""
+        service = Mock()
+        service.calendarList.return_value.list.return_value.execute.return_value = {'items': [
+            {'id': 'me@example.com', 'primary': True},
+            {'id': 'work', 'selected': True},
+            {'id': 'muted', 'selected': False},
+            {'id': 'hidden', 'selected': True, 'hidden': True},
+        ]}
+
+        assert calendar_ids(service, ['all']) == ['me@example.com', 'work']
+        assert calendar_ids(service, ['ALL']) == ['me@example.com', 'work']
+        assert service.calendarList.return_value.list.call_count == 1
+
+
+class TestViewEventsAcrossCalendars:
+    """Test view_events over several calendars."""
+
+    def test_view_fans_out(self):
+        """Test that a multi-calendar view is merged and labelled by calendar."""
+        pool = FakeCalendars({'work': [event('Standup', 9)], 'home': [event('Gym', 7)]})
+
+        with patch('builtins.print') as mock_print:
+            view_events(Mock(), {}, calendar_ids=['work', 'home'], pool=pool)
+
+        assert [c[0][0] for c in mock_print.call_args_list] == ['[home] Gym: 7 AM to 7 AM',
+                                                                '[work] Standup: 9 AM to 9 AM']
+        assert {c['calendarId'] for c in pool.calls} == {'work', 'home'}
+
+    def test_view_from_mirror(self):
+        """Test that the mirror answers each calendar and the results are merged."""
+        mirror = EventMirror(":memory:")
+        service = Mock()
+        service.events.return_value.list.side_effect = lambda **params: Mock(execute=lambda: {
+            'items': [event('Standup', 9)] if params['calendarId'] == 'work' else [event('Gym', 7)],
+            'nextSyncToken': 't',
+        })
+
+        with patch('builtins.print') as mock_print:
+            view_events(service, {'start': '2024-01-15T00:00:00+00:00', 'end': '2024-01-16T00:00:00+00:00'},
+                        calendar_ids=['work', 'home'], mirror=mirror)
+
+        assert [c[0][0] for c in mock_print.call_args_list] == ['[home] Gym: 7 AM to 7 AM',
+                                                                '[work] Standup: 9 AM to 9 AM']
+        mirror.close()
+
+    def test_single_configured_calendar(self):
+        """Test that one configured calendar is read instead of the primary one."""
+        service = Mock()
+        service.events.return_value.list.return_value.execute.return_value = {'items': [event('Standup', 9)]}
+
+        with patch('builtins.print') as mock_print:
+            view_events(service, {}, calendar_ids=['work@example.com'])
+
+        assert service.events.return_value.list.call_args.kwargs['calendarId'] == 'work@example.com'
+        assert [c[0][0] for c in mock_print.call_args_list] == ['Standup: 9 AM to 9 AM']
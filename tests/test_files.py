@@ -0,0 +1,34 @@
+"""Pytest tests for the shared file helpers."""
+
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from files import atomic_write
+
+
+class TestAtomicWrite:
+    """Test replacing a file through a temporary file."""
+
+    def test_writes_and_replaces(self, tmp_path):
+        path = tmp_path / "state.json"
+        atomic_write(str(path), "old")
+        atomic_write(str(path), "new", prefix=".state-")
+
+        assert path.read_text() == "new"
+        assert os.listdir(tmp_path) == ["state.json"]
+
+    def test_failure_keeps_previous_contents(self, tmp_path):
+        """Test that a failed rename leaves the old file and no temporary file behind."""
+        path = tmp_path / "state.json"
+        path.write_text("old")
+
+        with patch('files.os.replace', side_effect=OSError('disk full')), pytest.raises(OSError):
+            atomic_write(str(path), "new")
+
+        assert path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["state.json"]
@@ -0,0 +1,222 @@
+"""Pytest tests for the free/busy slot finder."""
+
+import pytest
+from datetime import datetime, date, timedelta
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal import handle_calendar_command
+from cal.freebusy import (FreeQuery, Gap, free_gaps, find_free_time, local_tz, merge_intervals,
+                          parse_free_query, rank_slots, search_windows)
+from cal.parser import parse_input
+
+
+def at(hour, minute=0, day=16):
+    """Local datetime on January ``day`` 2024 (the 16th is a Tuesday)."""
+    return datetime(2024, 1, day, hour, minute, tzinfo=local_tz)
+
+
+class TestIntervals:
+    """Test the merge and the gap sweep."""
+
+    def test_merge_overlapping_and_touching(self):
+        merged = merge_intervals([(at(13), at(14)), (at(9), at(10)), (at(9, 30), at(11)), (at(11), at(12))])
+        assert merged == [(at(9), at(12)), (at(13), at(14))]
+
+    def test_gaps_inside_windows(self):
+        """Test that gaps are clipped to windows and flag which edges touch a meeting."""
+        busy = [(at(8), at(9, 30)), (at(11), at(12)), (at(16, 30), at(18))]
+
+        gaps = free_gaps(busy, [(at(9), at(17))])
+
+        assert gaps == [Gap(at(9, 30), at(11), True, True), Gap(at(12), at(16, 30), True, True)]
+
+    def test_busy_block_spanning_windows(self):
+        """Test a block running across two days' windows."""
+        busy = [(at(16, day=16), at(10, day=17))]
+        windows = [(at(9, day=16), at(17, day=16)), (at(9, day=17), at(17, day=17))]
+
+        gaps = free_gaps(busy, windows)
+
+        assert gaps == [Gap(at(9, day=16), at(16, day=16), False, True),
+                        Gap(at(10, day=17), at(17, day=17), True, False)]
+
+    def test_no_busy_time(self):
+        assert free_gaps([], [(at(9), at(17))]) == [Gap(at(9), at(17), False, False)]
+
+
+class TestRankSlots:
+    """Test slot placement and ranking."""
+
+    def test_prefers_breathing_room_then_earliest(self):
+        """Test that a slot right after a meeting ranks below one with a buffer."""
+        gaps = [Gap(at(10), at(11), True, True), Gap(at(14), at(17), True, False)]
+
+        slots = rank_slots(gaps, timedelta(minutes=30), limit=3)
+
+        assert slots[0] == (at(14, 30), at(15))
+        assert all(end - start == timedelta(minutes=30) for start, end in slots)
+
+    def test_slots_do_not_overlap(self):
+        slots = rank_slots([Gap(at(9), at(12), False, False)], timedelta(hours=1), limit=5)
+
+        assert slots == [(at(9), at(10)), (at(10), at(11)), (at(11), at(12))]
+
+    def test_slots_on_quarter_hours(self):
+        slots = rank_slots([Gap(at(9, 7), at(10), False, False)], timedelta(minutes=30), limit=1)
+        assert slots == [(at(9, 15), at(9, 45))]
+
+    def test_too_short_gap(self):
+        assert rank_slots([Gap(at(9), at(9, 20), False, False)], timedelta(minutes=30)) == []
+
+
+class TestParseFreeQuery:
+    """Test reading a free-time request."""
+
+    @pytest.mark.parametrize("text,minutes", [
+        ("find free time", 30),
+        ("find 45 min free on January 16 2024", 45),
+        ("when am I free for an hour", 60),
+        ("free for half an hour", 30),
+        ("find a free 1.5h slot", 90),
+        ("find 2 hours free", 120),
+    ])
+    def test_duration(self, text, minutes):
+        assert parse_free_query(text).duration == timedelta(minutes=minutes)
+
+    def test_day_and_part_of_day(self):
+        query = parse_free_query("when am I free on January 16 2024 afternoon?")
+        assert query == FreeQuery(date(2024, 1, 16), timedelta(minutes=30), "afternoon")
+
+    def test_no_day(self):
+        assert parse_free_query("find free time").day is None
+
+
+class TestSearchWindows:
+    """Test working-hours windows."""
+
+    def test_named_day_uses_working_hours(self):
+        windows = search_windows(FreeQuery(date(2024, 1, 16), timedelta(minutes=30), None), at(7))
+        assert windows == [(at(9), at(17))]
+
+    def test_part_of_day_replaces_working_hours(self):
+        windows = search_windows(FreeQuery(date(2024, 1, 16), timedelta(minutes=30), "evening"), at(7))
+        assert windows == [(at(17), at(21))]
+
+    def test_clipped_to_now(self):
+        windows = search_windows(FreeQuery(date(2024, 1, 16), timedelta(minutes=30), None), at(15, 10))
+        assert windows == [(at(15, 10), at(17))]
+
+    def test_default_skips_weekends(self):
+        """Test that without a day the next working days are searched (Fri 19th -> Mon 22nd)."""
+        windows = search_windows(FreeQuery(None, timedelta(minutes=30), None), at(8, day=19))
+
+        assert [w[0].date() for w in windows] == [date(2024, 1, d) for d in (19, 22, 23, 24, 25)]
+
+
+class TestFindFreeTime:
+    """Test the end-to-end finder."""
+
+    @pytest.fixture
+    def service(self):
+        service = Mock()
+        service.freebusy.return_value.query.return_value.execute.return_value = {'calendars': {
+            'primary': {'busy': [{'start': at(9).isoformat(), 'end': at(12).isoformat()}]},
+            'team': {'busy': [{'start': at(12, 30).isoformat(), 'end': at(16, 45).isoformat()}]},
+            'gone': {'errors': [{'domain': 'global', 'reason': 'notFound'}]},
+        }}
+        return service
+
+    def test_one_call_across_calendars(self, service):
+        """Test that all calendars share one freeBusy call over the search window."""
+        with patch('builtins.print'):
+            result = find_free_time(service, "find free time on January 16 2024",
+                                    calendar_ids=['primary', 'team', 'gone'], now=at(7))
+
+        service.freebusy.return_value.query.assert_called_once()
+        body = service.freebusy.return_value.query.call_args.kwargs['body']
+        assert body['items'] == [{'id': 'primary'}, {'id': 'team'}, {'id': 'gone'}]
+        assert datetime.fromisoformat(body['timeMin']) == at(9)
+        assert datetime.fromisoformat(body['timeMax']) == at(17)
+        assert result['status'] == 'found'
+        assert result['slots'] == [(at(12), at(12, 30))]
+        assert result['errors'] == {'gone': 'notFound'}
+
+    def test_nothing_free(self, service):
+        with patch('builtins.print') as mock_print:
+            result = find_free_time(service, "find an hour free on January 16 2024",
+                                    calendar_ids=['primary', 'team'], now=at(7))
+
+        assert result['status'] == 'none'
+        assert "No free 60-minute slot" in mock_print.call_args_list[-1][0][0]
+
+    def test_day_already_over(self, service):
+        with patch('builtins.print'):
+            result = find_free_time(service, "find free time on January 16 2024", now=at(18))
+
+        assert result['status'] == 'none'
+        service.freebusy.assert_not_called()
+
+
+class TestFreeTimeCommand:
+    """Test parsing and dispatch of free-time requests."""
+
+    def test_parsed_without_follow_ups(self):
+        result = parse_input("when am I free tomorrow afternoon", interactive=False)
+
+        assert result.command.is_free_time
+        assert result.missing == ()
+
+    def test_find_free_time_intent(self):
+        result = parse_input("find free time tomorrow", interactive=False)
+        assert result.command.intention == 'find'
+        assert result.command.is_free_time
+
+    @pytest.mark.parametrize("text", [
+        "schedule free consultation event friday at 3pm",
+        "create free event tomorrow",
+        "view events called free",
+    ])
+    def test_free_in_a_title_is_not_a_search(self, text):
+        """Test that "free" as an ordinary word leaves the command's own object alone."""
+        command = parse_input(text, interactive=False).command
+
+        assert not command.is_free_time
+        assert command.object.lower().startswith('event')
+
+    @pytest.mark.parametrize("text", [
+        "when am I free?", "find 2 hours free", "free for half an hour", "find a free 1.5h slot",
+    ])
+    def test_free_time_phrases(self, text):
+        assert parse_input(text, interactive=False).command.is_free_time
+
+    def test_dispatched_to_finder(self):
+        service = Mock()
+        with patch('cal.get_calendar_service', return_value=service), \
+                patch('cal.fanout.calendar_ids', return_value=['primary', 'team']), \
+                patch('cal.freebusy.find_free_time', return_value={'status': 'found'}) as finder:
+            assert handle_calendar_command("find free time tomorrow") == {'status': 'found'}
+
+        assert finder.call_args.kwargs['calendar_ids'] == ['primary', 'team']
+
+    @pytest.mark.parametrize("text,target", [
+        ("find events tomorrow", 'cal.events.view_events'),
+        ("find tasks called groceries", 'cal.tasks.view_tasks'),
+    ])
+    def test_find_without_free_is_a_view(self, text, target):
+        """Test that "find" outside a free-time phrase lists events or tasks instead of doing nothing."""
+        result = parse_input(text, interactive=False)
+        assert not result.command.is_free_time
+        assert result.missing == ()
+
+        with patch('cal.get_calendar_service'), patch('cal.get_tasks_service'), \
+                patch('cal.get_event_mirror', return_value=None), \
+                patch('cal.fanout.calendar_ids', return_value=['primary']), \
+                patch(target, return_value={'status': 'listed'}) as view:
+            assert handle_calendar_command(result.command) == {'status': 'listed'}
+
+        view.assert_called_once()
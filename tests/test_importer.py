@@ -0,0 +1,237 @@
+"""Pytest tests for bulk event import from CSV and ICS files."""
+
+import io
+import json
+import pytest
+from datetime import date, datetime
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.importer import Checkpoint, event_id, import_events, parse_when, read_csv, read_ics
+
+ICS = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:1
+SUMMARY:Algorithms lecture
+DTSTART;TZID=America/New_York:20240304T090000
+DTEND;TZID=America/New_York:20240304T103000
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=20
+LOCATION:Hall B\\, room 2
+DESCRIPTION:Bring the textbook.\\nChapters 1
+ -3.
+BEGIN:VALARM
+TRIGGER:-PT15M
+DESCRIPTION:Reminder
+END:VALARM
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Reading week
+DTSTART;VALUE=DATE:20240311
+DTEND;VALUE=DATE:20240316
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Exam
+DTSTART:20240320T140000Z
+DURATION:PT2H
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Broken
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def csv_rows(text):
+    return list(read_csv(io.StringIO(text)))
+
+
+def write_csv(tmp_path, count, name="shifts.csv"):
+    path = tmp_path / name
+    lines = ["title,start,end"] + [f"Shift {i},2024-03-{1 + i % 28:02d}T09:00:00-05:00,"
+                                   f"2024-03-{1 + i % 28:02d}T17:00:00-05:00" for i in range(count)]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def inserted(service):
+    return [request['body']['summary'] for chunk in service.batches for request in chunk]
+
+
+class TestParseWhen:
+    """Test reading start/end values."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("2024-03-04", date(2024, 3, 4)),
+        ("2024-03-04T09:30", datetime(2024, 3, 4, 9, 30)),
+        ("03/04/2024", date(2024, 3, 4)),
+        ("03/04/2024 9:30 PM", datetime(2024, 3, 4, 21, 30)),
+        ("03/04/2024 21:30", datetime(2024, 3, 4, 21, 30)),
+    ])
+    def test_formats(self, text, expected):
+        assert parse_when(text) == expected
+
+    def test_unrecognised(self):
+        with pytest.raises(ValueError):
+            parse_when("next tuesday")
+
+
+class TestReadCsv:
+    """Test turning CSV records into event bodies."""
+
+    def test_timed_row_with_zone(self):
+        [row] = csv_rows("Title,Start,End,Location,TimeZone\n"
+                         "Standup,2024-03-04 09:00,2024-03-04 09:15,Room 1,America/New_York\n")
+
+        assert row.error is None
+        assert row.body == {
+            'summary': 'Standup', 'location': 'Room 1',
+            'start': {'dateTime': '2024-03-04T09:00:00-05:00', 'timeZone': 'America/New_York'},
+            'end': {'dateTime': '2024-03-04T09:15:00-05:00', 'timeZone': 'America/New_York'},
+        }
+
+    def test_all_day_end_is_inclusive(self):
+        [row] = csv_rows("subject,start,end\nConference,03/04/2024,03/06/2024\n")
+        assert (row.body['start'], row.body['end']) == ({'date': '2024-03-04'}, {'date': '2024-03-07'})
+
+    def test_default_end(self):
+        rows = csv_rows("title,start\nCall,2024-03-04T09:00:00+00:00\nHoliday,2024-03-05\n")
+
+        assert rows[0].body['end'] == {'dateTime': '2024-03-04T10:00:00+00:00'}
+        assert rows[1].body['end'] == {'date': '2024-03-06'}
+
+    def test_invalid_rows_reported_with_lines(self):
+        """Test that bad rows carry an error and their line, and do not stop the rest."""
+        rows = csv_rows("title,start,end\n"
+                        ",2024-03-04,\n"
+                        "Late,2024-03-04T10:00,2024-03-04T09:00\n"
+                        "Odd,soon,\n"
+                        "Zone,2024-03-04T10:00,,\n"
+                        "Fine,2024-03-04,\n")
+
+        assert [(r.line, r.error) for r in rows[:3]] == [
+            (2, "missing title"), (3, "end is not after start"), (4, "unrecognised date/time 'soon'")]
+        assert rows[4].body['summary'] == 'Fine'
+        assert [r.number for r in rows] == [0, 1, 2, 3, 4]
+
+
+class TestReadIcs:
+    """Test reading VEVENTs."""
+
+    def test_events(self):
+        rows = list(read_ics(io.StringIO(ICS)))
+
+        lecture, week, exam, broken = rows
+        assert lecture.body['start'] == {'dateTime': '2024-03-04T09:00:00-05:00', 'timeZone': 'America/New_York'}
+        assert lecture.body['recurrence'] == ['RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=20']
+        assert lecture.body['location'] == 'Hall B, room 2'
+        assert lecture.body['description'] == 'Bring the textbook.\nChapters 1-3.'
+        assert (week.body['start'], week.body['end']) == ({'date': '2024-03-11'}, {'date': '2024-03-16'})
+        assert exam.body['end'] == {'dateTime': '2024-03-20T16:00:00+00:00'}
+        assert (broken.body, broken.error, broken.line) == (None, "missing DTSTART", 27)
+
+    def test_alarm_does_not_override_event_fields(self):
+        [lecture] = list(read_ics(io.StringIO(ICS)))[:1]
+        assert 'Reminder' not in lecture.body['description']
+
+
+class TestImportEvents:
+    """Test batched inserts and resumable checkpoints."""
+
+    def test_batched_inserts_with_stable_ids(self, tmp_path, batch_calendar_service):
+        path = write_csv(tmp_path, 120)
+
+        with patch('builtins.print'):
+            result = import_events(batch_calendar_service, path, batch_size=50)
+
+        assert [len(chunk) for chunk in batch_calendar_service.batches] == [50, 50, 20]
+        assert result == {'status': 'imported', 'imported': 120, 'invalid': []}
+        first = batch_calendar_service.batches[0][0]
+        assert first['calendarId'] == 'primary'
+        assert len(first['body']['id']) == 40
+        assert not os.path.exists(path + ".checkpoint.json")
+
+    def test_failed_import_resumes_where_it_stopped(self, tmp_path, batch_calendar_service, http_error):
+        """Test that a second run skips finished chunks and only retries what failed."""
+        path = write_csv(tmp_path, 120)
+        batch_calendar_service.batch_errors['Shift 60'] = [http_error(400, 'Bad Request')]
+
+        with patch('builtins.print'):
+            first = import_events(batch_calendar_service, path, batch_size=50, sleep=Mock())
+
+        assert first['status'] == 'partial'
+        assert [f['title'] for f in first['failed']] == ['Shift 60']
+        with open(path + ".checkpoint.json") as f:
+            saved = json.load(f)
+        assert (saved['next'], saved['imported'], saved['failed']) == (120, 119, [60])
+
+        batch_calendar_service.batches.clear()
+        with patch('builtins.print'):
+            second = import_events(batch_calendar_service, path, batch_size=50)
+
+        assert inserted(batch_calendar_service) == ['Shift 60']
+        assert second == {'status': 'imported', 'imported': 120, 'invalid': []}
+
+    def test_interrupted_import_resumes_after_last_chunk(self, tmp_path, batch_calendar_service):
+        """Test that a run killed during its second chunk restarts at that chunk."""
+        path = write_csv(tmp_path, 120)
+        make_batch = batch_calendar_service.new_batch_http_request.side_effect
+
+        def interrupted(callback=None):
+            if batch_calendar_service.batches:
+                raise KeyboardInterrupt
+            return make_batch(callback)
+
+        batch_calendar_service.new_batch_http_request.side_effect = interrupted
+
+        with patch('builtins.print'), pytest.raises(KeyboardInterrupt):
+            import_events(batch_calendar_service, path, batch_size=50)
+
+        batch_calendar_service.new_batch_http_request.side_effect = make_batch
+        batch_calendar_service.batches.clear()
+        with patch('builtins.print'):
+            result = import_events(batch_calendar_service, path, batch_size=50)
+
+        assert inserted(batch_calendar_service)[0] == 'Shift 50'
+        assert len(inserted(batch_calendar_service)) == 70
+        assert result['imported'] == 120
+
+    def test_already_created_counts_as_imported(self, tmp_path, batch_calendar_service, http_error):
+        """Test that a 409 for a re-sent row (created before a crash) is not a failure."""
+        path = write_csv(tmp_path, 3)
+        batch_calendar_service.batch_errors['Shift 1'] = [http_error(409, 'Conflict')]
+
+        with patch('builtins.print'):
+            result = import_events(batch_calendar_service, path)
+
+        assert result == {'status': 'imported', 'imported': 3, 'invalid': []}
+
+    def test_mirror_updated(self, tmp_path, batch_calendar_service):
+        """Test that imported single events go into the mirror and a series marks it stale."""
+        path = tmp_path / "term.ics"
+        path.write_text(ICS)
+        mirror = Mock()
+
+        with patch('builtins.print'):
+            import_events(batch_calendar_service, str(path), mirror=mirror)
+
+        assert [c.args[0]['summary'] for c in mirror.put.call_args_list] == ['Reading week', 'Exam']
+        assert all(len(c.args[0]['id']) == 40 for c in mirror.put.call_args_list)
+        mirror.invalidate.assert_called_with('primary')
+
+    def test_changed_file_starts_over(self, tmp_path):
+        path = write_csv(tmp_path, 3)
+        source = Checkpoint.describe_source(path, 'primary')
+        Checkpoint(path + ".checkpoint.json", source, next_row=2, imported=2).save()
+
+        assert Checkpoint.load(path + ".checkpoint.json", source).next_row == 2
+        assert Checkpoint.load(path + ".checkpoint.json", dict(source, size=1)).next_row == 0
+        assert Checkpoint.load(path + ".checkpoint.json", dict(source, calendar_id='team')).next_row == 0
+
+    def test_event_ids_are_stable(self):
+        [row] = csv_rows("title,start\nCall,2024-03-04\n")
+        assert event_id(row, 'primary') == event_id(row, 'primary') != event_id(row, 'team')
@@ -0,0 +1,133 @@
+"""Pytest tests for the event interval index."""
+
+import random
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.intervals import IntervalIndex
+
+
+def brute_window(intervals, lo, hi):
+    hits = [(s, k) for k, s, e in intervals
+            if (hi is None or s < hi) and (lo is None or e > lo)]
+    return [k for _, k in sorted(hits)]
+
+
+@pytest.fixture
+def random_intervals():
+    rng = random.Random(7)
+    intervals = []
+    for i in range(2000):
+        start = rng.randrange(0, 1_000_000)
+        # Mostly meetings, some all-day events, a few multi-week blocks.
+        length = rng.choice([900, 1800, 3600, 3600, 86400, 86400 * 20])
+        intervals.append((f'e{i:04d}', start, start + length))
+    return intervals
+
+
+class TestWindowQueries:
+    """Test window, point and overlap queries against a linear scan."""
+
+    def test_window_matches_scan(self, random_intervals):
+        """Test that windows return exactly the overlapping intervals, in start order."""
+        index = IntervalIndex(random_intervals)
+        rng = random.Random(11)
+        for _ in range(200):
+            lo = rng.randrange(-100_000, 1_100_000)
+            hi = lo + rng.choice([1, 3600, 86400, 604800])
+            assert index.window(lo, hi) == brute_window(random_intervals, lo, hi)
+
+    def test_open_bounds(self, random_intervals):
+        index = IntervalIndex(random_intervals)
+        assert index.window() == brute_window(random_intervals, None, None)
+        assert index.window(lo=900_000) == brute_window(random_intervals, 900_000, None)
+        assert index.window(hi=50_000) == brute_window(random_intervals, None, 50_000)
+
+    def test_point_lookup(self, random_intervals):
+        """Test that at() returns intervals with start <= t < end."""
+        index = IntervalIndex(random_intervals)
+        for t in (0, 123_456, 500_000, 999_999):
+            expected = sorted((s, k) for k, s, e in random_intervals if s <= t < e)
+            assert index.at(t) == [k for _, k in expected]
+
+    def test_overlaps(self, random_intervals):
+        index = IntervalIndex(random_intervals)
+        rng = random.Random(3)
+        for _ in range(200):
+            lo = rng.randrange(0, 1_000_000)
+            hi = lo + 600
+            assert index.overlaps(lo, hi) == bool(brute_window(random_intervals, lo, hi))
+
+    def test_half_open_edges(self):
+        """Test that back-to-back intervals do not overlap."""
+        index = IntervalIndex([('a', 0, 10), ('b', 10, 20)])
+
+        assert index.window(10, 20) == ['b']
+        assert index.at(10) == ['b']
+        assert not index.overlaps(20, 30)
+
+    def test_long_intervals_kept_apart(self):
+        """Test that long intervals do not widen the sorted-array search bound."""
+        index = IntervalIndex([('meeting', 100, 200), ('vacation', 0, 86400 * 30)])
+
+        assert index.max_span == 100
+        assert index.window(150, 160) == ['vacation', 'meeting']
+        assert index.at(86400 * 10) == ['vacation']
+
+
+class TestUpdates:
+    """Test incremental maintenance."""
+
+    def test_add_and_discard(self):
+        index = IntervalIndex()
+        index.add('a', 0, 10, {'summary': 'A'})
+        index.add('b', 5, 15)
+
+        assert index.window(0, 20) == [{'summary': 'A'}, 'b']
+        index.discard('a')
+        index.discard('missing')
+        assert index.window(0, 20) == ['b']
+        assert len(index) == 1 and 'a' not in index
+
+    def test_add_replaces_existing_key(self):
+        """Test that re-adding a key moves the interval."""
+        index = IntervalIndex([('a', 0, 10)])
+        index.add('a', 100, 110)
+
+        assert index.window(0, 50) == []
+        assert index.window(100, 101) == ['a']
+        assert index.get('a') == (100, 110, 'a')
+
+    def test_interval_can_move_between_tables(self):
+        index = IntervalIndex([('a', 0, 10)], long_threshold=100)
+        index.add('a', 0, 1000)
+        assert index.at(500) == ['a']
+        index.add('a', 0, 10)
+        assert index.at(500) == []
+
+    def test_rebuild_tightens_span(self):
+        index = IntervalIndex([('a', 0, 5000), ('b', 0, 10)])
+        index.discard('a')
+        assert index.max_span == 5000
+        index.rebuild()
+        assert index.max_span == 10
+
+    def test_incremental_matches_bulk(self, random_intervals):
+        """Test that adds and discards give the same answers as a fresh build."""
+        index = IntervalIndex()
+        for key, start, end in random_intervals:
+            index.add(key, start, end)
+        for key, _, _ in random_intervals[::3]:
+            index.discard(key)
+        remaining = [iv for i, iv in enumerate(random_intervals) if i % 3]
+
+        for lo in range(0, 1_000_000, 50_000):
+            assert index.window(lo, lo + 86400) == brute_window(remaining, lo, lo + 86400)
+
+    def test_rejects_negative_length(self):
+        with pytest.raises(ValueError):
+            IntervalIndex().add('a', 10, 5)
@@ -0,0 +1,122 @@
+"""Pytest tests for per-stage timing instrumentation."""
+
+import pytest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics as metrics_module
+from metrics import Histogram, Metrics
+from cal.events import view_events
+
+
+class TestHistogram:
+    """Test the fixed-bucket latency histogram."""
+
+    def test_observe_updates_summary(self):
+        """Test count, mean, min and max."""
+        h = Histogram()
+        for seconds in (0.001, 0.002, 0.003):
+            h.observe(seconds)
+
+        assert h.count == 3
+        assert h.mean == pytest.approx(0.002)
+        assert h.min == 0.001
+        assert h.max == 0.003
+
+    def test_percentiles_use_bucket_bounds(self):
+        """Test that percentiles report the bucket upper bound, capped at max."""
+        h = Histogram()
+        for _ in range(90):
+            h.observe(0.0008)  # <= 1ms bucket
+        for _ in range(10):
+            h.observe(0.2)  # <= 250ms bucket
+
+        assert h.percentile(0.5) == 0.001
+        assert h.percentile(0.95) == 0.2
+        assert h.snapshot()["p99"] == 0.2
+
+    def test_empty_histogram(self):
+        """Test an empty histogram's snapshot."""
+        snapshot = Histogram().snapshot()
+
+        assert snapshot["count"] == 0
+        assert snapshot["p50"] == 0.0
+        assert snapshot["min"] == 0.0
+
+
+class TestMetrics:
+    """Test the span registry."""
+
+    def test_disabled_span_records_nothing(self):
+        """Test that spans are no-ops while disabled."""
+        m = Metrics(enabled=False)
+
+        with m.span("parse"):
+            pass
+
+        assert m.snapshot() == {}
+        assert "disabled" in m.dump()
+
+    def test_enabled_span_records_duration(self):
+        """Test that an enabled span adds one observation to its stage."""
+        m = Metrics(enabled=True)
+
+        with patch('metrics.perf_counter', side_effect=[10.0, 10.25]):
+            with m.span("api.events.list"):
+                pass
+
+        snapshot = m.snapshot()["api.events.list"]
+        assert snapshot["count"] == 1
+        assert snapshot["mean"] == pytest.approx(0.25)
+
+    def test_span_records_on_exception(self):
+        """Test that a failing block is still timed."""
+        m = Metrics(enabled=True)
+
+        with pytest.raises(ValueError):
+            with m.span("dispatch"):
+                raise ValueError("boom")
+
+        assert m.snapshot()["dispatch"]["count"] == 1
+
+    def test_dump_lists_every_stage(self):
+        """Test the on-demand table."""
+        m = Metrics(enabled=True)
+        m.observe("parse", 0.001)
+        m.observe("render.events", 0.002)
+
+        table = m.dump()
+
+        assert "parse" in table
+        assert "render.events" in table
+        m.reset()
+        assert m.dump() == "No timings recorded."
+
+
+class TestInstrumentedCalls:
+    """Test that the calendar hot path is instrumented."""
+
+    @pytest.fixture
+    def enabled_metrics(self):
+        """Swap in an enabled registry for the duration of a test."""
+        m = Metrics(enabled=True)
+        with patch.object(metrics_module, 'metrics', m):
+            yield m
+
+    def test_view_events_records_api_and_render(self, enabled_metrics):
+        """Test that view_events times its API call and its output."""
+        service = Mock()
+        service.events.return_value.list.return_value.execute.return_value = {'items': [{
+            'summary': 'Standup',
+            'start': {'dateTime': '2024-01-15T09:00:00+00:00'},
+            'end': {'dateTime': '2024-01-15T09:15:00+00:00'},
+        }]}
+
+        with patch('builtins.print'):
+            view_events(service, {})
+
+        assert set(enabled_metrics.snapshot()) == {"api.events.list", "render.events"}
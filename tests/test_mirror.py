@@ -0,0 +1,389 @@
+"""Pytest tests for the incremental-sync event mirror."""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.events import create_event, delete_events, view_events
+from cal.mirror import EventMirror
+
+
+class FakeCalendarApi:
+    """Minimal events().list backend with pagination, sync tokens and cancellations."""
+
+    def __init__(self, http_error, page_size=2):
+        self.http_error = http_error
+        self.page_size = page_size
+        self.version = 0
+        self.events = {}
+        self.changes = []          # (version, event) for every write
+        self.expired = set()       # sync tokens answered with 410
+        self.calls = []
+
+    def put(self, event_id, summary, start, end, status='confirmed'):
+        self.version += 1
+        event = {'id': event_id, 'status': status, 'summary': summary,
+                 'start': {'dateTime': start}, 'end': {'dateTime': end}}
+        if status == 'cancelled':
+            self.events.pop(event_id, None)
+            event = {'id': event_id, 'status': 'cancelled'}
+        else:
+            self.events[event_id] = event
+        self.changes.append((self.version, event))
+
+    def cancel(self, event_id):
+        self.put(event_id, None, None, None, status='cancelled')
+
+    def service(self):
+        service = Mock()
+        service.events.return_value.list.side_effect = lambda **params: Mock(
+            execute=lambda: self._list(params))
+        service.events.return_value.insert.side_effect = lambda calendarId, body: Mock(
+            execute=lambda: self._insert(body))
+        service.events.return_value.delete.side_effect = lambda calendarId, eventId: Mock(
+            execute=lambda: self.cancel(eventId))
+        return service
+
+    def _insert(self, body):
+        event_id = f"new{self.version}"
+        start = body['start'].get('dateTime')
+        self.put(event_id, body['summary'], start, body['end'].get('dateTime'))
+        return dict(self.events[event_id], htmlLink=f"https://calendar/{event_id}")
+
+    def _list(self, params):
+        self.calls.append(params)
+        if 'syncToken' in params:
+            token = params['syncToken']
+            if token in self.expired:
+                raise self.http_error(410)
+            since = int(token[1:])
+            items = [event for version, event in self.changes if version > since]
+        else:
+            items = sorted(self.events.values(), key=lambda e: e['id'])
+        offset = int(params.get('pageToken') or 0)
+        page = items[offset:offset + self.page_size]
+        response = {'items': page, 'timeZone': 'UTC'}
+        if offset + self.page_size < len(items):
+            response['nextPageToken'] = str(offset + self.page_size)
+        else:
+            response['nextSyncToken'] = f"v{self.version}"
+        return response
+
+
+@pytest.fixture
+def api(http_error):
+    api = FakeCalendarApi(http_error)
+    api.put('a', 'Standup', '2024-01-15T09:00:00+00:00', '2024-01-15T09:15:00+00:00')
+    api.put('b', 'Lunch', '2024-01-15T12:00:00+00:00', '2024-01-15T13:00:00+00:00')
+    api.put('c', 'Review', '2024-01-16T15:00:00+00:00', '2024-01-16T16:00:00+00:00')
+    return api
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def mirror():
+    mirror = EventMirror(":memory:", max_staleness=60, clock=FakeClock())
+    yield mirror
+    mirror.close()
+
+
+class TestSync:
+    """Test full and incremental synchronisation."""
+
+    def test_full_sync_loads_every_page(self, api, mirror):
+        """Test that the first sync pages through all events and stores a sync token."""
+        result = mirror.sync(api.service())
+
+        assert result.full
+        assert mirror.count() == 3
+        assert len(api.calls) == 2
+        assert 'syncToken' not in api.calls[0]
+
+    def test_incremental_sync_applies_deltas(self, api, mirror):
+        """Test that later syncs send the token and apply only the changes."""
+        service = api.service()
+        mirror.sync(service)
+        api.put('d', 'Planning', '2024-01-15T10:00:00+00:00', '2024-01-15T11:00:00+00:00')
+        api.put('b', 'Long lunch', '2024-01-15T12:00:00+00:00', '2024-01-15T14:00:00+00:00')
+
+        result = mirror.sync(service)
+
+        assert not result.full
+        assert api.calls[-1]['syncToken'] == 'v3'
+        assert [e['id'] for e in result.upserted] == ['d', 'b']
+        assert [e['summary'] for e in mirror.query()] == ['Standup', 'Planning', 'Long lunch', 'Review']
+
+    def test_cancelled_events_removed(self, api, mirror):
+        """Test that cancelled events in a delta are deleted locally."""
+        service = api.service()
+        mirror.sync(service)
+        api.cancel('a')
+
+        result = mirror.sync(service)
+
+        assert result.removed == ['a']
+        assert [e['id'] for e in mirror.query()] == ['b', 'c']
+
+    def test_gone_token_triggers_full_resync(self, api, mirror):
+        """Test that a 410 for the sync token reloads the calendar from scratch."""
+        service = api.service()
+        mirror.sync(service)
+        api.expired.add('v3')
+        api.events.pop('c')
+
+        result = mirror.sync(service)
+
+        assert result.full
+        assert [e['id'] for e in mirror.query()] == ['a', 'b']
+
+    def test_other_errors_propagate(self, api, mirror, http_error):
+        """Test that non-410 errors are raised and leave the mirror untouched."""
+        service = api.service()
+        mirror.sync(service)
+        service.events.return_value.list.side_effect = lambda **params: Mock(
+            execute=Mock(side_effect=http_error(500)))
+
+        with pytest.raises(Exception):
+            mirror.sync(service)
+        assert mirror.count() == 3
+
+    def test_calendars_are_separate(self, api, mirror):
+        """Test that each calendar keeps its own events and sync token."""
+        mirror.sync(api.service(), 'work')
+
+        assert mirror.count('work') == 3
+        assert mirror.count('primary') == 0
+        assert mirror.age('primary') is None
+
+    def test_all_day_events(self, http_error, mirror):
+        """Test that all-day events are placed at midnight in the calendar's time zone."""
+        api = FakeCalendarApi(http_error)
+        api.version += 1
+        api.events['x'] = {'id': 'x', 'summary': 'Holiday', 'start': {'date': '2024-01-15'},
+                           'end': {'date': '2024-01-16'}}
+        mirror.sync(api.service())
+
+        assert [e['id'] for e in mirror.query(time_min='2024-01-15T12:00:00+00:00',
+                                              time_max='2024-01-15T13:00:00+00:00')] == ['x']
+        assert mirror.query(time_min='2024-01-16T00:00:00+00:00') == []
+
+
+class TestStaleness:
+    """Test the max-staleness window."""
+
+    def test_fresh_mirror_skips_network(self, api, mirror):
+        service = api.service()
+        mirror.ensure_fresh(service)
+        mirror._clock.now += 30
+
+        assert mirror.ensure_fresh(service) is None
+        assert len(api.calls) == 2
+
+    def test_stale_mirror_syncs(self, api, mirror):
+        service = api.service()
+        mirror.ensure_fresh(service)
+        mirror._clock.now += 61
+
+        assert mirror.ensure_fresh(service) is not None
+        assert 'syncToken' in api.calls[-1]
+
+    def test_invalidated_mirror_syncs(self, api, mirror):
+        """Test that a calendar marked stale syncs on the next read, however recent its last sync."""
+        service = api.service()
+        mirror.ensure_fresh(service)
+
+        mirror.invalidate()
+
+        assert mirror.ensure_fresh(service) is not None
+        assert mirror.ensure_fresh(service) is None
+
+
+class TestQuery:
+    """Test reads from the mirror."""
+
+    @pytest.fixture
+    def synced(self, api, mirror):
+        mirror.sync(api.service())
+        return mirror
+
+    def test_window_overlap(self, synced):
+        """Test that events overlapping the window are returned in start order."""
+        events = synced.query(time_min='2024-01-15T09:10:00+00:00', time_max='2024-01-15T12:30:00+00:00')
+        assert [e['id'] for e in events] == ['a', 'b']
+
+    def test_window_with_datetimes(self, synced):
+        events = synced.query(time_min=datetime(2024, 1, 16, tzinfo=timezone.utc),
+                              time_max=datetime(2024, 1, 17, tzinfo=timezone.utc))
+        assert [e['id'] for e in events] == ['c']
+
+    def test_loaded_index_follows_deltas(self, api, mirror):
+        """Test that a warm index is patched by incremental syncs."""
+        service = api.service()
+        mirror.sync(service)
+        assert len(mirror.query(time_min='2024-01-15T00:00:00+00:00', time_max='2024-01-16T00:00:00+00:00')) == 2
+        api.cancel('a')
+        api.put('c', 'Review', '2024-01-15T15:00:00+00:00', '2024-01-15T16:00:00+00:00')
+
+        mirror.sync(service)
+
+        events = mirror.query(time_min='2024-01-15T00:00:00+00:00', time_max='2024-01-16T00:00:00+00:00')
+        assert [e['id'] for e in events] == ['b', 'c']
+
+    def test_title_filter(self, synced):
+        """Test case-insensitive summary matching, with LIKE wildcards taken literally."""
+        assert [e['id'] for e in synced.query(title='lun')] == ['b']
+        assert synced.query(title='%') == []
+
+
+class TestDiscard:
+    """Test forgetting events deleted through the API."""
+
+    def test_discard_updates_table_and_index(self, api, mirror):
+        mirror.sync(api.service())
+        assert len(mirror.query()) == 3
+
+        mirror.discard(['b', 'missing'])
+
+        assert [e['id'] for e in mirror.query()] == ['a', 'c']
+        assert mirror.count() == 2
+
+    def test_discarding_a_master_drops_its_instances(self, http_error, mirror):
+        api = FakeCalendarApi(http_error)
+        api.version += 1
+        for day in (15, 16):
+            api.events[f'gym_{day}'] = {'id': f'gym_{day}', 'summary': 'Gym', 'recurringEventId': 'gym',
+                                        'start': {'dateTime': f'2024-01-{day}T07:00:00+00:00'},
+                                        'end': {'dateTime': f'2024-01-{day}T08:00:00+00:00'}}
+        mirror.sync(api.service())
+
+        mirror.discard(['gym'])
+
+        assert mirror.query() == []
+
+    def test_delete_events_drops_deleted_ids(self, api, mirror):
+        """Test that a delete is visible in reads from the mirror before the next sync."""
+        service = api.service()
+        mirror.sync(service)
+
+        with patch('builtins.print'):
+            delete_events(service, 'Lunch', '2024-01-15T00:00:00+00:00', '2024-01-16T00:00:00+00:00',
+                          None, False, mirror=mirror)
+
+        assert mirror.ensure_fresh(service) is None
+        assert [e['id'] for e in mirror.query()] == ['a', 'c']
+
+
+class TestViewEventsFromMirror:
+    """Test view_events answered from the mirror."""
+
+    def test_view_reads_mirror_without_listing(self, api, mirror):
+        """Test that a fresh mirror serves a view without any API call."""
+        service = api.service()
+        mirror.sync(service)
+        calls = len(api.calls)
+
+        with patch('builtins.print') as mock_print:
+            view_events(service, {'start': '2024-01-15T00:00:00+00:00', 'end': '2024-01-16T00:00:00+00:00'},
+                        mirror=mirror)
+
+        assert len(api.calls) == calls
+        assert [c[0][0] for c in mock_print.call_args_list] == ['Standup: 9 AM to 9 AM', 'Lunch: 12 PM to 1 PM']
+
+    def test_view_syncs_cold_mirror(self, api, mirror):
+        """Test that the first view fills the mirror."""
+        with patch('builtins.print'):
+            view_events(api.service(), {'title': 'Review'}, mirror=mirror)
+
+        assert mirror.count() == 3
+
+
+class TestBusy:
+    """Test which mirrored events count as busy."""
+
+    def test_transparent_and_declined_ignored(self, api, mirror):
+        api.put('free', 'Focus (free)', '2024-01-15T09:00:00+00:00', '2024-01-15T10:00:00+00:00')
+        api.events['free']['transparency'] = 'transparent'
+        api.put('declined', 'Sync', '2024-01-15T09:00:00+00:00', '2024-01-15T10:00:00+00:00')
+        api.events['declined']['attendees'] = [{'self': True, 'responseStatus': 'declined'}]
+        mirror.sync(api.service())
+
+        busy = mirror.busy('primary', '2024-01-15T09:00:00+00:00', '2024-01-15T10:00:00+00:00')
+
+        assert [e['id'] for e in busy] == ['a']
+
+    def test_all_day_range(self, api, mirror):
+        """Test that a date-only range with equal ends covers the whole day."""
+        mirror.sync(api.service())
+
+        assert [e['id'] for e in mirror.busy('primary', '2024-01-16', '2024-01-16')] == ['c']
+
+
+class TestCreateEventConflicts:
+    """Test the conflict check in create_event."""
+
+    def test_conflict_reported_and_not_inserted(self, api, mirror):
+        """Test that an overlapping slot is reported and nothing is inserted."""
+        service = api.service()
+        mirror.sync(service)
+
+        with patch('builtins.print') as mock_print:
+            result = create_event(service, 'Dentist', '2024-01-15T12:30:00+00:00',
+                                  '2024-01-15T13:30:00+00:00', mirror=mirror)
+
+        assert result['status'] == 'conflict'
+        assert [e['id'] for e in result['conflicts']] == ['b']
+        service.events.return_value.insert.assert_not_called()
+        assert 'Lunch' in mock_print.call_args_list[1][0][0]
+
+    def test_free_slot_inserted_and_mirrored(self, api, mirror):
+        """Test that a free slot is inserted and the next check sees it without a sync."""
+        service = api.service()
+        mirror.sync(service)
+        calls = len(api.calls)
+
+        with patch('builtins.print'):
+            assert create_event(service, 'Dentist', '2024-01-15T14:00:00+00:00',
+                                '2024-01-15T15:00:00+00:00', mirror=mirror) is None
+            result = create_event(service, 'Gym', '2024-01-15T14:30:00+00:00',
+                                  '2024-01-15T15:30:00+00:00', mirror=mirror)
+
+        assert [e['summary'] for e in result['conflicts']] == ['Dentist']
+        assert len(api.calls) == calls
+
+    def test_force_and_disabled_check_insert(self, api, mirror):
+        """Test that force or check_conflicts=False inserts despite an overlap."""
+        service = api.service()
+        mirror.sync(service)
+
+        with patch('builtins.print'):
+            create_event(service, 'A', '2024-01-15T12:00:00+00:00', '2024-01-15T12:30:00+00:00',
+                         mirror=mirror, force=True)
+            create_event(service, 'B', '2024-01-15T12:00:00+00:00', '2024-01-15T12:30:00+00:00',
+                         mirror=mirror, check_conflicts=False)
+
+        assert service.events.return_value.insert.call_count == 2
+
+    def test_stale_mirror_synced_before_check(self, api, mirror):
+        """Test that a change made elsewhere is picked up once the mirror is stale."""
+        service = api.service()
+        mirror.sync(service)
+        api.put('x', 'Call', '2024-01-15T16:00:00+00:00', '2024-01-15T17:00:00+00:00')
+        mirror._clock.now += 61
+
+        with patch('builtins.print'):
+            result = create_event(service, 'Dentist', '2024-01-15T16:30:00+00:00',
+                                  '2024-01-15T17:30:00+00:00', mirror=mirror)
+
+        assert [e['id'] for e in result['conflicts']] == ['x']
@@ -0,0 +1,595 @@
+"""Pytest tests for the natural-language command parser."""
+
+import pytest
+from unittest.mock import patch
+import pickle
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.parser import (lex_command, parse_input, parse_many, ParseResult, ParsedCommand, DateCache,
+                        FastDateResolver, DateBackendRegistry, date_backends, extract_datetime,
+                        local_tz, _get_pdt_calendar, _UNSET)
+
+
+class TestLexCommand:
+    """Test the single-pass command lexer."""
+
+    def test_lex_create_with_title_and_time(self):
+        """Test a typical create command."""
+        lexed = lex_command("calendar create event called Meeting on friday at 2pm")
+
+        assert lexed.intention == "create"
+        assert lexed.object == "event"
+        assert lexed.title == "Meeting"
+        assert lexed.when_text == "friday"
+        assert lexed.start_time == "2pm"
+        assert lexed.end_time is None
+        assert lexed.scope is None
+        assert lexed.force is False
+
+    def test_lex_time_range(self):
+        """Test that 'from X to Y' is split off the date phrase."""
+        lexed = lex_command("schedule event named standup on friday from 9 to 10am")
+
+        assert lexed.when_text == "friday"
+        assert lexed.start_time == "9"
+        assert lexed.end_time == "10am"
+
+    @pytest.mark.parametrize("text,title", [
+        ("create task called 'buy milk' on monday", "buy milk"),
+        ('add event titled "Dentist visit" on monday', "Dentist visit"),
+        ("create event name it review", "review"),
+        ("create event called itinerary", "itinerary"),
+    ])
+    def test_lex_title_forms(self, text, title):
+        """Test quoted, single-word and multi-word title triggers."""
+        assert lex_command(text).title == title
+
+    def test_lex_keeps_original_case(self):
+        """Test that intention and object keep the user's casing."""
+        lexed = lex_command("DELETE Events tomorrow")
+
+        assert lexed.intention == "DELETE"
+        assert lexed.object == "Events"
+
+    def test_lex_keywords_inside_words_are_ignored(self):
+        """Test that keywords only match whole words."""
+        lexed = lex_command("recreate eventful taskbar on-site")
+
+        assert lexed.intention is None
+        assert lexed.object is None
+        assert lexed.when_text is None
+
+    @pytest.mark.parametrize("text", [
+        "delete events anyway",
+        "force delete events",
+        "I'm sure, delete events",
+        "I’m sure delete events",
+        "yes, delete events",
+        "yes delete events",
+    ])
+    def test_lex_force_phrases(self, text):
+        """Test every force wording."""
+        assert lex_command(text).force is True
+
+    @pytest.mark.parametrize("text,scope", [
+        ("delete all events", "all"),
+        ("delete everything", "all"),
+        ("delete every event", "all"),
+        ("delete events", None),
+    ])
+    def test_lex_scope(self, text, scope):
+        """Test scope detection."""
+        assert lex_command(text).scope == scope
+
+    def test_lex_a_week_phrase(self):
+        """Test that 'a week' starts the date phrase without a preposition."""
+        assert lex_command("view events a week from now").when_text == "a week from now"
+
+    def test_lex_split_word_at_start_is_not_a_split(self):
+        """Test that a leading preposition is part of the summary, not the date."""
+        lexed = lex_command("on second thought view events")
+
+        assert lexed.when_text is None
+
+    def test_lex_empty_input(self):
+        """Test lexing an empty string."""
+        lexed = lex_command("")
+
+        assert lexed.intention is None
+        assert lexed.object is None
+        assert lexed.title is None
+        assert lexed.when_text is None
+        assert lexed.force is False
+
+
+class TestDateCache:
+    """Test the memoizing date-resolution cache."""
+
+    NOW = datetime(2024, 1, 15, 10, 30, 5, tzinfo=timezone.utc)
+
+    @pytest.fixture
+    def resolver(self):
+        """A fake backend that records its calls."""
+        calls = []
+
+        def resolve(text, now):
+            calls.append(text)
+            if text.strip().lower() == "tomorrow":
+                return (now + timedelta(days=1)).replace(hour=9, minute=0, second=0)
+            if text == "friday":
+                return now + timedelta(days=4)  # keeps the clock time, like parsedatetime
+            if text == "in 2 hours":
+                return now + timedelta(hours=2)
+            if text == "2024-03-01 at 3pm":
+                return datetime(2024, 3, 1, 15, 0, tzinfo=timezone.utc)
+            return None
+
+        resolve.calls = calls
+        return resolve
+
+    def test_repeated_phrase_hits_cache(self, resolver):
+        """Test that a repeated phrase is resolved only once."""
+        cache = DateCache(maxsize=8)
+
+        first = cache.resolve("tomorrow", resolver, self.NOW)
+        second = cache.resolve("  Tomorrow ", resolver, self.NOW + timedelta(minutes=5))
+
+        assert first == second == datetime(2024, 1, 16, 9, 0, tzinfo=timezone.utc)
+        assert resolver.calls == ["tomorrow"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_unparseable_phrase_is_cached(self, resolver):
+        """Test that a miss from every backend is remembered too."""
+        cache = DateCache(maxsize=8)
+
+        assert cache.resolve("gibberish", resolver, self.NOW) is None
+        assert cache.resolve("gibberish", resolver, self.NOW) is None
+        assert resolver.calls == ["gibberish"]
+
+    def test_clock_relative_phrase_moves_with_now(self, resolver):
+        """Test that 'in 2 hours' is recomputed from the current time on a hit."""
+        cache = DateCache(maxsize=8)
+        later = self.NOW + timedelta(minutes=20)
+
+        cache.resolve("in 2 hours", resolver, self.NOW)
+        result = cache.resolve("in 2 hours", resolver, later)
+
+        assert result == later + timedelta(hours=2)
+        assert len(resolver.calls) == 1
+
+    def test_clock_time_of_day_is_refreshed(self, resolver):
+        """Test that a date carrying the clock's time of day keeps tracking the clock."""
+        cache = DateCache(maxsize=8)
+        later = self.NOW + timedelta(minutes=20)
+
+        cache.resolve("friday", resolver, self.NOW)
+        result = cache.resolve("friday", resolver, later)
+
+        assert result == later + timedelta(days=4)
+        assert len(resolver.calls) == 1
+
+    def test_relative_entries_expire_on_day_change(self, resolver):
+        """Test that relative phrases are dropped when the local day changes."""
+        cache = DateCache(maxsize=8)
+        next_day = self.NOW + timedelta(days=1)
+
+        cache.resolve("tomorrow", resolver, self.NOW)
+        result = cache.resolve("tomorrow", resolver, next_day)
+
+        assert result == datetime(2024, 1, 17, 9, 0, tzinfo=timezone.utc)
+        assert len(resolver.calls) == 2
+        assert cache.stats()["expirations"] == 1
+
+    def test_absolute_entries_survive_day_change(self, resolver):
+        """Test that explicit dates stay cached across days."""
+        cache = DateCache(maxsize=8)
+
+        cache.resolve("2024-03-01 at 3pm", resolver, self.NOW)
+        cache.resolve("2024-03-01 at 3pm", resolver, self.NOW + timedelta(days=3))
+
+        assert len(resolver.calls) == 1
+        assert cache.stats()["expirations"] == 0
+
+    def test_lru_eviction(self, resolver):
+        """Test that the least recently used entry is evicted at capacity."""
+        cache = DateCache(maxsize=2)
+
+        cache.resolve("tomorrow", resolver, self.NOW)
+        cache.resolve("friday", resolver, self.NOW)
+        cache.resolve("tomorrow", resolver, self.NOW)  # refresh recency
+        cache.resolve("in 2 hours", resolver, self.NOW)  # evicts "friday"
+        cache.resolve("friday", resolver, self.NOW)
+
+        assert resolver.calls == ["tomorrow", "friday", "in 2 hours", "friday"]
+        assert cache.stats()["evictions"] == 2
+        assert cache.stats()["size"] == 2
+
+    def test_zero_size_disables_cache(self, resolver):
+        """Test that maxsize=0 always calls the backend."""
+        cache = DateCache(maxsize=0)
+
+        cache.resolve("tomorrow", resolver, self.NOW)
+        cache.resolve("tomorrow", resolver, self.NOW)
+
+        assert len(resolver.calls) == 2
+
+
+class TestFastDateResolver:
+    """Test the fast-path date grammar against the parsedatetime backend."""
+
+    PHRASES = [
+        "today", "tomorrow", "Tomorrow", "friday", "Fri", "sunday", "next friday",
+        "next monday", "next sat", "2024-05-03", "2024-5-3", "tomorrow at 3pm",
+        "next friday at 3pm", "today at noon", "friday at 10:30am", "2024-05-03 at 15:00",
+        "today at midnight", "3pm", "3 PM", "10:30am", "14:00", "0:30", "12am", "12pm",
+        "noon", "at 3pm", "at noon",
+    ]
+
+    @pytest.mark.parametrize("weekday", range(7))
+    @pytest.mark.parametrize("text", PHRASES)
+    def test_matches_parsedatetime(self, text, weekday):
+        """Differential test: every fast-path hit equals the backend's answer."""
+        now = datetime(2026, 3, 2, 13, 14, 15, tzinfo=local_tz) + timedelta(days=weekday)
+        expected, status = _get_pdt_calendar().parseDT(text, sourceTime=now, tzinfo=local_tz)
+
+        result = FastDateResolver().resolve(text, now)
+
+        assert status > 0
+        assert result == expected
+        assert result.utcoffset() == expected.utcoffset()
+
+    @pytest.mark.parametrize("text", [
+        "2", "at 9", "tomorrow at 9", "weds", "this friday", "2024-02-30",
+        "25:00", "13pm", "in 2 hours", "a week from now",
+    ])
+    def test_unsupported_shapes_miss(self, text):
+        """Test that anything outside the grammar falls through."""
+        now = datetime(2026, 3, 2, 13, 14, 15, tzinfo=local_tz)
+
+        assert FastDateResolver().resolve(text, now) is None
+
+    def test_hit_rate(self):
+        """Test hit/miss accounting."""
+        resolver = FastDateResolver()
+        now = datetime(2026, 3, 2, 13, 14, 15, tzinfo=local_tz)
+
+        for text in ("today", "friday", "3pm", "in 2 hours"):
+            resolver.resolve(text, now)
+
+        assert resolver.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+
+
+class TestDateBackendRegistry:
+    """Test the pluggable date-backend chain."""
+
+    NOW = datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)
+
+    def test_default_chain(self):
+        """Test that the module registry starts fast path first."""
+        assert date_backends.order[0] == "fast_path"
+        assert set(date_backends.order) == {"fast_path", "parsedatetime", "dateparser"}
+
+    def test_first_success_wins(self):
+        """Test that later backends are skipped after a success."""
+        registry = DateBackendRegistry(reorder_every=0)
+        registry.register("none", lambda text, now: None)
+        registry.register("hit", lambda text, now: now)
+        registry.register("never", lambda text, now: pytest.fail("should not run"))
+
+        assert registry.resolve("today", self.NOW) == self.NOW
+        assert [s["calls"] for s in registry.stats()] == [1, 1, 0]
+        assert registry.stats()[0]["success_rate"] == 0.0
+        assert registry.stats()[1]["success_rate"] == 1.0
+
+    def test_all_backends_miss(self):
+        """Test that a phrase nobody understands resolves to None."""
+        registry = DateBackendRegistry()
+        registry.register("none", lambda text, now: None)
+
+        assert registry.resolve("gibberish", self.NOW) is None
+
+    def test_reorder_by_cost(self):
+        """Test that the cheapest successful backend moves to the front."""
+        registry = DateBackendRegistry(min_calls=10)
+        slow = registry.register("slow", lambda text, now: now)
+        fast = registry.register("fast", lambda text, now: now)
+        for _ in range(10):
+            slow.record(0.010, True)
+            fast.record(0.001, True)
+
+        registry.reorder()
+
+        assert registry.order == ["fast", "slow"]
+
+    def test_unreliable_backend_ranks_lower(self):
+        """Test that a cheap backend that rarely succeeds is not preferred."""
+        registry = DateBackendRegistry(min_calls=10)
+        cheap = registry.register("cheap", lambda text, now: None)
+        solid = registry.register("solid", lambda text, now: now)
+        for _ in range(20):
+            cheap.record(0.001, False)
+            solid.record(0.002, True)
+
+        registry.reorder()
+
+        assert registry.order == ["solid", "cheap"]
+
+    def test_backends_without_samples_keep_their_place(self):
+        """Test that reordering only moves backends with enough data."""
+        registry = DateBackendRegistry(min_calls=10)
+        a = registry.register("a", lambda text, now: now)
+        registry.register("new", lambda text, now: now)
+        c = registry.register("c", lambda text, now: now)
+        for _ in range(10):
+            a.record(0.010, True)
+            c.record(0.001, True)
+
+        registry.reorder()
+
+        assert registry.order == ["c", "new", "a"]
+
+    def test_reorder_stays_within_groups(self):
+        """Test that a backend only trades places with backends of its own group."""
+        registry = DateBackendRegistry(min_calls=10)
+        slow = registry.register("slow", lambda text, now: now, group="a")
+        other = registry.register("other", lambda text, now: now, group="b")
+        fast = registry.register("fast", lambda text, now: now, group="a")
+        for backend, latency in ((slow, 0.010), (other, 0.0001), (fast, 0.001)):
+            for _ in range(10):
+                backend.record(latency, True)
+
+        registry.reorder()
+
+        assert registry.order == ["fast", "other", "slow"]
+
+    def test_dateparser_never_ahead_of_parsedatetime(self):
+        """Test that however cheap dateparser looks, it stays behind parsedatetime."""
+        registry = DateBackendRegistry(min_calls=10)
+        for backend in date_backends._backends:
+            registry.register(backend.name, backend.func, group=backend.group)
+        latencies = {"fast_path": 0.005, "parsedatetime": 0.001, "dateparser": 0.00001}
+        for backend in registry._backends:
+            for _ in range(20):
+                backend.record(latencies[backend.name], True)
+
+        registry.reorder()
+
+        assert registry.order == ["parsedatetime", "fast_path", "dateparser"]
+
+    def test_register_position_and_unregister(self):
+        """Test inserting a backend at a position and removing it again."""
+        registry = DateBackendRegistry()
+        registry.register("a", lambda text, now: None)
+        registry.register("b", lambda text, now: None, position=0)
+        assert registry.order == ["b", "a"]
+
+        registry.unregister("b")
+        assert registry.order == ["a"]
+
+
+class TestParseInputNonInteractive:
+    """Test parse_input with interactive=False."""
+
+    @pytest.fixture(autouse=True)
+    def no_stdin(self):
+        """Fail the test if anything tries to prompt."""
+        with patch('builtins.input', side_effect=AssertionError("prompted")):
+            yield
+
+    def test_complete_command_has_nothing_missing(self):
+        """Test a fully specified command."""
+        result = parse_input("create event called Standup tomorrow at 9am", interactive=False)
+
+        assert isinstance(result, ParseResult)
+        assert result.missing == ()
+        assert result.command.intention == "create"
+        assert result.command.object == "event"
+        assert result.command.title == "Standup"
+        assert result.command.start is not None and "T" in result.command.start
+
+    def test_create_without_time_reports_start_and_end(self):
+        """Test that a create command lacking a time lists start and end."""
+        result = parse_input("create event called Standup", interactive=False)
+
+        assert result.missing == ('start', 'end')
+        assert result.command.start is None
+        assert result.command.end is None
+
+    def test_view_without_date_is_complete(self):
+        """Test that view commands never require a title or time."""
+        result = parse_input("view events", interactive=False)
+
+        assert result.missing == ()
+
+    def test_missing_intention_and_object(self):
+        """Test that intention and object are reported first."""
+        result = parse_input("something tomorrow", interactive=False)
+
+        assert result.missing[:2] == ('intention', 'object')
+
+    def test_answers_fill_missing_fields(self):
+        """Test answering follow-up questions one at a time."""
+        result = parse_input("an event on friday", interactive=False)
+        assert result.missing == ('intention',)
+
+        result = result.answer('intention', 'create')
+        assert result.missing == ('title',)
+
+        result = result.answer('title', 'Lunch')
+        assert result.missing == ()
+        assert result.command.title == 'Lunch'
+
+    def test_answered_start_is_used(self):
+        """Test that a start given in a follow-up becomes the command's start."""
+        result = parse_input("create event called Standup", interactive=False)
+
+        result = result.answer('start', 'tomorrow at 9am')
+
+        assert result.missing == ('end',)
+        assert result.command.start == result.command.given_start.isoformat()
+
+    def test_unresolvable_time_answer_stays_missing(self):
+        """Test that a start time that cannot be parsed is asked again."""
+        result = parse_input("create event called Standup", interactive=False)
+
+        with patch('cal.parser.extract_datetime', return_value=None):
+            result = result.answer('start', 'whenever')
+
+        assert result.missing == ('start', 'end')
+
+
+class TestParseInputInteractive:
+    """Test the default, prompting mode of parse_input."""
+
+    def test_prompts_for_missing_fields(self):
+        """Test that missing fields are asked for in order and used."""
+        with patch('builtins.input', side_effect=["Standup", "tomorrow at 9am", "tomorrow at 10am"]) as mock_input:
+            parsed = parse_input("create event")
+
+        assert [c.args[0] for c in mock_input.call_args_list] == [
+            "What should this event be called? ", "When should it start? ", "When should it end? "
+        ]
+        assert isinstance(parsed, ParsedCommand)
+        assert parsed.title == "Standup"
+        assert parsed.start_dt.hour == 9
+        assert parsed.end_dt.hour == 10
+
+
+class TestParsedCommand:
+    """Test the immutable parsed-command type."""
+
+    def test_is_immutable(self):
+        """Test that fields cannot be reassigned or added."""
+        command = parse_input("view events tomorrow", interactive=False).command
+
+        with pytest.raises(AttributeError):
+            command.title = "x"
+        with pytest.raises(AttributeError):
+            command.extra = 1
+
+    def test_has_no_instance_dict(self):
+        """Test that the type is slotted."""
+        command = parse_input("view events", interactive=False).command
+
+        assert not hasattr(command, '__dict__')
+
+    def test_date_only_command_uses_day_bounds(self):
+        """Test that a date without a time spans the whole day."""
+        command = parse_input("view events on 2024-05-03", interactive=False).command
+
+        assert command.is_date_only is True
+        assert command.rfc3339_bounds == command.day_bounds
+        assert command.start.startswith("2024-05-03T00:00:00")
+        assert command.end.startswith("2024-05-04T00:00:00")
+
+    def test_time_range(self):
+        """Test start/end for an explicit time range."""
+        command = parse_input("create event called Review on 2024-05-03 from 1:30pm to 2:30pm",
+                              interactive=False).command
+
+        assert command.is_date_only is False
+        assert command.start_dt == command.date.replace(hour=13, minute=30)
+        assert command.end_dt == command.date.replace(hour=14, minute=30)
+
+    def test_default_duration_is_one_hour(self):
+        """Test that a start without an end lasts an hour."""
+        command = parse_input("create event called Review on 2024-05-03 at 3pm", interactive=False).command
+
+        assert command.end_dt - command.start_dt == timedelta(hours=1)
+
+    def test_each_phrase_resolved_once(self):
+        """Test that derived fields are computed once and remembered."""
+        command = parse_input("create event called Review on 2024-05-03 from 1pm to 2pm",
+                              interactive=False).command
+        command = command.replace()  # fresh, nothing resolved yet
+
+        with patch('cal.parser.extract_datetime', wraps=extract_datetime) as mock_extract:
+            for _ in range(3):
+                command.start, command.end, command.date, command.start_dt, command.end_dt
+
+        assert sorted(c.args[0] for c in mock_extract.call_args_list) == ["1pm", "2024-05-03", "2pm"]
+
+    def test_dict_compatible_access(self):
+        """Test get()/[] with the keys of the old cal_info dict."""
+        command = parse_input("delete all events on tomorrow anyway", interactive=False).command
+
+        assert command['scope'] == "all"
+        assert command.get('force') is True
+        assert command.get('unknown', 'default') == 'default'
+        assert set(command.as_dict()) == {
+            'intention', 'object', 'title', 'start', 'end', 'date', 'scope', 'force', 'raw_text'
+        }
+        with pytest.raises(KeyError):
+            command['unknown']
+
+    def test_pickle_keeps_resolved_fields(self):
+        """Test that a command crossing a process boundary keeps its resolved dates."""
+        command = parse_input("view events on 2024-05-03", interactive=False).command
+        command.start  # resolve
+
+        restored = pickle.loads(pickle.dumps(command))
+
+        assert restored == command
+        assert restored._bounds == command._bounds
+
+
+class TestParseMany:
+    """Test bulk parsing."""
+
+    COMMANDS = [
+        "create event called Standup tomorrow at 9am",
+        "view events on friday",
+        "delete all events on tomorrow anyway",
+        "create task called laundry",
+        "something unrelated",
+    ]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results_in_input_order(self, workers):
+        """Test that results line up with the input, with or without a pool."""
+        results = list(parse_many(self.COMMANDS * 3, workers=workers, chunk_size=2))
+
+        assert [r.command.raw_text for r in results] == self.COMMANDS * 3
+        assert all(isinstance(r, ParseResult) for r in results)
+        assert results[0].command.title == "Standup"
+        assert results[2].command.force is True
+        assert results[3].missing == ('start', 'end')
+        assert results[4].missing == ('intention', 'object')
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_dates_resolved_in_workers(self, workers):
+        """Test that results arrive with their date fields already computed."""
+        results = list(parse_many(self.COMMANDS[:3], workers=workers))
+
+        for result in results:
+            assert all(getattr(result.command, slot) is not _UNSET
+                       for slot in ('_date', '_parsed_start', '_parsed_end', '_bounds'))
+        assert results[1].command._bounds[0] is not None
+        with patch('cal.parser.extract_datetime', side_effect=AssertionError("resolved in parent")):
+            assert results[1].command.start == results[1].command.rfc3339_bounds[0]
+
+    def test_is_lazy(self):
+        """Test that input is consumed only as results are requested."""
+        consumed = []
+
+        def source():
+            for command in self.COMMANDS:
+                consumed.append(command)
+                yield command
+
+        results = parse_many(source(), workers=1, chunk_size=2)
+        assert consumed == []
+
+        next(results)
+        assert consumed == self.COMMANDS[:2]
+
+    def test_never_prompts(self):
+        """Test that bulk parsing does not read stdin."""
+        with patch('builtins.input', side_effect=AssertionError("prompted")):
+            assert len(list(parse_many(["create event"], workers=1))) == 1
@@ -0,0 +1,183 @@
+"""Pytest tests for pooled Google API service clients."""
+
+import gc
+import threading
+import pytest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import authentication
+from auth.pool import ServicePool
+from exceptions import ServiceUnavailableError
+
+
+def make_pool(size=2, timeout=None):
+    """A pool whose factory builds distinct Mock services."""
+    factory = Mock(side_effect=lambda: Mock())
+    return ServicePool('calendar', factory, size=size, timeout=timeout), factory
+
+
+class TestServicePool:
+    """Test checkout/return and thread-local ownership."""
+
+    def test_checkout_reuses_returned_service(self):
+        """Test that a returned service is handed out again instead of building a new one."""
+        pool, factory = make_pool()
+        with pool.checkout() as first:
+            pass
+        with pool.checkout() as second:
+            pass
+
+        assert first is second
+        assert factory.call_count == 1
+
+    def test_concurrent_checkouts_get_distinct_services(self):
+        """Test that two simultaneous borrowers never share a service."""
+        pool, factory = make_pool()
+        with pool.checkout() as first, pool.checkout() as second:
+            assert first is not second
+        assert pool.stats()["created"] == 2
+        assert pool.stats()["idle"] == 2
+
+    def test_size_is_bounded(self):
+        """Test that a full pool times out instead of building more services."""
+        pool, factory = make_pool(size=1, timeout=0.01)
+        with pool.checkout():
+            with pytest.raises(ServiceUnavailableError, match="calendar"):
+                pool.acquire()
+
+        assert factory.call_count == 1
+        assert pool.stats()["timeouts"] == 1
+
+    def test_waiter_receives_released_service(self):
+        """Test that a blocked caller gets the service as soon as it is returned."""
+        pool, _ = make_pool(size=1, timeout=5)
+        service = pool.acquire()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.acquire()))
+        waiter.start()
+        pool.release(service)
+        waiter.join(5)
+
+        assert received == [service]
+        assert pool.stats()["waits"] == 1
+
+    def test_wait_time_recorded(self):
+        """Test that waiting for a service is observed as pool.<name>.wait."""
+        pool, _ = make_pool(size=1, timeout=0.01)
+        fake_metrics = Mock()
+        with patch('auth.pool.metrics', fake_metrics), pool.checkout():
+            with pytest.raises(ServiceUnavailableError):
+                pool.acquire()
+
+        stage, seconds = fake_metrics.observe.call_args[0]
+        assert stage == "pool.calendar.wait"
+        assert seconds >= 0.01
+
+    def test_factory_failure_frees_slot(self):
+        """Test that a failed build does not count against the pool size."""
+        factory = Mock(side_effect=[RuntimeError("auth failed"), Mock()])
+        pool = ServicePool('tasks', factory, size=1, timeout=0.01)
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+
+        assert pool.acquire() is not None
+
+    def test_local_is_stable_per_thread(self):
+        """Test that local() returns the same service within a thread and different ones across threads."""
+        pool, _ = make_pool()
+        main = pool.local()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(pool.local()))
+        thread.start()
+        thread.join()
+
+        assert pool.local() is main
+        assert other[0] is not main
+
+    def test_local_returned_when_thread_exits(self):
+        """Test that a thread's service goes back to the pool once the thread is gone."""
+        pool, factory = make_pool(size=1, timeout=1)
+        thread = threading.Thread(target=pool.local)
+        thread.start()
+        thread.join()
+        del thread
+        gc.collect()
+
+        with pool.checkout():
+            pass
+        assert factory.call_count == 1
+
+    def test_clear_builds_fresh_services(self):
+        """Test that clear discards existing services, including thread-local ones."""
+        pool, factory = make_pool()
+        before = pool.local()
+        pool.clear()
+
+        assert pool.local() is not before
+        assert factory.call_count == 2
+        assert pool.stats()["created"] == 1
+
+    def test_checkout_from_before_clear_is_dropped(self):
+        """Test that a client released after clear() is not reused or counted."""
+        pool, factory = make_pool()
+        stale = pool.acquire()
+        pool.clear()
+        pool.release(stale)
+
+        assert pool.stats()["idle"] == 0
+        fresh = pool.acquire()
+        assert fresh is not stale
+        assert factory.call_count == 2
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["in_use"] == 1
+
+    def test_invalid_size(self):
+        """Test that an empty pool is rejected."""
+        with pytest.raises(ValueError):
+            ServicePool('calendar', Mock(), size=0)
+
+
+class TestPooledServices:
+    """Test the calendar and tasks pools exposed by the auth module."""
+
+    def setup_method(self):
+        authentication.clear_service_cache()
+
+    def teardown_method(self):
+        authentication.clear_service_cache()
+
+    def test_services_share_one_credential(self):
+        """Test that calendar and tasks clients are built with the same credential object."""
+        creds = Mock(valid=True, expiry=None)
+        with patch.object(authentication.credential_manager, '_load', return_value=(creds, False)) as load, \
+                patch.object(authentication.discovery_cache, 'build', side_effect=lambda *a, **kw: Mock()) as build:
+            authentication.get_calendar_service()
+            authentication.get_tasks_service()
+
+        load.assert_called_once()
+        assert [c.kwargs["credentials"] for c in build.call_args_list] == [creds, creds]
+
+    def test_parallel_calls_use_separate_clients(self):
+        """Test that concurrent threads each receive their own calendar client."""
+        barrier = threading.Barrier(3)
+        seen = []
+
+        def worker():
+            service = authentication.get_calendar_service()
+            barrier.wait()
+            seen.append(service)
+
+        with patch.object(authentication, 'get_credentials', return_value=Mock()), \
+                patch.object(authentication.discovery_cache, 'build', side_effect=lambda *a, **kw: Mock()):
+            threads = [threading.Thread(target=worker) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+        assert len({id(service) for service in seen}) == 3
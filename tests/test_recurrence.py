@@ -0,0 +1,190 @@
+"""Pytest tests for local expansion of recurring events."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from zoneinfo import ZoneInfo
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cal.events import view_events, delete_events
+from cal.recurrence import expand, iter_expanded, build_rruleset
+
+NY = ZoneInfo("America/New_York")
+
+
+def ny(month, day, hour=0, minute=0):
+    return datetime(2024, month, day, hour, minute, tzinfo=NY)
+
+
+def standup(recurrence, **extra):
+    return dict({
+        'id': 'standup', 'summary': 'Standup', 'status': 'confirmed',
+        'start': {'dateTime': '2024-03-04T09:00:00-05:00', 'timeZone': 'America/New_York'},
+        'end': {'dateTime': '2024-03-04T09:15:00-05:00', 'timeZone': 'America/New_York'},
+        'recurrence': recurrence,
+    }, **extra)
+
+
+def starts(events):
+    return [datetime.fromisoformat(e['start']['dateTime']) for e in events]
+
+
+class TestExpand:
+    """Test expanding one series inside a window."""
+
+    def test_daily_series_in_window(self):
+        """Test that only instances inside the window are produced, with server-style ids."""
+        events = list(expand(standup(['RRULE:FREQ=DAILY']), ny(3, 6), ny(3, 9)))
+
+        assert starts(events) == [ny(3, 6, 9), ny(3, 7, 9), ny(3, 8, 9)]
+        assert events[0]['id'] == 'standup_20240306T140000Z'
+        assert events[0]['recurringEventId'] == 'standup'
+        assert events[0]['end']['dateTime'] == ny(3, 6, 9, 15).isoformat()
+        assert 'recurrence' not in events[0]
+
+    def test_wall_time_kept_across_dst(self):
+        """Test that instances stay at 9 AM local time over the DST change."""
+        events = list(expand(standup(['RRULE:FREQ=DAILY']), ny(3, 9), ny(3, 12)))
+
+        assert [d.hour for d in starts(events)] == [9, 9, 9]
+        assert [e['id'][-7:] for e in events] == ['140000Z', '130000Z', '130000Z']
+
+    def test_instance_overlapping_window_start(self):
+        """Test that an instance already running when the window opens is included."""
+        events = list(expand(standup(['RRULE:FREQ=DAILY']), ny(3, 6, 9, 10), ny(3, 6, 12)))
+        assert starts(events) == [ny(3, 6, 9)]
+
+    def test_until_and_count(self):
+        assert len(list(expand(standup(['RRULE:FREQ=DAILY;COUNT=3']), ny(3, 1), ny(4, 1)))) == 3
+        assert len(list(expand(standup(['RRULE:FREQ=DAILY;UNTIL=20240307T235959Z']), ny(3, 1), ny(4, 1)))) == 4
+
+    def test_bare_date_until_on_timed_series(self):
+        assert len(list(expand(standup(['RRULE:FREQ=DAILY;UNTIL=20240307']), ny(3, 1), ny(4, 1)))) == 4
+
+    def test_exdate_and_rdate(self):
+        """Test that EXDATE removes and RDATE adds instances."""
+        master = standup(['RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=3',
+                          'EXDATE;TZID=America/New_York:20240311T090000',
+                          'RDATE;VALUE=DATE:20240313'])
+
+        assert starts(expand(master, ny(3, 1), ny(4, 1))) == [ny(3, 4, 9), ny(3, 13, 9), ny(3, 18, 9)]
+
+    def test_all_day_series(self):
+        """Test weekly all-day instances and their date-only ids."""
+        master = {'id': 'gym', 'summary': 'Gym', 'start': {'date': '2024-03-01'}, 'end': {'date': '2024-03-02'},
+                  'recurrence': ['RRULE:FREQ=WEEKLY;UNTIL=20240322']}
+        local = datetime.now().astimezone().tzinfo
+
+        events = list(expand(master, datetime(2024, 3, 5, tzinfo=local), datetime(2024, 4, 1, tzinfo=local)))
+
+        assert [e['start']['date'] for e in events] == ['2024-03-08', '2024-03-15', '2024-03-22']
+        assert events[0]['id'] == 'gym_20240308'
+        assert events[0]['end'] == {'date': '2024-03-09'}
+
+    def test_utc_until_on_all_day_series(self):
+        """Test that a UTC UNTIL on a date-only series ends it on that date instead of raising."""
+        master = {'id': 'gym', 'summary': 'Gym', 'start': {'date': '2024-01-08'}, 'end': {'date': '2024-01-09'},
+                  'recurrence': ['RRULE:FREQ=DAILY;UNTIL=20240110T000000Z']}
+        local = datetime.now().astimezone().tzinfo
+
+        events = list(expand(master, datetime(2024, 1, 1, tzinfo=local), datetime(2024, 2, 1, tzinfo=local)))
+
+        assert [e['start']['date'] for e in events] == ['2024-01-08', '2024-01-09', '2024-01-10']
+
+    def test_exceptions_skipped(self):
+        """Test that instances replaced by exceptions are left to the caller."""
+        exceptions = {ny(3, 5, 9).timestamp(): {'id': 'standup_20240305T140000Z'}}
+        assert starts(expand(standup(['RRULE:FREQ=DAILY;COUNT=3']), ny(3, 1), ny(4, 1), exceptions)) == \
+            [ny(3, 4, 9), ny(3, 6, 9)]
+
+    def test_dtstart_always_included(self):
+        """Test that DTSTART is an instance even when the rule would not produce it."""
+        master = standup(['RRULE:FREQ=WEEKLY;BYDAY=TU;COUNT=2'])  # DTSTART is a Monday
+        assert starts(expand(master, ny(3, 1), ny(4, 1))) == [ny(3, 4, 9), ny(3, 5, 9), ny(3, 12, 9)]
+
+    def test_build_rruleset_exrule(self):
+        rules = build_rruleset(['RRULE:FREQ=DAILY;COUNT=7', 'EXRULE:FREQ=WEEKLY;BYDAY=SA,SU'], ny(3, 4, 9))
+        assert len(list(rules)) == 5
+
+
+@pytest.fixture
+def series_service():
+    """A singleEvents=False listing: one master, its exceptions and a single event, over two pages."""
+    service = Mock()
+    pages = {
+        None: {'items': [
+            standup(['RRULE:FREQ=DAILY;COUNT=5']),
+            {'id': 'lunch', 'summary': 'Lunch', 'status': 'confirmed',
+             'start': {'dateTime': '2024-03-05T12:00:00-05:00'}, 'end': {'dateTime': '2024-03-05T13:00:00-05:00'}},
+        ], 'nextPageToken': 'p2'},
+        'p2': {'items': [
+            # 6th cancelled, 7th moved to the afternoon
+            {'id': 'standup_20240306T140000Z', 'status': 'cancelled', 'recurringEventId': 'standup',
+             'originalStartTime': {'dateTime': '2024-03-06T09:00:00-05:00'}},
+            {'id': 'standup_20240307T140000Z', 'status': 'confirmed', 'summary': 'Standup (moved)',
+             'recurringEventId': 'standup', 'originalStartTime': {'dateTime': '2024-03-07T14:00:00Z'},
+             'start': {'dateTime': '2024-03-07T15:00:00-05:00'}, 'end': {'dateTime': '2024-03-07T15:15:00-05:00'}},
+            {'id': 'gone', 'status': 'cancelled'},
+        ]},
+    }
+    service.events.return_value.list.side_effect = lambda **params: Mock(
+        execute=Mock(return_value=pages[params.get('pageToken')]))
+    service.events.return_value.get.side_effect = lambda **params: Mock(
+        execute=Mock(return_value=next(item for page in pages.values() for item in page['items']
+                                       if item['id'] == params['eventId'])))
+    return service
+
+
+class TestIterExpanded:
+    """Test listing masters and expanding them locally."""
+
+    def test_masters_listed_and_expanded(self, series_service):
+        """Test the list parameters and the merged, start-ordered result."""
+        events = list(iter_expanded(series_service, time_min='2024-03-01T00:00:00-05:00',
+                                    time_max='2024-04-01T00:00:00-05:00'))
+
+        params = series_service.events.return_value.list.call_args_list[0].kwargs
+        assert params['singleEvents'] is False
+        assert params['showDeleted'] is True
+        assert 'orderBy' not in params
+        assert [e['summary'] for e in events] == ['Standup', 'Standup', 'Lunch', 'Standup (moved)', 'Standup']
+        assert starts(events)[3] == ny(3, 7, 15)
+        assert 'gone' not in [e['id'] for e in events]
+
+    def test_window_limits_expansion(self, series_service):
+        events = list(iter_expanded(series_service, time_min='2024-03-07T00:00:00-05:00',
+                                    time_max='2024-03-08T00:00:00-05:00'))
+        assert [e['summary'] for e in events] == ['Standup (moved)']
+
+    def test_open_window_is_bounded(self, series_service):
+        """Test that open bounds get the default window instead of an endless expansion."""
+        list(iter_expanded(series_service))
+
+        params = series_service.events.return_value.list.call_args_list[0].kwargs
+        assert params['timeMin'] and params['timeMax']
+
+
+class TestExpandLocallyIntegration:
+    """Test view_events and delete_events in local expansion mode."""
+
+    def test_view_events(self, series_service):
+        parsed = {'start': '2024-03-04T00:00:00-05:00', 'end': '2024-03-05T00:00:00-05:00'}
+
+        with patch('builtins.print') as mock_print:
+            view_events(series_service, parsed, expand_locally=True)
+
+        assert [c[0][0] for c in mock_print.call_args_list] == ['Standup: 9 AM to 9 AM']
+
+    def test_delete_events_uses_instance_ids(self, series_service):
+        """Test that expanded instances are deleted by their server-style ids."""
+        with patch('builtins.print'):
+            result = delete_events(series_service, 'Standup', '2024-03-04T00:00:00-05:00',
+                                   '2024-03-06T00:00:00-05:00', None, False, expand_locally=True)
+
+        deleted = [c.kwargs['eventId'] for c in series_service.events.return_value.delete.call_args_list]
+        assert deleted == ['standup_20240304T140000Z', 'standup_20240305T140000Z']
+        assert result['deleted_count'] == 2
@@ -0,0 +1,67 @@
+"""Startup-time budget tests for the assistant chatbot.
+
+These run the real interpreter in a subprocess so that nothing imported by the
+rest of the test session hides a slow import.
+"""
+
+import pytest
+import subprocess
+import sys
+import os
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget from process start to the first prompt (and an immediate 'quit').
+STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '0.5'))
+
+# Libraries that must only be imported once a command actually needs them.
+LAZY_MODULES = [
+    'googleapiclient',
+    'google.auth',
+    'google.oauth2',
+    'google_auth_oauthlib',
+    'dateparser',
+    'parsedatetime',
+    'requests',
+]
+
+
+def run_python(*args, stdin=None):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_DIR,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+
+@pytest.mark.slow
+class TestStartup:
+    """Test that starting the assistant stays cheap."""
+
+    def test_import_does_not_load_heavy_libraries(self):
+        """Test that importing the bot leaves Google/date/HTTP libraries unloaded."""
+        result = run_python('-c', (
+            'import sys, assistant_bot; '
+            f'print([m for m in {LAZY_MODULES!r} if m in sys.modules])'
+        ))
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == '[]'
+
+    def test_cold_start_to_first_prompt_within_budget(self):
+        """Test wall-clock time from launch to the first prompt (then quitting)."""
+        run_python('-c', 'import assistant_bot')  # warm the bytecode cache
+
+        started = time.perf_counter()
+        result = run_python('assistant_bot.py', stdin='quit\n')
+        elapsed = time.perf_counter() - started
+
+        assert result.returncode == 0, result.stderr
+        assert 'What would you like me to do?' in result.stdout
+        assert elapsed < STARTUP_BUDGET_SECONDS, (
+            f"startup took {elapsed:.3f}s, budget is {STARTUP_BUDGET_SECONDS:.3f}s"
+        )
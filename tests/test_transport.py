@@ -0,0 +1,152 @@
+"""Pytest tests for the pooled keep-alive HTTP transport."""
+
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.oauth2.credentials import Credentials
+
+from auth.transport import SessionHttp, authorized_http
+from config import Config
+from exceptions import ConfigurationError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    seen = []
+
+    def _reply(self):
+        length = int(self.headers.get('content-length') or 0)
+        body = self.rfile.read(length) if length else b''
+        _Handler.seen.append((self.command, self.path, {k.lower(): v for k, v in self.headers.items()}, body))
+        payload = json.dumps({"items": [], "path": self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-Test', 'yes')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """A local HTTP/1.1 server that keeps connections alive."""
+    _Handler.seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def credentials():
+    return Credentials(token='abc123')
+
+
+class TestSessionHttp:
+    """Test the httplib2-compatible adapter over a pooled requests session."""
+
+    def test_response_matches_httplib2_shape(self, server, credentials):
+        """Test that status, headers and content come back like httplib2."""
+        http = SessionHttp(credentials)
+        resp, content = http.request(server + '/calendar/v3/x', 'GET')
+
+        assert resp.status == 200
+        assert resp['status'] == '200'
+        assert resp['x-test'] == 'yes'
+        assert json.loads(content)['path'] == '/calendar/v3/x'
+        http.close()
+
+    def test_requests_are_authorized(self, server, credentials):
+        """Test that the bearer token is attached to every request."""
+        http = SessionHttp(credentials)
+        http.request(server + '/a', 'POST', body='{"k": 1}', headers={'content-type': 'application/json'})
+
+        method, _, headers, body = _Handler.seen[-1]
+        assert method == 'POST'
+        assert headers['authorization'] == 'Bearer abc123'
+        assert body == b'{"k": 1}'
+        http.close()
+
+    def test_connections_are_reused(self, server, credentials):
+        """Test that consecutive requests share one keep-alive connection."""
+        http = SessionHttp(credentials)
+        for _ in range(3):
+            http.request(server + '/a')
+
+        assert http.stats() == {"requests": 3, "new_connections": 1, "reused": 2}
+        http.close()
+
+    def test_keep_alive_disabled(self, server, credentials):
+        """Test that every request opens a connection when keep-alive is off."""
+        http = SessionHttp(credentials, keep_alive=False)
+        for _ in range(3):
+            http.request(server + '/a')
+
+        assert http.stats()["new_connections"] == 3
+        assert _Handler.seen[-1][2]['connection'] == 'close'
+        http.close()
+
+    def test_reuse_recorded_in_metrics(self, server, credentials):
+        """Test that requests are timed as new or reused connections."""
+        fake_metrics = Mock()
+        http = SessionHttp(credentials)
+        with patch('auth.transport.metrics', fake_metrics):
+            http.request(server + '/a')
+            http.request(server + '/a')
+
+        stages = [c[0][0] for c in fake_metrics.observe.call_args_list]
+        assert stages == ["http.request.new", "http.request.reused"]
+        http.close()
+
+    def test_drives_api_client(self, server, credentials):
+        """Test that a Calendar client built on the transport executes requests."""
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.discovery_cache import get_static_doc
+
+        http = SessionHttp(credentials)
+        service = build_from_document(get_static_doc('calendar', 'v3'), http=http,
+                                      client_options={'api_endpoint': server + '/'})
+        result = service.events().list(calendarId='primary', maxResults=5).execute()
+        service.events().list(calendarId='primary', maxResults=5).execute()
+
+        assert result['items'] == []
+        assert _Handler.seen[0][1].startswith('/calendars/primary/events?maxResults=5')
+        assert http.stats()["reused"] == 1
+        http.close()
+
+
+class TestAuthorizedHttp:
+    """Test transport selection from configuration."""
+
+    def test_requests_transport(self, credentials):
+        with patch.object(Config, 'HTTP_TRANSPORT', 'requests'), patch.object(Config, 'HTTP_POOL_SIZE', 3):
+            http = authorized_http(credentials)
+
+        assert isinstance(http, SessionHttp)
+        assert http.adapter._pool_maxsize == 3
+        http.close()
+
+    def test_httplib2_transport(self, credentials):
+        """Test that httplib2 leaves transport construction to the client library."""
+        with patch.object(Config, 'HTTP_TRANSPORT', 'httplib2'):
+            assert authorized_http(credentials) is None
+
+    def test_unknown_transport(self, credentials):
+        with patch.object(Config, 'HTTP_TRANSPORT', 'carrier-pigeon'):
+            with pytest.raises(ConfigurationError):
+                authorized_http(credentials)
@@ -0,0 +1,197 @@
+"""Pytest tests for the multi-user credential store and client cache."""
+
+import json
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.oauth2.credentials import Credentials
+
+from auth.credentials import _utcnow
+from auth.users import DirectoryTokenStore, SQLiteTokenStore, UserServices, open_token_store
+from exceptions import AuthenticationError
+
+
+def token_json(token='token', expires_in=timedelta(hours=1), refresh_token='refresh'):
+    return Credentials(
+        token=token,
+        refresh_token=refresh_token,
+        token_uri='https://oauth2.googleapis.com/token',
+        client_id='client',
+        client_secret='secret',
+        expiry=_utcnow() + expires_in,
+    ).to_json()
+
+
+@pytest.fixture(params=['directory', 'sqlite'])
+def store(request, tmp_path):
+    """Each test runs against both token store backends."""
+    if request.param == 'directory':
+        yield DirectoryTokenStore(str(tmp_path / 'tokens'))
+    else:
+        store = SQLiteTokenStore(str(tmp_path / 'tokens.db'))
+        yield store
+        store.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def build():
+    """Patch service construction to return a fresh Mock per build."""
+    with patch('auth.users.discovery_cache.build', side_effect=lambda *a, **kw: Mock()) as build:
+        yield build
+
+
+class TestTokenStores:
+    """Test the directory and SQLite token stores."""
+
+    def test_save_and_load(self, store):
+        """Test that tokens round-trip per user."""
+        store.save('alice@example.com', '{"token": "a"}')
+        store.save('bob', '{"token": "b"}')
+
+        assert store.load('alice@example.com') == '{"token": "a"}'
+        assert store.load('bob') == '{"token": "b"}'
+        assert store.users() == ['alice@example.com', 'bob']
+
+    def test_save_overwrites(self, store):
+        """Test that saving again replaces the user's token."""
+        store.save('alice', '{"token": "old"}')
+        store.save('alice', '{"token": "new"}')
+        assert store.load('alice') == '{"token": "new"}'
+
+    def test_missing_user(self, store):
+        """Test that unknown users have no token."""
+        assert store.load('nobody') is None
+
+    def test_delete(self, store):
+        """Test that deleting removes only that user."""
+        store.save('alice', '{}')
+        store.save('bob', '{}')
+        store.delete('alice')
+        store.delete('alice')
+
+        assert store.users() == ['bob']
+
+    def test_user_ids_cannot_escape_directory(self, tmp_path):
+        """Test that path separators in a user ID stay inside the token directory."""
+        store = DirectoryTokenStore(str(tmp_path / 'tokens'))
+        store.save('../evil', '{}')
+
+        assert os.listdir(tmp_path) == ['tokens']
+        assert store.users() == ['../evil']
+
+    def test_open_token_store(self, tmp_path):
+        """Test that the backend is chosen from the location."""
+        sqlite_store = open_token_store(str(tmp_path / 'users.db'))
+        assert isinstance(sqlite_store, SQLiteTokenStore)
+        sqlite_store.close()
+        assert isinstance(open_token_store(str(tmp_path / 'tokens')), DirectoryTokenStore)
+
+
+class TestUserServices:
+    """Test per-user clients in the bounded, idle-expiring LRU."""
+
+    def test_client_reused_per_user_and_api(self, store, build):
+        """Test that repeat requests reuse the client instead of rebuilding it."""
+        store.save('alice', token_json())
+        services = UserServices(store)
+
+        assert services.calendar('alice') is services.calendar('alice')
+        assert services.tasks('alice') is not services.calendar('alice')
+        assert build.call_count == 2
+        assert services.stats()["hits"] == 2
+
+    def test_users_get_their_own_credentials(self, store, build):
+        """Test that each client is built with that user's token."""
+        store.save('alice', token_json(token='a'))
+        store.save('bob', token_json(token='b'))
+        services = UserServices(store)
+        services.calendar('alice')
+        services.calendar('bob')
+
+        tokens = [c.kwargs["credentials"].token for c in build.call_args_list]
+        assert tokens == ['a', 'b']
+
+    def test_lru_eviction(self, store, build):
+        """Test that the least recently used client is dropped past maxsize."""
+        for user in ('a', 'b', 'c'):
+            store.save(user, token_json())
+        services = UserServices(store, maxsize=2)
+        first = services.calendar('a')
+        services.calendar('b')
+        services.calendar('a')
+        services.calendar('c')
+
+        assert services.calendar('a') is first
+        assert services.stats()["evictions"] == 1
+        services.calendar('b')
+        assert build.call_count == 4
+
+    def test_idle_clients_expire(self, store, build):
+        """Test that clients unused for longer than idle_ttl are dropped."""
+        store.save('alice', token_json())
+        store.save('bob', token_json())
+        clock = FakeClock()
+        services = UserServices(store, idle_ttl=60, clock=clock)
+        alice = services.calendar('alice')
+        clock.now = 50
+        services.calendar('bob')
+        clock.now = 100
+
+        assert services.calendar('bob') is not None
+        assert services.stats()["expirations"] == 1
+        assert services.stats()["size"] == 1
+        assert services.calendar('alice') is not alice
+
+    def test_unknown_user(self, store, build):
+        """Test that a user without a stored token is rejected."""
+        with pytest.raises(AuthenticationError, match="No stored credentials"):
+            UserServices(store).calendar('nobody')
+
+    def test_unknown_api(self, store):
+        """Test that only Calendar and Tasks clients are offered."""
+        with pytest.raises(ValueError):
+            UserServices(store).get('alice', 'gmail')
+
+    def test_expiring_token_refreshed_and_saved(self, store, build):
+        """Test that a token inside the refresh margin is refreshed and written back."""
+        store.save('alice', token_json(token='old', expires_in=timedelta(minutes=1)))
+
+        def refresh(creds, request):
+            creds.token = 'new'
+            creds.expiry = _utcnow() + timedelta(hours=1)
+
+        with patch.object(Credentials, 'refresh', autospec=True, side_effect=refresh):
+            UserServices(store, refresh_margin=300).calendar('alice')
+
+        assert json.loads(store.load('alice'))['token'] == 'new'
+        assert build.call_args.kwargs["credentials"].token == 'new'
+
+    def test_token_without_refresh_token(self, store, build):
+        """Test that a stored token that cannot be refreshed is reported."""
+        store.save('alice', token_json(refresh_token=None))
+        with pytest.raises(AuthenticationError, match="are invalid"):
+            UserServices(store).calendar('alice')
+
+    def test_evict_user(self, store, build):
+        """Test that evicting a user drops all of their clients."""
+        store.save('alice', token_json())
+        services = UserServices(store)
+        services.calendar('alice')
+        services.tasks('alice')
+        services.evict('alice')
+
+        assert services.stats()["size"] == 0